@@ -0,0 +1,29 @@
+"""add updated_at to items companies requisitions
+
+Revision ID: 2ea17b01a625
+Revises: 3087e7e5baf3
+Create Date: 2026-10-17 21:20:20.004243
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2ea17b01a625'
+down_revision: Union[str, Sequence[str], None] = '3087e7e5baf3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Row versions for ETag / If-None-Match on catalogue and requisition reads
+    for table in ('items', 'companies', 'requisitions'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+
+
+def downgrade() -> None:
+    for table in ('requisitions', 'companies', 'items'):
+        op.drop_column(table, 'updated_at')
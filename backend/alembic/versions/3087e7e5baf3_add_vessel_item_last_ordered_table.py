@@ -0,0 +1,45 @@
+"""add vessel_item_last_ordered table
+
+Revision ID: 3087e7e5baf3
+Revises: 315f62c533de
+Create Date: 2026-10-17 21:18:31.019614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3087e7e5baf3'
+down_revision: Union[str, Sequence[str], None] = '315f62c533de'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vessel_item_last_ordered',
+        sa.Column('vessel_id', sa.Integer(), sa.ForeignKey('vessels.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('item_id', sa.Integer(), sa.ForeignKey('items.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('last_ordered_at', sa.DateTime(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_vessel_item_last_ordered_recent', 'vessel_item_last_ordered',
+                    ['vessel_id', 'last_ordered_at'])
+
+    # Backfill from existing requisition lines
+    op.execute("""
+        INSERT INTO vessel_item_last_ordered (vessel_id, item_id, last_ordered_at, order_count)
+        SELECT r.vessel_id, ri.item_id, max(r.created_at), count(DISTINCT r.id)
+        FROM requisition_items ri
+        JOIN requisitions r ON r.id = ri.requisition_id
+        WHERE r.created_at IS NOT NULL
+        GROUP BY r.vessel_id, ri.item_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vessel_item_last_ordered_recent', table_name='vessel_item_last_ordered')
+    op.drop_table('vessel_item_last_ordered')
@@ -0,0 +1,28 @@
+"""add item_tags tag_id item_id index
+
+Revision ID: 315f62c533de
+Revises: 4acad36362da
+Create Date: 2026-10-17 21:18:03.409387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '315f62c533de'
+down_revision: Union[str, Sequence[str], None] = '4acad36362da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The (item_id, tag_id) primary key only serves item -> tags lookups;
+    # tag filters and facet counts go tag -> items
+    op.create_index('ix_item_tags_tag_id_item_id', 'item_tags', ['tag_id', 'item_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_tags_tag_id_item_id', table_name='item_tags')
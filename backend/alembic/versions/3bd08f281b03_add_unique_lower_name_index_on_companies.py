@@ -0,0 +1,41 @@
+"""add unique lower name index on companies
+
+Revision ID: 3bd08f281b03
+Revises: 8bc5c1efbe4a
+Create Date: 2026-10-17 21:44:05.644661
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3bd08f281b03'
+down_revision: Union[str, Sequence[str], None] = '8bc5c1efbe4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Companies differing only in case have to be merged by hand first —
+    # list them rather than fail on the index with a bare IntegrityError
+    conflicts = op.get_bind().execute(sa.text("""
+        SELECT lower(name) AS name, string_agg(id::text || ' ' || quote_literal(name), ', ' ORDER BY id) AS companies
+        FROM companies
+        GROUP BY lower(name)
+        HAVING count(*) > 1
+        ORDER BY lower(name)
+    """)).all()
+    if conflicts:
+        lines = "\n".join(f"  {row.name}: {row.companies}" for row in conflicts)
+        raise RuntimeError(
+            f"{len(conflicts)} company names are used more than once (ignoring case).\n"
+            f"Merge or rename these companies (id 'name'), then run the upgrade again:\n{lines}"
+        )
+    op.create_index('uq_companies_lower_name', 'companies', [sa.text('lower(name)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_companies_lower_name', table_name='companies')
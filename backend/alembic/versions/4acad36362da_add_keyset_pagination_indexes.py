@@ -0,0 +1,31 @@
+"""add keyset pagination indexes
+
+Revision ID: 4acad36362da
+Revises: 4ba0c4f3d010
+Create Date: 2026-10-17 21:16:08.538447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4acad36362da'
+down_revision: Union[str, Sequence[str], None] = '4ba0c4f3d010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite keys matching the list orderings: items by (name, id),
+    # requisitions per vessel by (created_at, id) — serve both ORDER BY and
+    # the row-value comparisons used by cursor pagination
+    op.create_index('ix_items_name_id', 'items', ['name', 'id'])
+    op.create_index('ix_requisitions_vessel_created', 'requisitions', ['vessel_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_requisitions_vessel_created', table_name='requisitions')
+    op.drop_index('ix_items_name_id', table_name='items')
@@ -0,0 +1,44 @@
+"""add pg_trgm search indexes on items
+
+Revision ID: 4ba0c4f3d010
+Revises: d32be4fa6c6d
+Create Date: 2026-10-17 21:14:46.194232
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4ba0c4f3d010'
+down_revision: Union[str, Sequence[str], None] = 'd32be4fa6c6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trigram matching for catalogue search (ILIKE '%term%' and similarity)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_index('ix_items_name_trgm', 'items', ['name'],
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_items_catalogue_nr_trgm', 'items', ['catalogue_nr'],
+                    postgresql_using='gin', postgresql_ops={'catalogue_nr': 'gin_trgm_ops'})
+    op.create_index('ix_items_desc_short_trgm', 'items', ['desc_short'],
+                    postgresql_using='gin', postgresql_ops={'desc_short': 'gin_trgm_ops'})
+
+    # Punctuation-insensitive catalogue key — must match app.models.item.catalogue_key()
+    op.execute("""
+        CREATE INDEX ix_items_catalogue_key_trgm ON items
+        USING gin (regexp_replace(lower(catalogue_nr), '[^a-z0-9]', '', 'g') gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_catalogue_key_trgm', table_name='items')
+    op.drop_index('ix_items_desc_short_trgm', table_name='items')
+    op.drop_index('ix_items_catalogue_nr_trgm', table_name='items')
+    op.drop_index('ix_items_name_trgm', table_name='items')
+    # pg_trgm extension is left installed — other objects may depend on it
@@ -0,0 +1,27 @@
+"""add lower name index on items
+
+Revision ID: 6bf7f93670e2
+Revises: d5261a1ca49d
+Create Date: 2026-10-17 21:34:20.619583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6bf7f93670e2'
+down_revision: Union[str, Sequence[str], None] = 'd5261a1ca49d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Bulk upload duplicate detection matches names case-insensitively
+    op.create_index('ix_items_lower_name', 'items', [sa.text('lower(name)')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_lower_name', table_name='items')
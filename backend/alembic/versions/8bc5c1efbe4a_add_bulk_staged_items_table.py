@@ -0,0 +1,48 @@
+"""add bulk_staged_items table
+
+Revision ID: 8bc5c1efbe4a
+Revises: d7c4dde1e75c
+Create Date: 2026-10-17 21:41:14.812253
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8bc5c1efbe4a'
+down_revision: Union[str, Sequence[str], None] = 'd7c4dde1e75c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'bulk_staged_items',
+        sa.Column('token', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('row', sa.Integer(), primary_key=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('error', sa.String()),
+        sa.Column('existing_id', sa.Integer()),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('catalogue_nr', sa.String(), nullable=False),
+        sa.Column('unit', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('desc_short', sa.String(), nullable=False),
+        sa.Column('desc_long', sa.Text(), nullable=False),
+        sa.Column('manufacturer', sa.String(), nullable=False),
+        sa.Column('supplier', sa.String(), nullable=False),
+        sa.Column('tags', sa.String(), nullable=False),
+        sa.Column('image_path', sa.String(), nullable=False),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_bulk_staged_items_created_at', 'bulk_staged_items', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bulk_staged_items_created_at', table_name='bulk_staged_items')
+    op.drop_table('bulk_staged_items')
@@ -0,0 +1,28 @@
+"""add requisition_items requisition_id index
+
+Revision ID: d5261a1ca49d
+Revises: feb2e79187c2
+Create Date: 2026-10-17 21:27:49.137704
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5261a1ca49d'
+down_revision: Union[str, Sequence[str], None] = 'feb2e79187c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres doesn't index foreign keys — requisition line lookups and the
+    # list summaries (GROUP BY requisition_id) were scanning requisition_items
+    op.create_index('ix_requisition_items_requisition_id', 'requisition_items', ['requisition_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_requisition_items_requisition_id', table_name='requisition_items')
@@ -0,0 +1,30 @@
+"""add image variants ready flags
+
+Revision ID: d6ecb0d29c62
+Revises: e4b4b7cbb607
+Create Date: 2026-10-17 22:07:49.582992
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6ecb0d29c62'
+down_revision: Union[str, Sequence[str], None] = 'e4b4b7cbb607'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Set when an image's variants are made (core.images) — existing rows
+    # start false; python -m app.backfill_image_variants sets them
+    op.add_column("items", sa.Column("image_variants_ready", sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column("companies", sa.Column("logo_variants_ready", sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("companies", "logo_variants_ready")
+    op.drop_column("items", "image_variants_ready")
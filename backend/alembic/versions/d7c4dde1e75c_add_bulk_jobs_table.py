@@ -0,0 +1,54 @@
+"""add bulk_jobs table
+
+Revision ID: d7c4dde1e75c
+Revises: 6bf7f93670e2
+Create Date: 2026-10-17 21:38:53.794725
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7c4dde1e75c'
+down_revision: Union[str, Sequence[str], None] = '6bf7f93670e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'bulk_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('mode', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('on_duplicate', sa.String(), nullable=False, server_default='skip'),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('baseline_item_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_rows', sa.Integer()),
+        sa.Column('last_row', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_done', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('new_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('duplicate_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.JSON(), nullable=False, server_default='[]'),
+        sa.Column('error', sa.String()),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime()),
+        sa.Column('heartbeat_at', sa.DateTime()),
+    )
+    op.create_index('ix_bulk_jobs_status', 'bulk_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bulk_jobs_status', table_name='bulk_jobs')
+    op.drop_table('bulk_jobs')
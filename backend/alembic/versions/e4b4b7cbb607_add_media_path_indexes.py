@@ -0,0 +1,29 @@
+"""add media path indexes
+
+Revision ID: e4b4b7cbb607
+Revises: 3bd08f281b03
+Create Date: 2026-10-17 21:50:27.866474
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b4b7cbb607'
+down_revision: Union[str, Sequence[str], None] = '3bd08f281b03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reference counts for the content-addressed media store
+    op.create_index("ix_items_image_path", "items", ["image_path"])
+    op.create_index("ix_companies_logo_path", "companies", ["logo_path"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_companies_logo_path", table_name="companies")
+    op.drop_index("ix_items_image_path", table_name="items")
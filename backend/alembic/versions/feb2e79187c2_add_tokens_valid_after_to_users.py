@@ -0,0 +1,27 @@
+"""add tokens_valid_after to users
+
+Revision ID: feb2e79187c2
+Revises: 2ea17b01a625
+Create Date: 2026-10-17 21:22:57.424006
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'feb2e79187c2'
+down_revision: Union[str, Sequence[str], None] = '2ea17b01a625'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tokens issued before this are rejected — set on password and role changes
+    op.add_column('users', sa.Column('tokens_valid_after', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'tokens_valid_after')
@@ -1,23 +1,38 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import joinedload
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from app.database import SessionLocal
 from app.models.user import User
+from app.core.cache import ReferenceCache
 from app.core.config import settings
+from app.core.passwords import password_hasher
+from app.core.revocation import revocations
+from app.schemas.user import UserOut
 from uuid import UUID
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # This tells Swagger where the login form is
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login/form")
 
+# Full user rows for endpoints that need more than the token carries (/users/me)
+user_cache = ReferenceCache(ttl=settings.AUTH_USER_CACHE_TTL)
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    """The caller as described by their token — all most endpoints look at."""
+    id: UUID
+    role: str
+    vessel_id: int | None
+    full_name: str | None = None
+
 
 def get_db():
     db = SessionLocal()
@@ -27,52 +42,133 @@ def get_db():
         db.close()
 
 
+# Both run in the password hashing pool and block the calling thread until done
 def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
+    return password_hasher.verify_sync(plain, hashed)
 
 
 def hash_password(plain: str) -> str:
-    return pwd_context.hash(plain)
-
-
-def authenticate_user(db: Session, username: str, password: str, vessel_id: int | None):
-    user = db.query(User).filter(
-        User.username == username,
-        User.vessel_id == vessel_id,
-    ).first()
-    if not user or not verify_password(password, user.password_hash):
+    return password_hasher.hash_sync(plain)
+
+
+async def authenticate_user(username: str, password: str, vessel_id: int | None):
+    """
+    Async so a login burst waits on the hashing pool without tying up
+    request threads — only the user lookup borrows one, briefly.
+    The returned user is detached, with its vessel loaded.
+    """
+    def lookup():
+        db = SessionLocal()
+        try:
+            return db.query(User).options(joinedload(User.vessel)).filter(
+                User.username == username,
+                User.vessel_id == vessel_id,
+            ).first()
+        finally:
+            db.close()
+
+    user = await run_in_threadpool(lookup)
+    if not user or not await password_hasher.verify(password, user.password_hash):
         return None
     if not user.is_active:
         return None
+    # Tokens for a deactivated vessel are refused anyway — don't hand one out
+    if user.vessel is not None and not user.vessel.is_active:
+        return None
     return user
 
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    to_encode.update({"exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES), "iat": now})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+def token_for(user: User) -> str:
+    return create_access_token({
+        "sub": str(user.id),
+        "role": user.role,
+        "full_name": user.full_name,
+        "vessel_id": user.vessel_id,
+    })
+
+
+def revoke_tokens(user: User):
+    """Invalidate every token issued to this user so far. Commit, then call user_changed()."""
+    # iat is whole seconds, so compare at that precision — a replacement token
+    # issued in the same request must still be accepted
+    user.tokens_valid_after = datetime.utcnow().replace(microsecond=0)
+
+
+def user_changed(user: User):
+    """Call after committing a change to a user, so auth in this process sees it immediately."""
+    revocations.set_user_active(user.id, user.is_active)
+    if user.tokens_valid_after is not None:
+        revocations.revoke_tokens(user.id, user.tokens_valid_after)
+    user_cache.invalidate("users")
+
+
+def _token_revoked(user: User, issued_at: datetime | None) -> bool:
+    if user.tokens_valid_after is None:
+        return False
+    return issued_at is None or issued_at < user.tokens_valid_after
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> User | TokenUser:
+    """
+    With AUTH_TRUST_CLAIMS (the default) the caller is taken from the signed
+    token — no database round trip — and checked against the in-memory
+    revocation list. Otherwise, or for tokens without a role claim, the
+    users row is loaded as before.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
+        user_uuid = UUID(payload.get("sub") or "")
+    except (JWTError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    iat = payload.get("iat")
+    issued_at = datetime.utcfromtimestamp(iat) if isinstance(iat, (int, float)) else None
+
+    if settings.AUTH_TRUST_CLAIMS and payload.get("role"):
+        vessel_id = payload.get("vessel_id")
+        if revocations.is_revoked(user_uuid, vessel_id, issued_at):
+            raise HTTPException(status_code=401, detail="User not found or inactive")
+        return TokenUser(
+            id=user_uuid,
+            role=payload["role"],
+            vessel_id=vessel_id,
+            full_name=payload.get("full_name"),
+        )
+
+    db = SessionLocal()
     try:
-        user_uuid = UUID(user_id)
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        user = db.query(User).filter(User.id == user_uuid).first()
+        if (
+            not user
+            or not user.is_active
+            or (user.vessel is not None and not user.vessel.is_active)
+            or _token_revoked(user, issued_at)
+        ):
+            raise HTTPException(status_code=401, detail="User not found or inactive")
+        return user
+    finally:
+        db.close()
+
+
+def get_current_user_full(current_user: User = Depends(get_current_user)) -> UserOut:
+    """The caller's full user record, cached for AUTH_USER_CACHE_TTL seconds."""
+    def load():
+        db = SessionLocal()
+        try:
+            user = db.get(User, current_user.id)
+            return UserOut.model_validate(user) if user else None
+        finally:
+            db.close()
 
-    user = db.query(User).filter(User.id == user_uuid).first()
-    if not user or not user.is_active:
+    user = user_cache.get("users", current_user.id, load)
+    if user is None or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
     return user
 
@@ -0,0 +1,89 @@
+"""
+Image variant backfill — thumb / card / full copies of existing images.
+
+Usage (from the backend/ folder):
+    python -m app.backfill_image_variants
+    python -m app.backfill_image_variants --force --jobs 8
+
+Options:
+    --force     remake variants that already exist (e.g. after changing
+                IMAGE_VARIANT_FORMAT or the sizes in core.images)
+    --jobs N    images resized at once (default: CPU count)
+
+Walks media/objects (core.media_store), media/items and media/companies,
+makes the variants of every original that doesn't have them yet, then sets
+items.image_variants_ready / companies.logo_variants_ready (and bumps
+updated_at, so cached responses pick the variant URLs up) on every row
+whose file has them. Uploads made after this get their variants on upload.
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import update
+
+from app.core.images import has_variants, is_variant, make_variants, require_pillow, variants_enabled
+from app.core.media_store import REFERENCES, STORE_DIR, TMP_DIR, VARIANTS_READY
+from app.database import SessionLocal
+from app.db import base  # noqa: F401 — registers every model
+
+# Store objects are sharded (media/objects/3f/a2/…); the older folders are flat
+MEDIA_DIRS = {STORE_DIR: "**/*", "media/items": "*", "media/companies": "*"}
+FLAG_BATCH = 1000  # paths per UPDATE
+
+
+def originals(folder: str, pattern: str):
+    for path in sorted(Path(folder).glob(pattern)):
+        posix = path.as_posix()
+        if path.is_file() and not posix.startswith(f"{TMP_DIR}/") \
+                and not path.name.endswith(".part") and not is_variant(posix):
+            yield posix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    try:
+        require_pillow()
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    if not variants_enabled():
+        raise SystemExit("IMAGE_VARIANTS is off — nothing to do")
+
+    db = SessionLocal()
+    try:
+        for folder, pattern in MEDIA_DIRS.items():
+            found = list(originals(folder, pattern))
+            todo = [p for p in found if args.force or not has_variants(p)]
+            print(f"{folder}: {len(todo)} of {len(found)} image(s) to convert")
+
+            with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+                results = list(pool.map(make_variants, todo))
+            for path, ok in zip(todo, results):
+                if not ok:
+                    print(f"  skipped {path} — not an image Pillow can read")
+            print(f"  {sum(results)} converted")
+
+            # Paths are stored as written — "media/objects/…", "media/items/<file>".
+            # Without --force only rows not yet flagged change, so their ETags stay put.
+            ready = [p for p in found if has_variants(p)]
+            for start in range(0, len(ready), FLAG_BATCH):
+                for column in REFERENCES:
+                    flag = VARIANTS_READY[column]
+                    stmt = update(column.class_).where(column.in_(ready[start:start + FLAG_BATCH]))
+                    if not args.force:
+                        stmt = stmt.where(flag.is_(False))
+                    db.execute(stmt.values({flag.key: True, "updated_at": datetime.utcnow()}))
+            db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Bulk confirm benchmark — rows/sec of the set-based item import.
+
+Usage (from the backend/ folder, DATABASE_URL pointing at a dev database):
+    python -m app.bench_bulk_confirm
+    python -m app.bench_bulk_confirm --rows 5000 --rows 50000
+
+Options:
+    --rows N         rows per run, repeatable (default 5000 and 50000)
+    --companies N    distinct manufacturer / supplier names per run (default 200)
+
+Each run imports N synthetic "create" rows (names unique to the run, a
+rotating set of manufacturers, suppliers and existing tags), then sends the
+same N rows back as "update" rows, and prints rows/sec for both phases —
+what POST /bulk/items/confirm spends between parsing the body and the
+commit. Everything happens in one transaction that is rolled back, so the
+database is left as it was.
+
+Needs at least one category and one user to exist.
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import select
+
+from app.core.bulk_engine import import_items
+from app.database import SessionLocal
+from app.db import base  # noqa: F401 — registers every model
+from app.models.category import Category
+from app.models.item import Item
+from app.models.tag import Tag
+from app.models.user import User
+from app.schemas.bulk import ItemConfirmRow
+
+
+def make_rows(count: int, companies: int, category: str, tags: list[str], run: str) -> list[ItemConfirmRow]:
+    return [
+        ItemConfirmRow(
+            row=i + 4,
+            action="create",
+            name=f"Bench {run} item {i}",
+            catalogue_nr=f"BENCH-{run}-{i}",
+            unit="pcs",
+            category=category,
+            desc_short=f"Benchmark item {i}",
+            desc_long="",
+            manufacturer=f"Bench {run} maker {i % companies}",
+            supplier=f"Bench {run} supplier {i % companies}",
+            tags=", ".join(tags[j % len(tags)] for j in range(i, i + 2)) if tags else "",
+            image_path="",
+        )
+        for i in range(count)
+    ]
+
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<7} {count:>7} rows  {elapsed:7.2f} s  {count / elapsed:9.0f} rows/s")
+    return result
+
+
+def run(rows: int, companies: int):
+    db = SessionLocal()
+    try:
+        category = db.execute(select(Category.name).limit(1)).scalar()
+        user_id = db.execute(select(User.id).limit(1)).scalar()
+        if category is None or user_id is None:
+            raise SystemExit("Needs at least one category and one user in the database")
+        tags = list(db.execute(select(Tag.name).limit(5)).scalars())
+        run_id = uuid.uuid4().hex[:8]
+
+        batch = make_rows(rows, companies, category, tags, run_id)
+        result = timed("create", rows, lambda: import_items(db, batch, created_by=user_id))
+        if result.errors:
+            print(f"  {len(result.errors)} errors, first: {result.errors[0]}")
+
+        ids = dict(db.execute(
+            select(Item.catalogue_nr, Item.id).where(Item.catalogue_nr.like(f"BENCH-{run_id}-%"))
+        ).all())
+        for row in batch:
+            row.action, row.existing_id = "update", ids[row.catalogue_nr]
+            row.desc_short += " (updated)"
+        timed("update", rows, lambda: import_items(db, batch, created_by=user_id))
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, action="append")
+    parser.add_argument("--companies", type=int, default=200)
+    args = parser.parse_args()
+
+    for rows in args.rows or [5000, 50000]:
+        print(f"{rows} rows")
+        run(rows, args.companies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Login-burst benchmark — measures /items/ latency while many users log in at once.
+
+Usage (API running, from the backend/ folder):
+    python app/bench_login_burst.py --vessel-id 1 --username captain --password secret
+
+Options:
+    --base-url URL      API root (default http://localhost:8000)
+    --logins N          concurrent logins in the burst (default 200)
+    --probe-seconds S   how long to sample /items/ in each phase (default 10)
+
+It runs two phases and prints p50 / p95 / p99 for GET /items/ in each:
+    1. baseline — /items/ alone
+    2. burst    — the same, while N logins fire at once (and keep firing
+                  until the phase ends)
+
+With bcrypt in the hashing pool the two sets of numbers should be close;
+with bcrypt on the request threads p99 climbs by seconds. Also printed:
+login status counts (503 = the hashing queue was full) and, if the user
+is a super admin, /stats/passwords afterwards.
+
+Standard library only, so it runs anywhere the API is reachable.
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url: str, body: dict | None = None, token: str | None = None) -> tuple[int, bytes]:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def probe_items(base_url: str, token: str, seconds: float) -> list[float]:
+    """Sequentially GET /items/ for `seconds`, returning latencies in ms."""
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        status, _ = request(f"{base_url}/items/?page_size=20", token=token)
+        if status == 200:
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list[float]):
+    if not latencies:
+        print(f"  {label:<9} no successful requests")
+        return
+    print(
+        f"  {label:<9} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies):7.1f} ms  "
+        f"p95={percentile(latencies, 95):7.1f} ms  "
+        f"p99={percentile(latencies, 99):7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--vessel-id", type=int, default=None)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--probe-seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    credentials = {"username": args.username, "password": args.password, "vessel_id": args.vessel_id}
+
+    status, body = request(f"{base_url}/login", credentials)
+    if status != 200:
+        raise SystemExit(f"Login failed ({status}): {body.decode(errors='replace')}")
+    token = json.loads(body)["access_token"]
+
+    print(f"Baseline: /items/ for {args.probe_seconds:g}s")
+    baseline = probe_items(base_url, token, args.probe_seconds)
+
+    print(f"Burst: /items/ for {args.probe_seconds:g}s during {args.logins} concurrent logins")
+    statuses: dict[int, int] = {}
+    statuses_lock = threading.Lock()
+    stop = threading.Event()
+
+    def log_in_repeatedly():
+        while not stop.is_set():
+            status, _ = request(f"{base_url}/login", credentials)
+            with statuses_lock:
+                statuses[status] = statuses.get(status, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=args.logins) as pool:
+        for _ in range(args.logins):
+            pool.submit(log_in_repeatedly)
+        time.sleep(0.5)  # let the burst build up before sampling
+        burst = probe_items(base_url, token, args.probe_seconds)
+        stop.set()
+
+    print("\nGET /items/ latency")
+    report("baseline", baseline)
+    report("burst", burst)
+    print(f"\nLogin responses during burst: {dict(sorted(statuses.items()))}")
+
+    status, body = request(f"{base_url}/stats/passwords", token=token)
+    if status == 200:
+        print(f"Hashing pool: {body.decode()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Media serving benchmark — the plain StaticFiles mount against MediaFiles.
+
+Usage (from the backend/ folder):
+    python -m app.bench_media
+    python -m app.bench_media --files 500 --size 20000 --requests 20000 --concurrency 32
+
+Options:
+    --files N        synthetic images written to a temporary store (default 200)
+    --size BYTES     bytes per image (default 12000 — a card variant)
+    --requests N     requests per scenario (default 10000)
+    --concurrency N  client threads, each on its own keep-alive connection (default 16)
+
+Both apps are served by uvicorn on localhost, one at a time, from the same
+temporary directory laid out like media/objects, and hit by a small
+http.client load generator with
+
+  get         plain GETs across all files, hot ones repeating — what a
+              list page costs a browser with a cold cache
+  revalidate  the same with If-None-Match — what every page view costs
+              without long-lived Cache-Control
+
+printing requests/sec and p50 / p99 latency per scenario. Nothing touches
+the real media/ folder or the database.
+"""
+
+import argparse
+import hashlib
+import http.client
+import os
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.core.media_files import MediaFiles
+
+
+def make_files(root: str, count: int, size: int) -> list[str]:
+    paths = []
+    for i in range(count):
+        body = hashlib.sha256(str(i).encode()).digest() * (size // 32 + 1)
+        digest = hashlib.sha256(body[:size]).hexdigest()
+        rel = f"objects/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+        os.makedirs(os.path.join(root, os.path.dirname(rel)), exist_ok=True)
+        with open(os.path.join(root, rel), "wb") as f:
+            f.write(body[:size])
+        paths.append(f"/media/{rel}")
+    return paths
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Served:
+    """A Starlette app on a uvicorn thread, for the duration of a with-block."""
+
+    def __init__(self, media_app):
+        self.port = free_port()
+        config = uvicorn.Config(
+            Starlette(routes=[Mount("/media", app=media_app)]),
+            host="127.0.0.1", port=self.port, log_level="warning", access_log=False,
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def load(port: int, paths: list[str], requests: int, concurrency: int, etags: dict | None) -> tuple[float, list[float]]:
+    # 80 % of requests go to the hottest 20 % of files
+    rng = random.Random(42)
+    hot = paths[: max(1, len(paths) // 5)]
+    plan = [rng.choice(hot) if rng.random() < 0.8 else rng.choice(paths) for _ in range(requests)]
+    slices = [plan[i::concurrency] for i in range(concurrency)]
+
+    def worker(urls: list[str]) -> list[float]:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        latencies = []
+        for url in urls:
+            headers = {"If-None-Match": etags[url]} if etags else {}
+            started = time.perf_counter()
+            conn.request("GET", url, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started)
+        conn.close()
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [lat for chunk in pool.map(worker, slices) for lat in chunk]
+    return time.perf_counter() - started, latencies
+
+
+def fetch_etags(port: int, paths: list[str]) -> dict[str, str]:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    etags = {}
+    for url in paths:
+        conn.request("GET", url)
+        response = conn.getresponse()
+        response.read()
+        etags[url] = response.getheader("etag")
+    conn.close()
+    return etags
+
+
+def report(label: str, elapsed: float, latencies: list[float]):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"  {label:<11} {len(latencies) / elapsed:9.0f} req/s"
+        f"   p50 {statistics.median(latencies) * 1000:6.2f} ms   p99 {p99 * 1000:6.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=12000)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = make_files(root, args.files, args.size)
+        apps = {
+            "StaticFiles": StaticFiles(directory=root),
+            "MediaFiles": MediaFiles(
+                directory=root, store_prefix="objects",
+                cache_bytes=64 * 1024 * 1024, max_cached_file=256 * 1024, sidecars=True,
+            ),
+        }
+        print(f"{args.files} files x {args.size} bytes, {args.requests} requests, {args.concurrency} connections")
+        for name, media_app in apps.items():
+            print(name)
+            with Served(media_app) as served:
+                etags = fetch_etags(served.port, paths)  # also warms MediaFiles' cache
+                report("get", *load(served.port, paths, args.requests, args.concurrency, None))
+                report("revalidate", *load(served.port, paths, args.requests, args.concurrency, etags))
+
+
+if __name__ == "__main__":
+    main()
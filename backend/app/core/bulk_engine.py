@@ -0,0 +1,502 @@
+"""
+Bulk uploads — parsing, duplicate detection and the set-based imports
+behind /bulk/items/*, /bulk/companies/* and background bulk jobs.
+
+The confirm endpoint used to walk the rows one at a time: an ilike query
+(and maybe a flush) per manufacturer and supplier, a db.get per update, an
+os.path.exists per image and an ORM add with relationship-assigned tags
+per item. Here the work is done per statement, not per row:
+
+  - every manufacturer / supplier resolved with one lower(name) query;
+    missing companies created with one multi-row INSERT ... RETURNING
+  - update targets checked with one id query, applied with one executemany
+  - new items inserted in one INSERT ... RETURNING id
+  - tags of updated items cleared with one DELETE, and every (item, tag)
+    pair written with one INSERT ... ON CONFLICT DO NOTHING
+
+Nothing is committed here — the caller owns the transaction.
+"""
+
+import os
+from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.images import has_variants
+from app.models.category import Category
+from app.models.company import Company
+from app.models.bulk_staging import BulkStagedItem
+from app.models.item import Item
+from app.models.tag import Tag, item_tags
+from app.schemas.bulk import CompanyConfirmRow, CompanyRowPreview, ItemConfirmRequest, ItemConfirmRow, ItemRowPreview
+
+NAME_BATCH = 1000  # names per lookup query
+HEADER_ROWS = 3  # headers, example, notes — data starts on row 4
+
+# (field, header, example) — the column layout of the items template
+ITEM_COLUMNS = [
+    ("name",          "Name *",           "Fire Extinguisher CO2 5kg"),
+    ("catalogue_nr",  "Catalogue Nr",     "FE-CO2-5"),
+    ("unit",          "Unit *",           "pcs"),
+    ("category",      "Category *",       "Safety"),
+    ("desc_short",    "Short Description","CO2 extinguisher, 5kg"),
+    ("desc_long",     "Full Description", "For use in engine room and electrical fires"),
+    ("manufacturer",  "Manufacturer",     "Amerex"),
+    ("supplier",      "Supplier",         "MarineStore Ltd"),
+    ("tags",          "Tags",             "Safety, Critical"),
+    ("image_path",    "Image Path",       "media/items/fe-co2-5.jpg"),
+]
+
+COL_IDX = {col[0]: i + 1 for i, col in enumerate(ITEM_COLUMNS)}
+
+# (field, header, example) — the column layout of the companies template
+COMPANY_COLUMNS = [
+    ("name",            "Name *",           "MarineStore Ltd"),
+    ("email",           "Email",            "orders@marinestore.com"),
+    ("phone",           "Phone",            "+44 20 1234 5678"),
+    ("website",         "Website",          "https://marinestore.com"),
+    ("is_supplier",     "Is Supplier",      "Yes"),
+    ("is_manufacturer", "Is Manufacturer",  "No"),
+    ("comments",        "Comments",         "Main UK supplier"),
+]
+
+CO_COL_IDX = {col[0]: i + 1 for i, col in enumerate(COMPANY_COLUMNS)}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def _batches(values: list, size: int = NAME_BATCH):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def clean(val) -> str:
+    """Coerce cell value to stripped string."""
+    if val is None:
+        return ""
+    return str(val).strip()
+
+
+# ── Parsing ──────────────────────────────────────────────────────────────────
+
+def data_rows(ws) -> Iterator[tuple[int, tuple]]:
+    """(sheet row number, values) for each non-blank row below the header rows."""
+    for row_num, row in enumerate(ws.iter_rows(min_row=HEADER_ROWS + 1, values_only=True), start=HEADER_ROWS + 1):
+        if all(v is None or str(v).strip() == "" for v in row):
+            continue  # skip blank rows
+        yield row_num, row
+
+
+def read_item_rows(rows: Iterable[tuple[int, tuple]], categories: set[str], seen_in_file: set[str]) -> Iterator[ItemRowPreview]:
+    """
+    Validate sheet rows into previews, status "new" or "error" — duplicates
+    against the catalogue are marked separately (mark_duplicates).
+    `seen_in_file` collects name|catalogue_nr keys across calls, so
+    duplicates within the file are caught however the rows are chunked.
+    """
+    for row_num, row in rows:
+        values = {field: clean(row[i]) if i < len(row) else "" for i, (field, _, _) in enumerate(ITEM_COLUMNS)}
+
+        errors = []
+        if not values["name"]:
+            errors.append("Name is required")
+        if not values["unit"]:
+            errors.append("Unit is required")
+        if not values["category"]:
+            errors.append("Category is required")
+        elif values["category"].lower() not in categories:
+            errors.append(f"Category '{values['category']}' not found")
+
+        # Also check for duplicates within this file
+        file_key = f"{values['name'].lower()}|{values['catalogue_nr'].lower()}"
+        if not errors and file_key in seen_in_file:
+            errors.append("Duplicate row within this file")
+        if not errors:
+            seen_in_file.add(file_key)
+
+        yield ItemRowPreview(
+            row=row_num, status="error" if errors else "new",
+            error="; ".join(errors) or None, **values,
+        )
+
+
+def mark_duplicates(db: Session, previews: list[ItemRowPreview], max_item_id: int | None = None):
+    """
+    Mark "new" previews that match an existing item — on (name, catalogue_nr),
+    else on name alone, case-insensitively — as "duplicate", with its id.
+    Items above max_item_id are ignored.
+    """
+    by_name_and_cat, by_name = existing_items_index(
+        db, {p.name.lower() for p in previews if p.status == "new"}, max_item_id,
+    )
+    for p in previews:
+        if p.status != "new":
+            continue
+        name = p.name.lower()
+        existing_id = (by_name_and_cat.get((name, p.catalogue_nr.lower())) if p.catalogue_nr else None) or by_name.get(name)
+        if existing_id:
+            p.status = "duplicate"
+            p.existing_id = existing_id
+
+
+# ── Staging ──────────────────────────────────────────────────────────────────
+
+STAGED_FIELDS = [field for field, _, _ in ITEM_COLUMNS]
+
+
+def _staged_cutoff(ttl_hours: int) -> datetime:
+    return datetime.utcnow() - timedelta(hours=ttl_hours)
+
+
+def _staged(token, created_by, ttl_hours: int) -> tuple:
+    """WHERE clauses for a staged upload that `created_by` can still see — theirs and younger than ttl_hours."""
+    return (
+        BulkStagedItem.token == token,
+        BulkStagedItem.created_by == created_by,
+        BulkStagedItem.created_at >= _staged_cutoff(ttl_hours),
+    )
+
+
+def stage_previews(db: Session, token, previews: list[ItemRowPreview], created_by, ttl_hours: int):
+    """Store previews under `token` in one executemany, dropping staged uploads older than ttl_hours."""
+    db.execute(delete(BulkStagedItem).where(BulkStagedItem.created_at < _staged_cutoff(ttl_hours)))
+    if previews:
+        db.execute(insert(BulkStagedItem), [
+            {**p.model_dump(), "token": token, "created_by": created_by} for p in previews
+        ])
+
+
+def staged_counts(db: Session, token, created_by, ttl_hours: int) -> dict[str, int]:
+    """status -> row count for a staged upload; empty if the token is unknown, expired or someone else's."""
+    return dict(db.execute(
+        select(BulkStagedItem.status, func.count())
+        .where(*_staged(token, created_by, ttl_hours))
+        .group_by(BulkStagedItem.status)
+    ).all())
+
+
+def staged_page(
+    db: Session, token, created_by, ttl_hours: int, page: int, page_size: int, status: str | None = None,
+) -> list[ItemRowPreview]:
+    stmt = select(BulkStagedItem).where(*_staged(token, created_by, ttl_hours))
+    if status:
+        stmt = stmt.where(BulkStagedItem.status == status)
+    rows = db.execute(stmt.order_by(BulkStagedItem.row).offset((page - 1) * page_size).limit(page_size)).scalars()
+    return [ItemRowPreview.model_validate(r, from_attributes=True) for r in rows]
+
+
+def staged_confirm_rows(db: Session, data: ItemConfirmRequest, created_by, ttl_hours: int) -> list[ItemConfirmRow]:
+    """The confirm rows for a staged upload — actions from the overrides and per-status defaults."""
+    defaults = {"new": data.default, "duplicate": data.duplicates}
+    rows = db.execute(
+        select(BulkStagedItem)
+        .where(*_staged(data.token, created_by, ttl_hours), BulkStagedItem.status != "error")
+        .order_by(BulkStagedItem.row)
+    ).scalars()
+    return [
+        ItemConfirmRow(
+            row=r.row,
+            action=data.overrides.get(r.row, defaults[r.status]),
+            existing_id=r.existing_id,
+            **{field: getattr(r, field) for field in STAGED_FIELDS},
+        )
+        for r in rows
+    ]
+
+
+def unstage(db: Session, token):
+    db.execute(delete(BulkStagedItem).where(BulkStagedItem.token == token))
+
+
+# ── Lookups ──────────────────────────────────────────────────────────────────
+
+def existing_items_index(db: Session, names: Iterable[str], max_item_id: int | None = None) -> tuple[dict, dict]:
+    """
+    Existing items whose lower(name) is among `names`, fetched in one query
+    per NAME_BATCH names (ix_items_lower_name). Returns two lookups:
+    (lower name, lower catalogue_nr) -> id, and lower name -> id.
+    """
+    by_name_and_cat: dict[tuple[str, str], int] = {}
+    by_name: dict[str, int] = {}
+    for batch in _batches(sorted(set(names))):
+        stmt = (
+            select(Item.id, func.lower(Item.name), func.lower(func.coalesce(Item.catalogue_nr, "")))
+            .where(func.lower(Item.name).in_(batch))
+            .order_by(Item.id)
+        )
+        if max_item_id is not None:
+            stmt = stmt.where(Item.id <= max_item_id)
+        rows = db.execute(stmt)
+        for item_id, name, catalogue_nr in rows:
+            by_name_and_cat.setdefault((name, catalogue_nr), item_id)
+            by_name.setdefault(name, item_id)
+    return by_name_and_cat, by_name
+
+
+def resolve_companies(db: Session, uses: Iterable[tuple[str, str]]) -> dict[str, int]:
+    """
+    lower(name) -> company id for every (name, "manufacturer" | "supplier")
+    use, in row order. Names match case-insensitively (first match by id).
+    Missing companies are created in one INSERT under the first spelling
+    seen; existing ones gain the flag they're now used under.
+    """
+    spellings: dict[str, str] = {}
+    manufacturer_keys: set[str] = set()
+    supplier_keys: set[str] = set()
+    for name, role in uses:
+        key = name.lower()
+        spellings.setdefault(key, name)
+        (manufacturer_keys if role == "manufacturer" else supplier_keys).add(key)
+
+    ids: dict[str, int] = {}
+    flag_manufacturer: set[int] = set()
+    flag_supplier: set[int] = set()
+    for batch in _batches(sorted(spellings)):
+        rows = db.execute(
+            select(Company.id, func.lower(Company.name), Company.is_manufacturer, Company.is_supplier)
+            .where(func.lower(Company.name).in_(batch))
+            .order_by(Company.id)
+        )
+        for company_id, key, is_manufacturer, is_supplier in rows:
+            if key in ids:
+                continue
+            ids[key] = company_id
+            if key in manufacturer_keys and not is_manufacturer:
+                flag_manufacturer.add(company_id)
+            if key in supplier_keys and not is_supplier:
+                flag_supplier.add(company_id)
+
+    if flag_manufacturer:
+        db.execute(update(Company).where(Company.id.in_(flag_manufacturer)).values(is_manufacturer=True))
+    if flag_supplier:
+        db.execute(update(Company).where(Company.id.in_(flag_supplier)).values(is_supplier=True))
+
+    missing = [key for key in spellings if key not in ids]
+    if missing:
+        rows = db.execute(
+            insert(Company).returning(Company.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": spellings[key],
+                    "is_manufacturer": key in manufacturer_keys,
+                    "is_supplier": key in supplier_keys,
+                }
+                for key in missing
+            ],
+        )
+        ids.update(zip(missing, rows.scalars()))
+    return ids
+
+
+# ── Import ───────────────────────────────────────────────────────────────────
+
+def import_items(db: Session, rows: Iterable[ItemConfirmRow], created_by) -> ImportResult:
+    """Apply confirm rows — create, update or skip — in a handful of statements."""
+    result = ImportResult()
+    errors: list[tuple[int, str]] = []
+    categories = dict(db.execute(select(func.lower(Category.name), Category.id)).all())
+    tags = dict(db.execute(select(func.lower(Tag.name), Tag.id)).all())
+
+    # Pass 1 — validate, and collect what needs looking up
+    accepted = []
+    for row in rows:
+        if row.action == "skip":
+            result.skipped += 1
+            continue
+        category_id = categories.get(row.category.lower())
+        if category_id is None:
+            errors.append((row.row, f"Row {row.row}: category '{row.category}' not found"))
+            continue
+        if row.action == "update" and row.existing_id:
+            accepted.append((row, category_id))
+        elif row.action == "create":
+            accepted.append((row, category_id))
+
+    update_ids = {row.existing_id for row, _ in accepted if row.action == "update"}
+    found_ids = set()
+    for batch in _batches(sorted(update_ids)):
+        found_ids.update(db.execute(select(Item.id).where(Item.id.in_(batch))).scalars())
+
+    companies = resolve_companies(db, [
+        (name, role)
+        for row, _ in accepted
+        for name, role in ((row.manufacturer.strip(), "manufacturer"), (row.supplier.strip(), "supplier"))
+        if name
+    ])
+    image_exists: dict[str, bool] = {}
+    image_ready: dict[str, bool] = {}
+
+    # Pass 2 — build the parameter sets
+    updates: dict[int, dict] = {}  # a later row for the same item wins, as before
+    creates: list[dict] = []
+    tag_ids_for_new: list[list[int]] = []
+    tag_ids_for_updated: dict[int, list[int]] = {}
+    for row, category_id in accepted:
+        if row.action == "update" and row.existing_id not in found_ids:
+            errors.append((row.row, f"Row {row.row}: item id {row.existing_id} not found"))
+            continue
+
+        values = {
+            "name": row.name,
+            "catalogue_nr": row.catalogue_nr or None,
+            "unit": row.unit,
+            "category_id": category_id,
+            "desc_short": row.desc_short or None,
+            "desc_long": row.desc_long or None,
+            "manufacturer_id": companies.get(row.manufacturer.strip().lower()),
+            "supplier_id": companies.get(row.supplier.strip().lower()),
+        }
+        if row.image_path:
+            if row.image_path not in image_exists:
+                image_exists[row.image_path] = os.path.exists(row.image_path)
+                image_ready[row.image_path] = image_exists[row.image_path] and has_variants(row.image_path)
+            if image_exists[row.image_path]:
+                values["image_path"] = row.image_path
+                values["image_variants_ready"] = image_ready[row.image_path]
+            else:
+                errors.append((row.row, f"Row {row.row}: image file not found: {row.image_path}"))
+        row_tags = list(dict.fromkeys(
+            tags[n] for n in (t.strip().lower() for t in row.tags.split(",")) if n in tags
+        ))
+
+        if row.action == "update":
+            updates[row.existing_id] = values
+            tag_ids_for_updated[row.existing_id] = row_tags
+            result.updated += 1
+        else:
+            creates.append({**values, "created_by": created_by, "is_active": True})
+            tag_ids_for_new.append(row_tags)
+            result.created += 1
+
+    # Reported in row order, as when rows were applied one by one
+    result.errors = [message for _, message in sorted(errors, key=lambda e: e[0])]
+
+    # Pass 3 — write
+    if updates:
+        _update_items(db, updates)
+        for batch in _batches(sorted(updates)):
+            db.execute(delete(item_tags).where(item_tags.c.item_id.in_(batch)))
+
+    pairs = [(item_id, tag_id) for item_id, tag_ids in tag_ids_for_updated.items() for tag_id in tag_ids]
+    if creates:
+        new_ids = db.execute(
+            insert(Item).returning(Item.id, sort_by_parameter_order=True), creates,
+        ).scalars().all()
+        pairs += [(item_id, tag_id) for item_id, tag_ids in zip(new_ids, tag_ids_for_new) for tag_id in tag_ids]
+
+    if pairs:
+        db.execute(
+            pg_insert(item_tags).on_conflict_do_nothing(),
+            [{"item_id": item_id, "tag_id": tag_id} for item_id, tag_id in pairs],
+        )
+    return result
+
+
+def _update_items(db: Session, updates: dict[int, dict]):
+    """
+    ORM bulk UPDATE by primary key — an executemany per distinct column set
+    (rows whose image was missing keep their image_path). updated_at comes
+    from the column's onupdate, so item ETags change.
+    """
+    db.execute(update(Item), [{"id": item_id, **values} for item_id, values in updates.items()])
+
+
+# ── Companies ────────────────────────────────────────────────────────────────
+
+def company_name_index(db: Session, names: Iterable[str]) -> dict[str, int]:
+    """lower(name) -> id for existing companies among `names` — one query per NAME_BATCH names (uq_companies_lower_name)."""
+    index: dict[str, int] = {}
+    for batch in _batches(sorted({n.lower() for n in names})):
+        index.update(db.execute(
+            select(func.lower(Company.name), Company.id).where(func.lower(Company.name).in_(batch))
+        ).all())
+    return index
+
+
+def mark_company_duplicates(db: Session, previews: list[CompanyRowPreview]):
+    """Mark "new" previews whose name an existing company already has as "duplicate", with its id."""
+    index = company_name_index(db, [p.name for p in previews if p.status == "new"])
+    for p in previews:
+        if p.status == "new" and p.name.lower() in index:
+            p.status = "duplicate"
+            p.existing_id = index[p.name.lower()]
+
+
+def import_companies(db: Session, rows: Iterable[CompanyConfirmRow]) -> ImportResult:
+    """
+    Apply company confirm rows: updates in one executemany, creates in one
+    INSERT ... ON CONFLICT (lower(name)) DO NOTHING. A row whose name
+    another company already has is reported instead of applied.
+    """
+    result = ImportResult()
+    errors: list[tuple[int, str]] = []
+    rows = list(rows)
+    result.skipped = sum(1 for r in rows if r.action == "skip")
+    updates = [r for r in rows if r.action == "update" and r.existing_id]
+    creates = [r for r in rows if r.action == "create"]
+
+    found_ids: set[int] = set()
+    for batch in _batches(sorted({r.existing_id for r in updates})):
+        found_ids.update(db.execute(select(Company.id).where(Company.id.in_(batch))).scalars())
+    # Names already taken, and by whom — a rename onto another company's name would break the unique index
+    taken = company_name_index(db, [r.name for r in [*updates, *creates]])
+
+    def values(row) -> dict:
+        return {
+            "name": row.name,
+            "email": row.email or None,
+            "phone": row.phone or None,
+            "website": row.website or None,
+            "is_supplier": row.is_supplier,
+            "is_manufacturer": row.is_manufacturer,
+            "comments": row.comments or None,
+        }
+
+    update_params: dict[int, dict] = {}  # a later row for the same company wins
+    for row in updates:
+        if row.existing_id not in found_ids:
+            errors.append((row.row, f"Row {row.row}: company id {row.existing_id} not found"))
+            continue
+        owner = taken.get(row.name.lower())
+        if owner is not None and owner != row.existing_id:
+            errors.append((row.row, f"Row {row.row}: another company is already named '{row.name}'"))
+            continue
+        taken[row.name.lower()] = row.existing_id
+        update_params[row.existing_id] = {"id": row.existing_id, **values(row)}
+        result.updated += 1
+    if update_params:
+        db.execute(update(Company), list(update_params.values()))
+
+    create_rows = []
+    for row in creates:
+        if row.name.lower() in taken:
+            errors.append((row.row, f"Row {row.row}: company '{row.name}' already exists"))
+            continue
+        taken[row.name.lower()] = 0  # claimed by this import
+        create_rows.append(row)
+    if create_rows:
+        # ON CONFLICT covers a company created concurrently since the lookup
+        inserted = set(db.execute(
+            pg_insert(Company)
+            .on_conflict_do_nothing(index_elements=[func.lower(Company.name)])
+            .returning(func.lower(Company.name)),
+            [{**values(row), "is_active": True} for row in create_rows],
+        ).scalars())
+        for row in create_rows:
+            if row.name.lower() in inserted:
+                result.created += 1
+            else:
+                errors.append((row.row, f"Row {row.row}: company '{row.name}' already exists"))
+
+    result.errors = [message for _, message in sorted(errors, key=lambda e: e[0])]
+    return result
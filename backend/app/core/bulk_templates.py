@@ -0,0 +1,204 @@
+"""
+Bulk upload templates, rendered once and served from memory.
+
+A template is fully determined by its column list, so instead of building
+and styling a workbook on every download, each one is rendered the first
+time it's asked for (the app's lifespan asks at startup) and kept as bytes,
+with an ETag derived from the columns and notes that produced it. Clients
+may keep it for TEMPLATE_MAX_AGE and revalidate with If-None-Match after.
+
+The "live" items template also carries dropdowns of the current categories
+and tags (a hidden Lists sheet). It is keyed on the ETags of the cached
+category and tag lists, so it's re-rendered only after one of them changes.
+"""
+
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from app.core.bulk_engine import COL_IDX, COMPANY_COLUMNS, HEADER_ROWS, ITEM_COLUMNS
+from app.core.etag import make_etag
+
+TEMPLATE_VERSION = 1  # bump when the layout or styling below changes
+TEMPLATE_MAX_AGE = 24 * 60 * 60
+TEMPLATE_CACHE_CONTROL = f"private, max-age={TEMPLATE_MAX_AGE}"  # downloads need a login
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+ITEM_NOTES = [
+    "* Required",
+    "Must match an existing catalogue number exactly if updating",
+    "* Required  e.g. pcs / L / kg / m",
+    "* Must match existing category name exactly",
+    "Optional short summary",
+    "Optional detailed description",
+    "Created automatically if not found",
+    "Created automatically if not found",
+    "Comma-separated existing tag names",
+    "Path to existing file on server e.g. media/items/photo.jpg",
+]
+
+COMPANY_NOTES = [
+    "* Required — must be unique",
+    "Optional",
+    "Optional",
+    "Optional",
+    "Yes / No",
+    "Yes / No",
+    "Optional notes",
+]
+
+
+@dataclass(frozen=True)
+class Template:
+    body: bytes
+    etag: str
+    filename: str
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+
+def _style_header_row(ws, row: int, col_count: int):
+    fill = PatternFill("solid", fgColor="1E3A5F")
+    font = Font(bold=True, color="FFFFFF", size=10)
+    for col in range(1, col_count + 1):
+        cell = ws.cell(row=row, column=col)
+        cell.fill = fill
+        cell.font = font
+        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+
+def _style_example_row(ws, row: int, col_count: int):
+    fill = PatternFill("solid", fgColor="EBF4FF")
+    for col in range(1, col_count + 1):
+        cell = ws.cell(row=row, column=col)
+        cell.fill = fill
+        cell.font = Font(italic=True, color="555555", size=9)
+        cell.alignment = Alignment(wrap_text=True)
+
+
+def _style_notes_row(ws, row: int, col_count: int, wrap: bool):
+    fill = PatternFill("solid", fgColor="FFF9E6")
+    for col in range(1, col_count + 1):
+        cell = ws.cell(row, col)
+        cell.fill = fill
+        cell.font = Font(italic=True, color="888800", size=8)
+        if wrap:
+            cell.alignment = Alignment(wrap_text=True)
+
+
+def _column_widths(ws, columns, notes, min_width=12, max_width=40):
+    # Sized from the three rows written, rather than by walking the sheet
+    for i, ((_, header, example), note) in enumerate(zip(columns, notes), start=1):
+        longest = max(len(header), len(example), len(note))
+        ws.column_dimensions[get_column_letter(i)].width = min(max(longest + 2, min_width), max_width)
+
+
+def _render(title: str, columns, notes, wrap_notes: bool, lists: dict[str, list[str]] | None = None) -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = title
+    ws.row_dimensions[1].height = 36
+
+    for i, ((_, header, example), note) in enumerate(zip(columns, notes), start=1):
+        ws.cell(1, i, header)
+        ws.cell(2, i, example)
+        ws.cell(3, i, note)
+
+    _style_header_row(ws, 1, len(columns))
+    _style_example_row(ws, 2, len(columns))
+    _style_notes_row(ws, 3, len(columns), wrap_notes)
+    if wrap_notes:
+        ws.row_dimensions[3].height = 28
+    ws.freeze_panes = f"A{HEADER_ROWS + 1}"
+    _column_widths(ws, columns, notes)
+
+    if lists:
+        _add_dropdowns(wb, ws, lists)
+
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _add_dropdowns(wb: Workbook, ws, lists: dict[str, list[str]]):
+    """
+    Dropdowns for the columns named in `lists`, sourced from a hidden Lists
+    sheet. Category is enforced; tags only suggest, since the cell holds a
+    comma-separated list.
+    """
+    source = wb.create_sheet("Lists")
+    source.sheet_state = "hidden"
+    for col, (field, values) in enumerate(lists.items(), start=1):
+        if not values:
+            continue
+        letter = get_column_letter(col)
+        for row, value in enumerate(values, start=1):
+            source.cell(row, col, value)
+        strict = field == "category"
+        validation = DataValidation(
+            type="list",
+            formula1=f"=Lists!${letter}$1:${letter}${len(values)}",
+            allow_blank=True,
+            showErrorMessage=strict,
+            error=f"Pick an existing {field.replace('_', ' ')}" if strict else None,
+        )
+        target = get_column_letter(COL_IDX[field])
+        validation.add(f"{target}{HEADER_ROWS + 1}:{target}1048576")
+        ws.add_data_validation(validation)
+
+
+# ── Cached templates ─────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def items_template() -> Template:
+    return Template(
+        body=_render("Items", ITEM_COLUMNS, ITEM_NOTES, wrap_notes=True),
+        etag=make_etag("items", TEMPLATE_VERSION, ITEM_COLUMNS, ITEM_NOTES),
+        filename="items_template.xlsx",
+    )
+
+
+@lru_cache(maxsize=None)
+def companies_template() -> Template:
+    return Template(
+        body=_render("Companies", COMPANY_COLUMNS, COMPANY_NOTES, wrap_notes=False),
+        etag=make_etag("companies", TEMPLATE_VERSION, COMPANY_COLUMNS, COMPANY_NOTES),
+        filename="companies_template.xlsx",
+    )
+
+
+_live_lock = threading.Lock()
+_live: Template | None = None
+
+
+def live_items_template(categories: list[str], tags: list[str], source_etags: tuple[str, str]) -> Template:
+    """
+    The items template with category / tag dropdowns. source_etags are the
+    ETags of the cached category and tag lists; only the latest rendering
+    is kept, and it's reused until they change.
+    """
+    global _live
+    etag = make_etag("items-live", TEMPLATE_VERSION, ITEM_COLUMNS, ITEM_NOTES, source_etags)
+    with _live_lock:
+        if _live is not None and _live.etag == etag:
+            return _live
+    template = Template(
+        body=_render("Items", ITEM_COLUMNS, ITEM_NOTES, wrap_notes=True, lists={"category": categories, "tags": tags}),
+        etag=etag,
+        filename="items_template.xlsx",
+    )
+    with _live_lock:
+        _live = template
+    return template
+
+
+def warm():
+    """Render the static templates now, so no download pays for it."""
+    items_template()
+    companies_template()
@@ -0,0 +1,78 @@
+"""
+In-process cache for reference data — categories, tags, companies, vessels.
+
+These lists are read on nearly every page load and change a few times a
+day. Entries expire after a TTL and are dropped explicitly by the write
+paths that change them (reference_cache.invalidate("tags") after commit).
+
+Each namespace carries a version number that invalidate() bumps. A load
+that started before an invalidation is not stored, so a slow reader can't
+put stale data back into the cache after a write.
+
+The cache is per process: with several workers, an invalidation only
+reaches the worker that handled the write, and the TTL bounds how stale
+the others can be.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from app.core.config import settings
+
+
+class ReferenceCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, tuple[int, float, object]] = {}  # (ns, key) -> (version, expires, value)
+        self._versions: dict[str, int] = defaultdict(int)
+        self._hits: dict[str, int] = defaultdict(int)
+        self._misses: dict[str, int] = defaultdict(int)
+
+    def get(self, namespace: str, key, loader):
+        """Return the cached value, or call loader() and cache what it returns.
+
+        loader runs outside the lock and must return plain data (schemas,
+        dicts) — never ORM objects tied to a request's session.
+        """
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions[namespace]
+            entry = self._entries.get((namespace, key))
+            if entry and entry[0] == version and entry[1] > now:
+                self._hits[namespace] += 1
+                return entry[2]
+            self._misses[namespace] += 1
+
+        value = loader()
+
+        with self._lock:
+            if self._versions[namespace] == version:
+                self._entries[(namespace, key)] = (version, now + self.ttl, value)
+        return value
+
+    def invalidate(self, *namespaces: str):
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] += 1
+            self._entries = {k: v for k, v in self._entries.items() if k[0] not in namespaces}
+
+    def stats(self) -> dict:
+        with self._lock:
+            names = sorted(set(self._versions) | set(self._hits) | set(self._misses))
+            return {
+                "ttl": self.ttl,
+                "namespaces": {
+                    ns: {
+                        "version": self._versions[ns],
+                        "entries": sum(1 for k in self._entries if k[0] == ns),
+                        "hits": self._hits[ns],
+                        "misses": self._misses[ns],
+                    }
+                    for ns in names
+                },
+            }
+
+
+reference_cache = ReferenceCache(ttl=settings.REFERENCE_CACHE_TTL)
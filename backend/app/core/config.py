@@ -7,6 +7,30 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ALLOWED_ORIGIN: str = "http://localhost:5173"
+    REFERENCE_CACHE_TTL: int = 300  # seconds — categories, tags, companies, vessels
+    AUTH_TRUST_CLAIMS: bool = True  # authenticate from signed token claims, no users lookup per request
+    AUTH_USER_CACHE_TTL: int = 30  # seconds — full user rows for /users/me
+    AUTH_REVOCATION_SYNC_SECONDS: int = 30  # how often each worker reloads deactivations / revocations
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt processes per API worker
+    PASSWORD_HASH_MAX_PENDING: int = 64  # hashes queued or running before logins get a 503
+    MAX_IMAGE_UPLOAD_BYTES: int = 10 * 1024 * 1024  # item images, company logos
+    MAX_SPREADSHEET_UPLOAD_BYTES: int = 20 * 1024 * 1024  # synchronous bulk previews
+    BULK_JOB_MAX_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    MEDIA_GRACE_SECONDS: int = 600  # unreferenced media objects younger than this are never deleted
+    MEDIA_CACHE_BYTES: int = 64 * 1024 * 1024  # per API worker — small immutable media files kept in memory
+    MEDIA_CACHE_MAX_FILE_BYTES: int = 256 * 1024
+    MEDIA_CACHE_RECHECK_SECONDS: int = 60  # cached media files are re-checked to still exist this often
+    MEDIA_SIDECARS: bool = True  # serve <file>.br / <file>.gz to clients that accept them
+    IMAGE_VARIANTS: bool = True  # thumb / card / full copies of uploaded images — needs Pillow, checked at startup
+    IMAGE_VARIANT_FORMAT: str = "webp"  # webp | jpeg — after changing it, run the backfill with --force
+    IMAGE_VARIANT_QUALITY: int = 80
+    BULK_STAGING_TTL_HOURS: int = 24  # staged previews not confirmed by then are dropped
+    BULK_JOB_DIR: str = "bulk_jobs"  # uploads waiting for a background bulk job — not under media/
+    BULK_JOB_WORKERS: int = 2  # bulk jobs run at once per API worker
+    BULK_JOB_CHUNK_ROWS: int = 1000  # rows per commit
+    BULK_JOB_MAX_ROWS: int = 500_000
+    BULK_JOB_MAX_ERRORS: int = 1000  # row errors kept on the job (all are counted)
+    BULK_JOB_STALE_SECONDS: int = 300  # a running job without a heartbeat this long is taken over
 
     class Config:
         env_file = ".env"
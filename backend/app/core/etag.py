@@ -0,0 +1,45 @@
+"""
+Strong ETags for JSON reads, so clients on metered links can revalidate
+instead of re-downloading.
+
+ETags are built from what determines the body — row ids, updated_at
+columns, per-vessel flags, the query string — not from the serialized
+body, so a 304 is decided before any response is rendered.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+# Let browsers keep the body but revalidate it on every use
+REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison — ignore any W/ prefix
+    return etag in (t.strip().removeprefix("W/") for t in header.split(","))
+
+
+def check_etag(request: Request, response: Response, etag: str, cache_control: str = REVALIDATE) -> Response | None:
+    """Return a 304 response if the client already has this version, else tag `response` and return None."""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return None
+
+
+def with_etag(payload: list) -> tuple[list, str]:
+    """Pair a list of schemas / dicts with an ETag over its content — for cached reference lists."""
+    return payload, make_etag([p.model_dump() if isinstance(p, BaseModel) else p for p in payload])
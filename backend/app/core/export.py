@@ -0,0 +1,328 @@
+"""
+Requisition export — XLSX, CSV and TSV, streamed.
+
+The old export built a regular openpyxl Workbook, walked every cell twice
+(borders, then column widths) and buffered the file in memory. Here:
+
+  - column widths come from one SQL max(length(...)) query up front, since
+    write-only sheets can't be measured after the fact
+  - lines are read through a server-side cursor (yield_per) on a session
+    of the export's own, so the request's session isn't held open
+  - rows go into an openpyxl write_only workbook, which keeps only the
+    current row in memory: each sheet's rows are spooled to a temporary
+    file of openpyxl's own, and nothing can be sent before wb.save()
+    assembles them
+  - that save, and the ZIP around several workbooks, is written on a
+    thread into a pipe (piped) and sent in CHUNK_SIZE pieces as the
+    container is built, rather than into another temporary file first —
+    a ZIP's first workbook goes out while the next one's rows are still
+    being read
+  - CSV / TSV are generated and sent row by row
+
+Several requisitions can go out as one workbook (a sheet each) or as a
+ZIP of workbooks; either way their lines come from a single query.
+"""
+
+import csv
+import io
+import queue
+import threading
+import zipfile
+from contextlib import closing
+from typing import Iterable, Iterator
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from sqlalchemy import String, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.company import Company
+from app.models.item import Item
+from app.models.requisition import Requisition
+from app.models.requisition_item import RequisitionItem
+from app.models.vessel import Vessel
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MEDIA_TYPES = {
+    "xlsx": XLSX_MEDIA_TYPE,
+    "csv": "text/csv; charset=utf-8",
+    "tsv": "text/tab-separated-values; charset=utf-8",
+}
+
+LINE_HEADERS = ["Nr", "Item", "Unit", "Qty", "Received", "Description"]
+HEADER_LABELS = ["Requisition ID", "Status", "Vessel", "Supplier", "Created"]
+
+CHUNK_SIZE = 64 * 1024
+PIPE_DEPTH = 16  # chunks a piped writer may run ahead of the response
+YIELD_PER = 1000
+
+
+# ── Queries ──────────────────────────────────────────────────────────────────
+
+def load_headers(db: Session, vessel_id: int, req_ids: Iterable[int]) -> list[dict]:
+    """Header fields for each requisition, ordered by id — the order lines are streamed in."""
+    rows = db.execute(
+        select(Requisition.id, Requisition.status, Requisition.created_at, Vessel.name, Company.name)
+        .outerjoin(Vessel, Vessel.id == Requisition.vessel_id)
+        .outerjoin(Company, Company.id == Requisition.supplier_id)
+        .where(Requisition.vessel_id == vessel_id, Requisition.id.in_(list(req_ids)))
+        .order_by(Requisition.id)
+    )
+    return [
+        {"id": id, "status": status, "created_at": created_at, "vessel": vessel or "", "supplier": supplier or ""}
+        for id, status, created_at, vessel, supplier in rows
+    ]
+
+
+def _header_block(header: dict) -> list[tuple[str, object]]:
+    values = [header["id"], header["status"], header["vessel"], header["supplier"], header["created_at"].strftime("%d-%m-%Y")]
+    return list(zip(HEADER_LABELS, values))
+
+
+def load_widths(db: Session, headers: list[dict]) -> dict[int, list[float]]:
+    """Column widths per requisition, measured in SQL rather than by walking cells."""
+    length = lambda col: func.coalesce(func.max(func.length(col)), 0)
+    rows = db.execute(
+        select(
+            RequisitionItem.requisition_id,
+            func.count(RequisitionItem.id),
+            length(Item.name),
+            length(Item.unit),
+            length(cast(RequisitionItem.quantity, String)),
+            length(cast(RequisitionItem.received_qty, String)),
+            length(Item.desc_short),
+        )
+        .join(Item, Item.id == RequisitionItem.item_id)
+        .where(RequisitionItem.requisition_id.in_([h["id"] for h in headers]))
+        .group_by(RequisitionItem.requisition_id)
+    )
+    measured = {req_id: [len(str(count)), *lengths] for req_id, count, *lengths in rows}
+
+    widths = {}
+    for header in headers:
+        cols = [max(len(h), n) for h, n in zip(LINE_HEADERS, measured.get(header["id"], [0] * len(LINE_HEADERS)))]
+        # The header block sits in the Item (labels) and Unit (values) columns
+        block = _header_block(header)
+        cols[1] = max(cols[1], *(len(label) for label, _ in block))
+        cols[2] = max(cols[2], *(len(str(value)) for _, value in block))
+        widths[header["id"]] = [c + 4 for c in cols]
+    return widths
+
+
+def iter_lines(req_ids: Iterable[int]) -> Iterator[tuple]:
+    """
+    (requisition_id, item name, unit, qty, received, description) for every
+    line, ordered by requisition then line. Streams from a server-side
+    cursor on its own session — safe to consume after the request's
+    session has closed, as StreamingResponse does.
+    """
+    stmt = (
+        select(
+            RequisitionItem.requisition_id,
+            Item.name,
+            Item.unit,
+            RequisitionItem.quantity,
+            RequisitionItem.received_qty,
+            Item.desc_short,
+        )
+        .join(Item, Item.id == RequisitionItem.item_id)
+        .where(RequisitionItem.requisition_id.in_(list(req_ids)))
+        .order_by(RequisitionItem.requisition_id, RequisitionItem.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    db = SessionLocal()
+    try:
+        yield from db.execute(stmt)
+    finally:
+        db.close()
+
+
+def _group_lines(headers: list[dict], lines: Iterator[tuple]) -> Iterator[tuple[dict, Iterator[list]]]:
+    """Pair each header with its own lines, numbered — headers and lines must both be in id order."""
+    lines = iter(lines)
+    pending = next(lines, None)
+    for header in headers:
+        def rows(req_id=header["id"]):
+            nonlocal pending
+            nr = 0
+            while pending is not None and pending[0] == req_id:
+                nr += 1
+                _, name, unit, qty, received, desc = pending
+                yield [nr, name, unit, qty, received or 0, desc or ""]
+                pending = next(lines, None)
+        yield header, rows()
+
+
+# ── XLSX ─────────────────────────────────────────────────────────────────────
+
+def _styles(wb: Workbook) -> dict:
+    thin = Side(border_style="thin")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    styles = {
+        "column_header": NamedStyle(
+            "export_column_header",
+            font=Font(bold=True),
+            border=border,
+            alignment=Alignment(horizontal="center", vertical="center"),
+        ),
+        "line": NamedStyle("export_line", border=border, alignment=Alignment(vertical="center")),
+    }
+    for style in styles.values():
+        wb.add_named_style(style)
+    return styles
+
+
+def write_sheet(wb: Workbook, styles: dict, header: dict, widths: list[float], rows: Iterable[list], title: str):
+    ws = wb.create_sheet(title)
+    # Write-only sheets take column settings only before the first row
+    for idx, width in enumerate(widths):
+        ws.column_dimensions[chr(ord("A") + idx)].width = width
+
+    for label, value in _header_block(header):
+        ws.append([None, label, value])
+    ws.append([])
+
+    def styled(values, style):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            cells.append(cell)
+        return cells
+
+    ws.append(styled(LINE_HEADERS, styles["column_header"].name))
+    line_style = styles["line"].name
+    for row in rows:
+        ws.append(styled(row, line_style))
+
+
+def write_workbook(target, headers: list[dict], widths: dict[int, list[float]], lines: Iterator[tuple], titles=None):
+    """One sheet per header into a write_only workbook saved to `target` (a path or binary file)."""
+    wb = Workbook(write_only=True)
+    styles = _styles(wb)
+    for header, rows in _group_lines(headers, lines):
+        title = titles(header) if titles else "Requisition"
+        write_sheet(wb, styles, header, widths[header["id"]], rows, title)
+    wb.save(target)
+
+
+class _Cancelled(Exception):
+    """The reader of a pipe has gone — the client disconnected."""
+
+
+_EOF = object()
+
+
+class _Pipe:
+    """
+    Write end of piped(): a file that can't seek or tell, whose bytes go to
+    the reader in CHUNK_SIZE pieces through a bounded queue.
+    """
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=PIPE_DEPTH)
+        self.cancelled = threading.Event()
+        self._buf = bytearray()
+
+    def write(self, data) -> int:
+        self._buf += data
+        while len(self._buf) >= CHUNK_SIZE:
+            self._put(bytes(self._buf[:CHUNK_SIZE]))
+            del self._buf[:CHUNK_SIZE]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _put(self, item):
+        while True:
+            if self.cancelled.is_set():
+                raise _Cancelled
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def run(self, write):
+        try:
+            write(self)
+            if self._buf:
+                self._put(bytes(self._buf))
+            self._put(_EOF)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            try:
+                self._put(e)
+            except _Cancelled:
+                pass
+
+
+def piped(write) -> Iterator[bytes]:
+    """
+    Run write(file) on a thread and yield what it writes as it goes. The
+    file is not seekable, so zipfile (and openpyxl, which saves through it)
+    writes in streaming mode, sizes in data descriptors after each entry.
+    """
+    pipe = _Pipe()
+    writer = threading.Thread(target=pipe.run, args=(write,), name="export-pipe", daemon=True)
+    writer.start()
+    try:
+        while (item := pipe.queue.get()) is not _EOF:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        pipe.cancelled.set()
+        writer.join()
+
+
+def write_zip(target, headers: list[dict], widths: dict[int, list[float]], lines: Iterator[tuple]):
+    """A ZIP of one workbook per requisition, fed from a single stream of lines."""
+    # xlsx files are already deflated — store them as they are
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_STORED) as zf:
+        for header, rows in _group_lines(headers, lines):
+            wb = Workbook(write_only=True)
+            write_sheet(wb, _styles(wb), header, widths[header["id"]], rows, "Requisition")
+            with zf.open(f"requisition_{header['id']}.xlsx", "w") as entry:
+                wb.save(entry)
+
+
+def xlsx_chunks(headers: list[dict], widths: dict[int, list[float]], titles=None) -> Iterator[bytes]:
+    """
+    A workbook of the given requisitions. Their lines are read into the
+    sheets' temporary files first; only the saved container is streamed.
+    """
+    def write(f):
+        with closing(iter_lines([h["id"] for h in headers])) as lines:
+            write_workbook(f, headers, widths, lines, titles)
+    yield from piped(write)
+
+
+def zip_chunks(headers: list[dict], widths: dict[int, list[float]]) -> Iterator[bytes]:
+    """Stream a ZIP of per-requisition workbooks as it's built; all their lines come from one query."""
+    def write(f):
+        with closing(iter_lines([h["id"] for h in headers])) as lines:
+            write_zip(f, headers, widths, lines)
+    yield from piped(write)
+
+
+# ── CSV / TSV ────────────────────────────────────────────────────────────────
+
+def delimited_chunks(headers: list[dict], lines: Iterator[tuple], delimiter: str) -> Iterator[bytes]:
+    """The line table as CSV / TSV — no header block, since a flat file has nowhere to put it."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=delimiter)
+    writer.writerow(LINE_HEADERS)
+    for _, rows in _group_lines(headers, lines):
+        for row in rows:
+            writer.writerow(row)
+            if buf.tell() >= CHUNK_SIZE:
+                yield buf.getvalue().encode()
+                buf.seek(0)
+                buf.truncate()
+    yield buf.getvalue().encode()
+
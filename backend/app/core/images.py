@@ -0,0 +1,120 @@
+"""
+Resized variants of item images and company logos.
+
+Originals are kept as uploaded; next to each one go smaller copies
+
+    media/items/<uuid>.jpg
+    media/items/<uuid>.thumb.webp    96 px   list rows, dropdowns
+    media/items/<uuid>.card.webp     400 px  cards, edit forms
+    media/items/<uuid>.full.webp     1600 px detail pages
+
+(longest side, never upscaled, EXIF orientation applied), so list views
+fetch a few kB instead of the camera original. Variant paths follow from
+the original's; whether they exist is checked once, when they are made,
+and kept in items.image_variants_ready / companies.logo_variants_ready, so
+the Item.image_variants and Company.logo_variants properties (in ItemOut
+and CompanyOut) never touch the disk.
+
+Pillow is in requirements.txt; the app refuses to start without it unless
+IMAGE_VARIANTS is turned off, in which case uploads are stored exactly as
+before and clients keep using image_path. Existing files are converted
+with `python -m app.backfill_image_variants`.
+"""
+
+import os
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # reported by require_pillow() rather than on import
+    Image = None
+
+from app.core.config import settings
+
+# name → longest side in px, largest first so each is resized from the previous
+VARIANTS = {"full": 1600, "card": 400, "thumb": 96}
+VARIANT_FORMATS = {"webp": ("WEBP", "webp"), "jpeg": ("JPEG", "jpg")}
+
+
+def variants_enabled() -> bool:
+    return settings.IMAGE_VARIANTS and Image is not None
+
+
+def require_pillow():
+    """Raise if variants are configured but Pillow can't be imported — run at startup."""
+    if settings.IMAGE_VARIANTS and Image is None:
+        raise RuntimeError(
+            "IMAGE_VARIANTS is on but Pillow is not installed — "
+            "pip install -r requirements.txt, or set IMAGE_VARIANTS=false"
+        )
+
+
+def _format() -> tuple[str, str]:
+    return VARIANT_FORMATS.get(settings.IMAGE_VARIANT_FORMAT, VARIANT_FORMATS["webp"])
+
+
+def variant_path(path: str, name: str) -> str:
+    stem, _ = os.path.splitext(path)
+    return f"{stem}.{name}.{_format()[1]}"
+
+
+def is_variant(path: str) -> bool:
+    stem, ext = os.path.splitext(path)
+    return ext.lstrip(".").lower() in {e for _, e in VARIANT_FORMATS.values()} and \
+        os.path.splitext(stem)[1].lstrip(".") in VARIANTS
+
+
+def variant_urls(path: str | None) -> dict[str, str] | None:
+    """{name: path} of an original's variants — callers check they were made."""
+    if not path or not variants_enabled():
+        return None
+    return {name: variant_path(path, name) for name in VARIANTS}
+
+
+def has_variants(path: str) -> bool:
+    """Whether the variants of `path` are on disk — for the *_variants_ready columns."""
+    return variants_enabled() and os.path.exists(variant_path(path, "thumb"))
+
+
+def make_variants(path: str) -> bool:
+    """
+    Write every variant of the image at `path`. False (and nothing written)
+    when variants are off or the file isn't an image Pillow can read.
+    """
+    if not variants_enabled():
+        return False
+    pil_format, _ = _format()
+    try:
+        with Image.open(path) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (OSError, Image.DecompressionBombError):
+        return False
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    if has_alpha and pil_format == "JPEG":
+        # JPEG has no alpha — flatten onto white
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    part = None
+    try:
+        for name, size in VARIANTS.items():
+            image.thumbnail((size, size), Image.LANCZOS)
+            part = f"{variant_path(path, name)}.part"
+            image.save(part, pil_format, quality=settings.IMAGE_VARIANT_QUALITY, optimize=True)
+            os.replace(part, variant_path(path, name))
+    except OSError:
+        if part and os.path.exists(part):
+            os.remove(part)
+        remove_variants(path)
+        return False
+    return True
+
+
+def remove_variants(path: str):
+    for name in VARIANTS:
+        target = variant_path(path, name)
+        if os.path.exists(target):
+            os.remove(target)
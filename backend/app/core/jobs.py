@@ -0,0 +1,274 @@
+"""
+Background bulk item uploads — POST /bulk/jobs, polled via GET /bulk/jobs/{id}.
+
+A synchronous upload is capped at MAX_ROWS and has to finish inside one
+HTTP request. A job instead stores the upload under BULK_JOB_DIR, records
+a bulk_jobs row and returns; a small in-process thread pool then works
+through the sheet in chunks of BULK_JOB_CHUNK_ROWS:
+
+  - "preview" classifies rows as new / duplicate / error and counts them
+  - "import" also applies them — new rows are created, duplicates skipped
+    or updated (on_duplicate), through the set-based bulk_engine
+
+The sheet is read in openpyxl's streaming mode and each chunk is committed
+together with the job's counters and last_row, so memory stays bounded
+however long the file is, and a job cut off mid-way (restart, crash) is
+picked up from its last committed chunk when a worker next starts.
+
+Several API processes may share the table: a job is claimed with a
+conditional UPDATE, and a "running" job is only taken over once its
+heartbeat is BULK_JOB_STALE_SECONDS old. While a job runs, a timer thread
+bumps the heartbeat every third of that, however slow a chunk is. Every
+commit — heartbeat, chunk, final status — is conditional on heartbeat_at
+still holding the value this runner last wrote (_Lease); if a runner
+stalled long enough to be taken over, its commit matches no row, is rolled
+back, and it drops the job without writing anything more.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+from uuid import UUID
+
+from openpyxl import load_workbook
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.bulk_engine import data_rows, import_items, mark_duplicates, read_item_rows
+from app.core.cache import reference_cache
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.bulk_job import BulkJob
+from app.models.category import Category
+from app.models.item import Item
+from app.schemas.bulk import ItemConfirmRow
+
+
+class JobStopped(Exception):
+    """The runner is shutting down — the job goes back to the queue."""
+
+
+class JobLost(Exception):
+    """Another runner took the job over — leave it to that one."""
+
+
+class _Lease:
+    """
+    A claimed job's ownership, held as the heartbeat_at value this runner
+    last wrote. commit() publishes a session's changes only while the row
+    still has that value; a background thread renews it every `interval`.
+    """
+
+    def __init__(self, job_id: UUID, heartbeat_at: datetime, interval: float):
+        self.job_id = job_id
+        self.interval = interval
+        self.lost = threading.Event()
+        self._mine = heartbeat_at
+        self._lock = threading.Lock()  # one conditional UPDATE + commit at a time
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._keep_alive, name=f"bulk-job-heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+
+    def commit(self, db: Session) -> bool:
+        """Bump the heartbeat and commit db's transaction if the job is still ours; else roll back, False."""
+        with self._lock:
+            now = datetime.utcnow()
+            matched = not self.lost.is_set() and db.execute(
+                update(BulkJob)
+                .where(BulkJob.id == self.job_id, BulkJob.heartbeat_at == self._mine)
+                .values(heartbeat_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount == 1
+            if not matched:
+                db.rollback()
+                self.lost.set()
+                return False
+            db.commit()
+            self._mine = now
+            return True
+
+    def _keep_alive(self):
+        db = SessionLocal()
+        try:
+            while not self._done.wait(self.interval):
+                try:
+                    if not self.commit(db):
+                        return
+                except Exception:
+                    db.rollback()  # a database hiccup — try again next interval
+        finally:
+            db.close()
+
+
+class BulkJobRunner:
+    def __init__(self, workers: int, chunk_rows: int, max_rows: int, max_errors: int, stale_seconds: int):
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.max_rows = max_rows
+        self.max_errors = max_errors
+        self.stale_seconds = stale_seconds
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start the pool and pick up jobs left queued or abandoned by a previous process."""
+        self._ensure_executor()
+        db = SessionLocal()
+        try:
+            pending = db.execute(select(BulkJob.id).where(self._claimable()).order_by(BulkJob.created_at)).scalars().all()
+        finally:
+            db.close()
+        for job_id in pending:
+            self.submit(job_id)
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._stopping.clear()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-job")
+            return self._executor
+
+    def submit(self, job_id: UUID):
+        self._ensure_executor().submit(self._run, job_id)
+
+    def shutdown(self):
+        self._stopping.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # ── Claiming ─────────────────────────────────────────────────────────
+
+    def _claimable(self):
+        stale = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+        return or_(
+            BulkJob.status == "queued",
+            (BulkJob.status == "running") & (BulkJob.heartbeat_at < stale),
+        )
+
+    def _claim(self, db: Session, job_id: UUID) -> _Lease | None:
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(BulkJob)
+            .where(BulkJob.id == job_id, self._claimable())
+            .values(status="running", started_at=func.coalesce(BulkJob.started_at, now), heartbeat_at=now)
+        ).rowcount
+        db.commit()
+        return _Lease(job_id, now, interval=self.stale_seconds / 3) if claimed == 1 else None
+
+    # ── Running ──────────────────────────────────────────────────────────
+
+    def _run(self, job_id: UUID):
+        # The job row is only written by _Lease.commit, under its lock — an
+        # autoflush elsewhere could lock the row while the heartbeat thread
+        # holds the lease lock and waits on it
+        db = SessionLocal(autoflush=False)
+        try:
+            lease = self._claim(db, job_id)
+            if lease is None:
+                return  # finished, or another worker has it
+            job = db.get(BulkJob, job_id)
+            with lease:
+                try:
+                    self._process(db, job, lease)
+                except JobLost:
+                    return
+                except JobStopped:
+                    db.rollback()
+                    job.status = "queued"
+                    lease.commit(db)
+                    return
+                except Exception as e:
+                    db.rollback()
+                    job.status = "failed"
+                    job.error = str(e)
+                else:
+                    job.status = "done"
+                job.finished_at = datetime.utcnow()
+                if not lease.commit(db):
+                    return
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+            if job.mode == "import":
+                # Manufacturers / suppliers may have been created or re-flagged
+                reference_cache.invalidate("companies")
+        finally:
+            db.close()
+
+    def _process(self, db: Session, job: BulkJob, lease: _Lease):
+        categories = {name.lower() for name in db.execute(select(Category.name)).scalars()}
+        seen_in_file: set[str] = set()
+
+        wb = load_workbook(job.file_path, read_only=True, data_only=True)
+        try:
+            rows = islice(data_rows(wb.active), self.max_rows)
+            previews = read_item_rows(rows, categories, seen_in_file)
+            while chunk := list(islice(previews, self.chunk_rows)):
+                if lease.lost.is_set():
+                    raise JobLost
+                if self._stopping.is_set():
+                    raise JobStopped
+                # Already committed before an interruption — parsed again
+                # only to rebuild seen_in_file
+                chunk = [p for p in chunk if p.row > job.last_row]
+                if chunk:
+                    self._process_chunk(db, job, chunk)
+                    if not lease.commit(db):
+                        raise JobLost
+        finally:
+            wb.close()
+
+    def _process_chunk(self, db: Session, job: BulkJob, chunk: list):
+        mark_duplicates(db, chunk, max_item_id=job.baseline_item_id)
+        errors = [f"Row {p.row}: {p.error}" for p in chunk if p.status == "error"]
+
+        if job.mode == "import":
+            actions = {"new": "create", "duplicate": "update" if job.on_duplicate == "update" else "skip"}
+            result = import_items(db, [
+                ItemConfirmRow(**p.model_dump(exclude={"status", "error"}), action=actions[p.status])
+                for p in chunk if p.status != "error"
+            ], created_by=job.created_by)
+            job.created += result.created
+            job.updated += result.updated
+            job.skipped += result.skipped
+            errors += result.errors
+
+        job.new_count += sum(1 for p in chunk if p.status == "new")
+        job.duplicate_count += sum(1 for p in chunk if p.status == "duplicate")
+        job.error_count += sum(1 for p in chunk if p.status == "error")
+        job.rows_done += len(chunk)
+        job.last_row = chunk[-1].row
+        if len(job.errors) < self.max_errors:
+            job.errors = job.errors + errors[:self.max_errors - len(job.errors)]
+
+
+def new_job(db: Session, **values) -> BulkJob:
+    """A queued job row, its baseline set to the newest existing item."""
+    job = BulkJob(
+        baseline_item_id=db.execute(select(func.coalesce(func.max(Item.id), 0))).scalar(),
+        **values,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+bulk_jobs = BulkJobRunner(
+    workers=settings.BULK_JOB_WORKERS,
+    chunk_rows=settings.BULK_JOB_CHUNK_ROWS,
+    max_rows=settings.BULK_JOB_MAX_ROWS,
+    max_errors=settings.BULK_JOB_MAX_ERRORS,
+    stale_seconds=settings.BULK_JOB_STALE_SECONDS,
+)
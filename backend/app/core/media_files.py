@@ -0,0 +1,200 @@
+"""
+/media — StaticFiles with caching headers for slow links.
+
+StaticFiles already answers conditional requests (ETag, Last-Modified,
+304) and byte ranges, but sends no Cache-Control, so browsers re-check
+every image on every page view. MediaFiles adds:
+
+  - Cache-Control: public, max-age=1 year, immutable for the content-
+    addressed store (core.media_store) — a path there never changes
+    content — and an ETag taken from the content hash in the file name,
+    so it survives the store touching the file on a dedupe
+  - Cache-Control: no-cache for older media/items, media/companies paths,
+    which keep StaticFiles' stat-based validators
+  - precompressed sidecars (MEDIA_SIDECARS): for compressible types, a
+    <file>.br or <file>.gz next to the file is sent to clients accepting
+    that encoding, as long as <file> itself is still there; like variants,
+    sidecars are deleted with their original (core.media_store, media_gc)
+  - an in-process LRU of small immutable files (MEDIA_CACHE_BYTES), served
+    without a stat or open; a store path can't change content, but it can
+    be deleted (release(), media_gc), so an entry is re-checked to exist
+    once it is MEDIA_CACHE_RECHECK_SECONDS old and dropped if it doesn't
+
+Compare with the plain mount: `python -m app.bench_media`.
+"""
+
+import os
+import stat
+import time
+from collections import OrderedDict
+from mimetypes import guess_type
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"
+
+# (Content-Encoding, sidecar suffix), in order of preference
+SIDECARS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_TYPES = {"image/svg+xml", "image/bmp", "image/x-icon", "image/vnd.microsoft.icon", "image/tiff"}
+
+
+def sidecar_original(path: str) -> str | None:
+    """The file a <file>.br / <file>.gz sidecar belongs to; None for anything else."""
+    for _, suffix in SIDECARS:
+        # Only compressible types have sidecars — an upload named <hash>.gz is an original
+        if path.endswith(suffix) and guess_type(path[: -len(suffix)])[0] in COMPRESSIBLE_TYPES:
+            return path[: -len(suffix)]
+    return None
+
+
+def _accepts(accept_encoding: str, encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == encoding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class _Cached:
+    __slots__ = ("body", "headers", "full_path", "checked_at")
+
+    def __init__(self, body: bytes, headers: dict[str, str], full_path: str):
+        self.body = body
+        self.headers = headers
+        self.full_path = full_path
+        self.checked_at = time.monotonic()
+
+
+class _LRU:
+    """Bodies and headers of small files, bounded by total body bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, _Cached] = OrderedDict()
+
+    def get(self, key: str) -> _Cached | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.body)
+
+    def put(self, key: str, entry: _Cached):
+        if key in self._entries or len(entry.body) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.size += len(entry.body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.body)
+
+
+class MediaFiles(StaticFiles):
+    def __init__(
+        self, *, directory: str, store_prefix: str, cache_bytes: int, max_cached_file: int, sidecars: bool,
+        recheck_seconds: float = 60,
+    ):
+        super().__init__(directory=directory)
+        self.store_root = os.path.realpath(os.path.join(directory, store_prefix))
+        self.max_cached_file = max_cached_file
+        self.sidecars = sidecars
+        self.recheck_seconds = recheck_seconds
+        self.cache = _LRU(cache_bytes)
+
+    def is_immutable(self, full_path) -> bool:
+        return os.path.commonpath([os.path.realpath(full_path), self.store_root]) == self.store_root
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        headers = Headers(scope=scope)
+        ranged = "range" in headers
+
+        if not ranged and scope["method"] in ("GET", "HEAD"):
+            if self.sidecars and guess_type(path)[0] in COMPRESSIBLE_TYPES:
+                response = await self._sidecar_response(path, scope, headers)
+                if response is not None:
+                    return response
+            entry = self.cache.get(path)
+            if entry is not None and await self._still_there(path, entry):
+                return self._cached_response(entry, headers, scope["method"])
+
+        response = await super().get_response(path, scope)
+        if (
+            not ranged
+            and type(response) is FileResponse
+            and response.status_code == 200
+            and response.stat_result.st_size <= self.max_cached_file
+            and self.is_immutable(response.path)
+        ):
+            body = await anyio.to_thread.run_sync(_read, response.path)
+            self.cache.put(path, _Cached(body, dict(response.headers), str(response.path)))
+        return response
+
+    async def _still_there(self, path: str, entry: _Cached) -> bool:
+        """False (and the entry dropped) if its file was deleted — checked once per recheck_seconds."""
+        now = time.monotonic()
+        if now - entry.checked_at < self.recheck_seconds:
+            return True
+        if await anyio.to_thread.run_sync(os.path.isfile, entry.full_path):
+            entry.checked_at = now
+            return True
+        self.cache.drop(path)
+        return False
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        return self._finish(response, full_path, Headers(scope=scope))
+
+    def _finish(self, response: FileResponse, full_path, request_headers: Headers, etag_suffix: str = "") -> Response:
+        if self.is_immutable(full_path):
+            # <sha256>[.variant].<ext> — the name is the content's identity
+            name = os.path.basename(full_path)
+            response.headers["etag"] = f'"{name.rsplit(".", 1)[0]}{etag_suffix}"'
+            response.headers["cache-control"] = IMMUTABLE
+        else:
+            response.headers["cache-control"] = REVALIDATE
+        if self.sidecars and guess_type(str(full_path))[0] in COMPRESSIBLE_TYPES:
+            response.headers["vary"] = "Accept-Encoding"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def _sidecar_response(self, path: str, scope: Scope, headers: Headers) -> Response | None:
+        accept_encoding = headers.get("accept-encoding", "")
+        if not any(_accepts(accept_encoding, encoding) for encoding, _ in SIDECARS):
+            return None
+        # A sidecar left behind by a deleted original must not keep it alive
+        _, original = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if original is None or not stat.S_ISREG(original.st_mode):
+            return None
+        for encoding, suffix in SIDECARS:
+            if not _accepts(accept_encoding, encoding):
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = FileResponse(full_path, stat_result=stat_result, media_type=guess_type(path)[0])
+            response.headers["content-encoding"] = encoding
+            # Ranges would index the compressed bytes — send whole
+            del response.headers["accept-ranges"]
+            return self._finish(response, full_path[: -len(suffix)], headers, etag_suffix=f"-{encoding}")
+        return None
+
+    def _cached_response(self, entry: _Cached, request_headers: Headers, method: str) -> Response:
+        if self.is_not_modified(Headers(entry.headers), request_headers):
+            return NotModifiedResponse(Headers(entry.headers))
+        return Response(b"" if method == "HEAD" else entry.body, headers=entry.headers)
+
+
+def _read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,207 @@
+"""
+Content-addressed media store for item images and company logos.
+
+Files are named by the SHA-256 of their content, sharded two levels deep
+so no directory grows past a few thousand entries:
+
+    media/objects/3f/a2/3fa2…e9.jpg
+    media/objects/3f/a2/3fa2…e9.thumb.webp    variants (see core.images)
+
+  - writes dedupe: a photo uploaded for 40 sibling items is stored, and
+    resized, once
+  - a path never changes content, so it can be cached forever
+  - references are counted from items.image_path and companies.logo_path
+    (both indexed) instead of a counter that could drift from them; when
+    the last one goes, release() deletes the file
+
+An object written within MEDIA_GRACE_SECONDS is never deleted: another
+request may have just deduped onto it and not committed yet. A dedupe
+always writes (or touches) the object, and release() moves an object
+aside before deleting it, re-checking its age once nothing can touch it
+any more — so an upload racing a release either finds the object gone
+and writes it again, or makes release() put it back. What the grace
+period leaves behind, and files from before the store (media/items,
+media/companies), are swept by `python -m app.media_gc`.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import UploadFile
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.images import has_variants, make_variants, remove_variants
+from app.core.media_files import SIDECARS
+from app.core.uploads import UPLOAD_CHUNK_SIZE, check_size, copy_limited
+from app.models.company import Company
+from app.models.item import Item
+
+MEDIA_ROOT = "media"
+STORE_DIR = f"{MEDIA_ROOT}/objects"
+TMP_DIR = f"{STORE_DIR}/tmp"  # same filesystem, so finished writes are renamed into place
+
+Path(TMP_DIR).mkdir(parents=True, exist_ok=True)
+
+EXT_ALIASES = {"jpeg": "jpg", "tif": "tiff"}
+
+# Columns holding media paths — everything that counts as a reference
+REFERENCES = (Item.image_path, Company.logo_path)
+# ... and the column recording whether each path's variants exist (core.images)
+VARIANTS_READY = {Item.image_path: Item.image_variants_ready, Company.logo_path: Company.logo_variants_ready}
+
+
+def normalize_ext(filename: str | None) -> str:
+    ext = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    ext = EXT_ALIASES.get(ext, ext)
+    return ext if ext.isalnum() and len(ext) <= 5 else "bin"
+
+
+def object_path(digest: str, ext: str) -> str:
+    return f"{STORE_DIR}/{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def is_object(path: str) -> bool:
+    return path.startswith(f"{STORE_DIR}/") and not path.startswith(f"{TMP_DIR}/")
+
+
+# ── Writing ──────────────────────────────────────────────────────────────────
+
+def put_upload(file: UploadFile, limit: int) -> str:
+    """Store an upload (413 past `limit`); returns its path, shared with any identical file."""
+    check_size(file, limit)
+    return _put(file.file, normalize_ext(file.filename), limit)
+
+
+def put_file(source: str | os.PathLike, limit: int | None = None, link: bool = False) -> str:
+    """
+    Store a local file; returns its path. With link=True a new object is a
+    hard link to `source` rather than a copy (falling back to copying on
+    another filesystem) — only for sources nothing will modify in place.
+    """
+    if link:
+        path = _link(source)
+        if path is not None:
+            return path
+    with open(source, "rb") as f:
+        return _put(f, normalize_ext(str(source)), limit if limit is not None else float("inf"))
+
+
+def _link(source) -> str | None:
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    path = object_path(digest.hexdigest(), normalize_ext(str(source)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        try:
+            os.link(source, path)
+        except FileExistsError:
+            try:
+                os.utime(path)  # restarts its grace period — see release()
+            except FileNotFoundError:  # released in between
+                os.link(source, path)
+    except OSError:  # another filesystem, or no hard links here
+        return None
+    return _with_variants(path)
+
+
+def _put(source, ext: str, limit) -> str:
+    fd, tmp = tempfile.mkstemp(dir=TMP_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            digest = copy_limited(source, out, limit)
+        path = object_path(digest, ext)
+        # Replaced even when it exists: same name, same content, and a fresh
+        # mtime restarts its grace period — with no window in which a
+        # release() could delete it between a check and a touch
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return _with_variants(path)
+
+
+def _with_variants(path: str) -> str:
+    if not has_variants(path):
+        make_variants(path)
+    return path
+
+
+# ── References ───────────────────────────────────────────────────────────────
+
+def reference_counts(db: Session, paths) -> dict[str, int]:
+    """{path: rows referencing it} over every column in REFERENCES."""
+    counts = dict.fromkeys({p for p in paths if p}, 0)
+    if not counts:
+        return counts
+    for column in REFERENCES:
+        rows = db.execute(select(column, func.count()).where(column.in_(list(counts))).group_by(column))
+        for path, n in rows:
+            counts[path] += n
+    return counts
+
+
+def referenced_paths(db: Session) -> set[str]:
+    """Every media path referenced anywhere — for the sweep in media_gc."""
+    paths: set[str] = set()
+    for column in REFERENCES:
+        paths.update(db.execute(select(column).where(column.is_not(None)).distinct()).scalars())
+    return paths
+
+
+def in_grace(path: str, now: float | None = None) -> bool:
+    try:
+        return os.path.getmtime(path) > (now or time.time()) - settings.MEDIA_GRACE_SECONDS
+    except FileNotFoundError:
+        return False
+
+
+def release(db: Session, *paths: str | None):
+    """
+    Delete files nothing references any more. Call after committing the
+    change that dropped the references.
+    """
+    for path, count in reference_counts(db, paths).items():
+        if count == 0 and not is_object(path):
+            remove(path)
+        elif count == 0 and not in_grace(path):
+            _retire(path)
+
+
+def _retire(path: str):
+    """
+    Delete an unreferenced store object unless an upload dedupes onto it
+    meanwhile. It is renamed aside first, so an upload from then on writes
+    a fresh copy; one that touched it just before shows in its mtime, and
+    it is put back.
+    """
+    fd, aside = tempfile.mkstemp(dir=TMP_DIR, suffix=".gone")
+    os.close(fd)
+    try:
+        os.replace(path, aside)
+    except FileNotFoundError:
+        os.remove(aside)
+        return
+    if in_grace(aside):
+        os.replace(aside, path)
+        return
+    os.remove(aside)
+    if not os.path.exists(path):  # else an upload has just written it again
+        remove(path)
+
+
+def remove(path: str):
+    """Delete a media file, its variants and its .br / .gz sidecars. Paths outside media/ are left alone."""
+    if not os.path.abspath(path).startswith(os.path.abspath(MEDIA_ROOT) + os.sep):
+        return
+    for target in (path, *(path + suffix for _, suffix in SIDECARS)):
+        if os.path.exists(target):
+            os.remove(target)
+    remove_variants(path)
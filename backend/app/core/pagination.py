@@ -0,0 +1,94 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+OFFSET pagination makes page N cost N pages of scanning, and every page pays
+for a COUNT(*). Keyset pagination instead remembers the sort key of the last
+row served and asks for rows strictly after it:
+
+    WHERE (name, id) > ('Oil filter', 812) ORDER BY name, id LIMIT 21
+
+With a matching composite index that is an index range scan no matter how
+deep the page is. The sort key is handed to the client as an opaque cursor.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values: tuple, direction: str) -> str:
+    payload = {
+        "k": [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        "d": direction,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, columns: list) -> tuple[tuple, str]:
+    """Returns (key values, "next" | "prev"). Raises 400 on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        values, direction = payload["k"], payload["d"]
+        if direction not in ("next", "prev") or len(values) != len(columns):
+            raise ValueError
+        return tuple(_load(v, col) for v, col in zip(values, columns)), direction
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _load(value, column):
+    if value is not None and column.type.python_type is datetime:
+        return datetime.fromisoformat(value)
+    return value
+
+
+def keyset_page(q, columns: list, cursor: str | None, page_size: int, descending: bool = False):
+    """
+    Fetch one page of q ordered by `columns` (all ascending, or all descending).
+    The last column must be unique (normally the primary key) so the key is total.
+
+    Returns (rows, next_cursor, prev_cursor); a cursor is None when there is
+    nothing further in that direction.
+    """
+    values, direction = decode_cursor(cursor, columns) if cursor else (None, "next")
+    backwards = direction == "prev"
+
+    # Walking backwards through a list is walking forwards through it reversed
+    reverse = descending != backwards
+    if values is not None:
+        key = tuple_(*columns)
+        q = q.filter(key < tuple_(*values) if reverse else key > tuple_(*values))
+
+    order = [c.desc() if reverse else c.asc() for c in columns]
+    rows = q.order_by(*order).limit(page_size + 1).all()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        # Ran off the end — offer a way back to where the cursor pointed
+        if values is None:
+            return rows, None, None
+        if backwards:
+            return rows, encode_cursor(values, "next"), None
+        return rows, None, encode_cursor(values, "prev")
+
+    first = tuple(getattr(rows[0], c.key) for c in columns)
+    last = tuple(getattr(rows[-1], c.key) for c in columns)
+
+    if backwards:
+        next_cursor = encode_cursor(last, "next")
+        prev_cursor = encode_cursor(first, "prev") if has_more else None
+    else:
+        next_cursor = encode_cursor(last, "next") if has_more else None
+        prev_cursor = encode_cursor(first, "prev") if values is not None else None
+
+    return rows, next_cursor, prev_cursor
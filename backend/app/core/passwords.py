@@ -0,0 +1,144 @@
+"""
+bcrypt hashing off the request threads.
+
+bcrypt is deliberately slow (~100-250 ms of CPU per hash). Run inline, a
+shift-change login burst occupies every anyio worker thread and every core,
+and catalogue reads queue up behind it. Instead, hashes run in a small
+dedicated process pool:
+
+  - PASSWORD_HASH_WORKERS processes — the most CPU that hashing can take
+  - at most PASSWORD_HASH_MAX_PENDING hashes queued or running; beyond that
+    callers get a 503 with Retry-After instead of waiting in an unbounded queue
+
+Async callers (login) await the pool without holding a worker thread. Sync
+callers (crew management, registration) block their thread on the result,
+which is fine for how rarely those run.
+
+The pool is started by the app's lifespan. Until then — CLI scripts such as
+Cheatsheets/create_superadmin.py, or a TestClient used without `with` —
+hashing runs in the calling thread, as it always did.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Run inside the pool processes — must stay module-level so they pickle
+def _verify(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+
+def _hash(plain: str) -> str:
+    return pwd_context.hash(plain)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._executor is not None:
+                return
+            # spawn, not fork — forking a threaded server process can copy held locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            executor = self._executor
+        # Start every worker now so the first logins don't pay for process startup
+        for future in [executor.submit(_hash, "warm-up") for _ in range(self.workers)]:
+            future.result()
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HTTPException(503, "Server busy, please try again", headers={"Retry-After": "1"})
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+    def _done(self, started: float):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._total_seconds += time.perf_counter() - started
+
+    def _submit(self, fn, *args) -> Future:
+        self._admit()
+        started = time.perf_counter()
+        try:
+            if self._executor is None:
+                future = Future()
+                future.set_result(fn(*args))
+            else:
+                future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._done(started)
+            raise
+        future.add_done_callback(lambda _: self._done(started))
+        return future
+
+    # ── Async — for endpoints on the event loop ──────────────────────────
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        if self._executor is None:
+            return await run_in_threadpool(self.verify_sync, plain, hashed)
+        return await asyncio.wrap_future(self._submit(_verify, plain, hashed))
+
+    async def hash(self, plain: str) -> str:
+        if self._executor is None:
+            return await run_in_threadpool(self.hash_sync, plain)
+        return await asyncio.wrap_future(self._submit(_hash, plain))
+
+    # ── Sync — for endpoints running in the threadpool ───────────────────
+
+    def verify_sync(self, plain: str, hashed: str) -> bool:
+        return self._submit(_verify, plain, hashed).result()
+
+    def hash_sync(self, plain: str) -> str:
+        return self._submit(_hash, plain).result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "queued": max(0, self._pending - self.workers),
+                "peak_pending": self._peak_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_latency_ms": round(self._total_seconds / self._completed * 1000, 1) if self._completed else None,
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,106 @@
+"""
+Token revocation for the claims-only auth path (settings.AUTH_TRUST_CLAIMS).
+
+When requests are authenticated from signed JWT claims alone, nothing checks
+users.is_active on each call. This list is what still lets the server turn
+a token away:
+
+  - deactivated users and vessels — every token is rejected
+  - users.tokens_valid_after — tokens issued before it are rejected
+    (set on password resets/changes and role changes)
+
+The write paths update it directly, so the worker that handled the change
+enforces it immediately. Every AUTH_REVOCATION_SYNC_SECONDS it is also
+reloaded from the database, which covers changes made through other worker
+processes and a freshly started process.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from app.core.config import settings
+
+
+class RevocationList:
+    def __init__(self, sync_interval: float):
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._inactive_users: set[UUID] = set()
+        self._inactive_vessels: set[int] = set()
+        self._valid_after: dict[UUID, datetime] = {}
+        self._synced_at = float("-inf")
+        self._generation = 0  # bumped by every local change
+
+    # ── Write-path hooks ──────────────────────────────────────────────────
+
+    def set_user_active(self, user_id: UUID, is_active: bool):
+        with self._lock:
+            (self._inactive_users.discard if is_active else self._inactive_users.add)(user_id)
+            self._generation += 1
+
+    def set_vessel_active(self, vessel_id: int, is_active: bool):
+        with self._lock:
+            (self._inactive_vessels.discard if is_active else self._inactive_vessels.add)(vessel_id)
+            self._generation += 1
+
+    def revoke_tokens(self, user_id: UUID, valid_after: datetime):
+        with self._lock:
+            self._valid_after[user_id] = valid_after
+            self._generation += 1
+
+    # ── Checks ────────────────────────────────────────────────────────────
+
+    def is_revoked(self, user_id: UUID, vessel_id: int | None, issued_at: datetime | None) -> bool:
+        self._maybe_sync()
+        with self._lock:
+            if user_id in self._inactive_users:
+                return True
+            if vessel_id is not None and vessel_id in self._inactive_vessels:
+                return True
+            valid_after = self._valid_after.get(user_id)
+            return valid_after is not None and (issued_at is None or issued_at < valid_after)
+
+    def _maybe_sync(self):
+        if time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        # One thread reloads; the rest carry on with the current snapshot
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                generation = self._generation
+            snapshot = self._load()
+            with self._lock:
+                # A local change landed while loading — the snapshot may predate
+                # its commit, so keep what we have and retry on the next request
+                if self._generation == generation:
+                    self._inactive_users, self._inactive_vessels, self._valid_after = snapshot
+                    self._synced_at = time.monotonic()
+        finally:
+            self._sync_lock.release()
+
+    def _load(self):
+        from app.database import SessionLocal
+        from app.models.user import User
+        from app.models.vessel import Vessel
+
+        # Older revocations are moot — every token issued before them has expired
+        horizon = datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        db = SessionLocal()
+        try:
+            inactive_users = {uid for (uid,) in db.query(User.id).filter(User.is_active == False)}
+            inactive_vessels = {vid for (vid,) in db.query(Vessel.id).filter(Vessel.is_active == False)}
+            valid_after = dict(
+                db.query(User.id, User.tokens_valid_after)
+                .filter(User.tokens_valid_after > horizon)
+                .all()
+            )
+        finally:
+            db.close()
+        return inactive_users, inactive_vessels, valid_after
+
+
+revocations = RevocationList(sync_interval=settings.AUTH_REVOCATION_SYNC_SECONDS)
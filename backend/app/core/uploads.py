@@ -0,0 +1,137 @@
+"""
+Size-limited uploads, copied in chunks.
+
+Starlette already spools multipart file parts to a temporary file (in
+memory up to 1 MB, on disk beyond). What used to undo that was
+`file.file.read()` — the whole upload pulled into one bytes object, and for
+spreadsheets wrapped again in a BytesIO. Here:
+
+  - save_upload copies an upload to its destination UPLOAD_CHUNK_SIZE bytes
+    at a time, via a .part file renamed into place, and stops with a 413
+    as soon as it passes its limit
+  - spreadsheets are opened straight from the spooled upload (open_workbook)
+  - UploadSizeGuard turns away uploads over the route's limit: from
+    Content-Length before the body is read at all, or, for chunked and
+    under-declared bodies, as soon as the bytes received pass it
+
+so what a request holds in memory no longer grows with the file.
+"""
+
+import hashlib
+import os
+import re
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from openpyxl import load_workbook
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Multipart overhead on top of the file itself — boundaries, part headers, small fields
+FORM_OVERHEAD = 64 * 1024
+
+# (method, path pattern, limit in bytes) for UploadSizeGuard
+UPLOAD_ROUTES = [
+    ("POST", re.compile(r"^/items/\d+/image$"), settings.MAX_IMAGE_UPLOAD_BYTES),
+    ("POST", re.compile(r"^/companies/\d+/logo$"), settings.MAX_IMAGE_UPLOAD_BYTES),
+    ("POST", re.compile(r"^/bulk/(items|companies)/preview$"), settings.MAX_SPREADSHEET_UPLOAD_BYTES),
+    ("POST", re.compile(r"^/bulk/jobs$"), settings.BULK_JOB_MAX_UPLOAD_BYTES),
+]
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(413, f"File too large (max {limit // (1024 * 1024)} MB)")
+
+
+def check_size(file: UploadFile, limit: int):
+    """413 if the spooled upload is already known to be over `limit`."""
+    if file.size is not None and file.size > limit:
+        raise _too_large(limit)
+
+
+def copy_limited(source, out, limit: int) -> str:
+    """Copy file object `source` into `out` in chunks, 413 past `limit`; returns the SHA-256 of what was copied."""
+    digest = hashlib.sha256()
+    written = 0
+    while chunk := source.read(UPLOAD_CHUNK_SIZE):
+        written += len(chunk)
+        if written > limit:
+            raise _too_large(limit)
+        digest.update(chunk)
+        out.write(chunk)
+    return digest.hexdigest()
+
+
+def save_upload(file: UploadFile, path: str, limit: int):
+    """Copy the upload to `path` in chunks; 413 (and nothing left behind) once it passes `limit`."""
+    check_size(file, limit)
+    part = f"{path}.part"
+    try:
+        with open(part, "wb") as out:
+            copy_limited(file.file, out, limit)
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+
+def open_workbook(file: UploadFile, limit: int):
+    """A read-only workbook straight from the spooled upload; 400 if it isn't one."""
+    check_size(file, limit)
+    try:
+        return load_workbook(file.file, read_only=True, data_only=True)
+    except Exception:
+        raise HTTPException(400, "Invalid Excel file")
+
+
+def _route_limit(scope: Scope) -> int | None:
+    for method, pattern, limit in UPLOAD_ROUTES:
+        if scope["method"] == method and pattern.match(scope["path"]):
+            return limit
+    return None
+
+
+class UploadSizeGuard:
+    """
+    ASGI middleware for UPLOAD_ROUTES. Every other request — /media, the
+    streaming exports, websockets, lifespan — is passed straight through.
+
+    An upload whose Content-Length is over the limit gets a 413 before its
+    body is read. Otherwise the body is counted as the app receives it, and
+    the receive that takes it past the limit raises the 413 instead of
+    returning the bytes, which ends the form parse (FastAPI re-raises
+    HTTPExceptions from it as they are).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = _route_limit(scope) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        max_body = limit + FORM_OVERHEAD
+        length = Headers(scope=scope).get("content-length")
+        if length and length.isdigit() and int(length) > max_body:
+            response = JSONResponse({"detail": _too_large(limit).detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    raise _too_large(limit)
+            return message
+
+        await self.app(scope, counting_receive, send)
@@ -6,6 +6,9 @@ from app.models.company import Company
 from app.models.tag import Tag
 from app.models.item import Item
 from app.models.vessel_item import VesselItem
+from app.models.vessel_item_last_ordered import VesselItemLastOrdered
 from app.models.category import Category
 from app.models.requisition import Requisition
 from app.models.requisition_item import RequisitionItem
+from app.models.bulk_job import BulkJob
+from app.models.bulk_staging import BulkStagedItem
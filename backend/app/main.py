@@ -1,12 +1,36 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import companies, items, auth, requisitions, categories, vessels, users, tags, bulk
+from app.routers import companies, items, auth, requisitions, categories, vessels, users, tags, bulk, stats
 from app.core.config import settings
+from app.core import bulk_templates
+from app.core.images import require_pillow
+from app.core.jobs import bulk_jobs
+from app.core.media_files import MediaFiles
+from app.core.media_store import MEDIA_ROOT, STORE_DIR
+from app.core.passwords import password_hasher
+from app.core.uploads import UploadSizeGuard
 import app.models
 
-app = FastAPI(title="VesselReq API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    require_pillow()
+    password_hasher.start()
+    bulk_templates.warm()
+    bulk_jobs.start()
+    yield
+    bulk_jobs.shutdown()
+    password_hasher.shutdown()
+
+
+app = FastAPI(title="VesselReq API", lifespan=lifespan)
+
+# Added before CORS so CORS wraps it — a 413 still carries the CORS headers
+app.add_middleware(UploadSizeGuard)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +49,16 @@ app.include_router(requisitions.router)
 app.include_router(categories.router)
 app.include_router(tags.router)
 app.include_router(bulk.router)
+app.include_router(stats.router)
 
-app.mount("/media", StaticFiles(directory="media"), name="media")
+app.mount("/media", MediaFiles(
+    directory=MEDIA_ROOT,
+    store_prefix=os.path.relpath(STORE_DIR, MEDIA_ROOT),
+    cache_bytes=settings.MEDIA_CACHE_BYTES,
+    max_cached_file=settings.MEDIA_CACHE_MAX_FILE_BYTES,
+    sidecars=settings.MEDIA_SIDECARS,
+    recheck_seconds=settings.MEDIA_CACHE_RECHECK_SECONDS,
+), name="media")
 
 @app.get("/")
 def health():
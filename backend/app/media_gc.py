@@ -0,0 +1,130 @@
+"""
+Media garbage collection — delete image files nothing references.
+
+Usage (from the backend/ folder):
+    python -m app.media_gc --dry-run
+    python -m app.media_gc
+    python -m app.media_gc --migrate
+
+Options:
+    --dry-run          list what would be deleted or moved, change nothing
+    --migrate          first move images still under media/items and
+                       media/companies into the content-addressed store
+                       (core.media_store), repointing the rows that use them
+    --grace-seconds N  keep unreferenced files younger than this
+                       (default: MEDIA_GRACE_SECONDS)
+
+Sweeps media/objects, media/items and media/companies. A file goes when no
+items.image_path / companies.logo_path names it and it is older than the
+grace period; its resized variants and .br / .gz sidecars go with it, as
+do variants and sidecars whose original is gone and abandoned .part files
+from interrupted uploads.
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.images import has_variants, is_variant
+from app.core.media_files import sidecar_original
+from app.core.media_store import REFERENCES, STORE_DIR, TMP_DIR, VARIANTS_READY, is_object, put_file, referenced_paths
+from app.database import SessionLocal
+from app.db import base  # noqa: F401 — registers every model
+
+LEGACY_DIRS = ("media/items", "media/companies")
+MIGRATE_BATCH = 500  # rows repointed per commit
+
+
+def files_under(folder: str) -> list[str]:
+    return sorted(p.as_posix() for p in Path(folder).rglob("*") if p.is_file())
+
+
+def migrate(db, dry_run: bool) -> int:
+    legacy = sorted(
+        p for p in referenced_paths(db)
+        if not is_object(p) and p.startswith(LEGACY_DIRS) and os.path.isfile(p)
+    )
+    print(f"{len(legacy)} referenced file(s) outside the store")
+    if dry_run:
+        return len(legacy)
+    for i, old in enumerate(legacy, start=1):
+        new = put_file(old)
+        ready = has_variants(new)
+        for column in REFERENCES:
+            db.execute(update(column.class_).where(column == old).values(
+                {column.key: new, VARIANTS_READY[column].key: ready}
+            ))
+        if i % MIGRATE_BATCH == 0:
+            db.commit()
+    db.commit()
+    return len(legacy)
+
+
+def sweep(db, dry_run: bool, grace_seconds: int) -> tuple[int, int]:
+    referenced = referenced_paths(db)
+    cutoff = time.time() - grace_seconds
+    doomed: list[str] = []
+
+    for folder in (STORE_DIR, *LEGACY_DIRS):
+        files = [p for p in files_under(folder) if not p.startswith(f"{TMP_DIR}/")]
+        kept = set()
+        for path in files:
+            if is_variant(path) or sidecar_original(path):
+                continue
+            if path in referenced or os.path.getmtime(path) > cutoff:
+                kept.add(path)
+            else:
+                doomed.append(path)
+        kept_stems = {os.path.splitext(path)[0] for path in kept}
+        for path in files:
+            # <stem>.<variant>.<ext> belongs to <stem>.*, <file>.br / .gz to <file>
+            if is_variant(path) and os.path.splitext(os.path.splitext(path)[0])[0] not in kept_stems:
+                doomed.append(path)
+            elif not is_variant(path) and sidecar_original(path) and sidecar_original(path) not in kept:
+                doomed.append(path)
+
+    doomed += [p for p in files_under(TMP_DIR) if os.path.getmtime(p) <= cutoff]
+
+    freed = 0
+    for path in doomed:
+        freed += os.path.getsize(path)
+        print(f"  {'would delete' if dry_run else 'delete'} {path}")
+        if not dry_run:
+            os.remove(path)
+    if not dry_run:
+        prune_shards()
+    return len(doomed), freed
+
+
+def prune_shards():
+    """Remove empty shard directories under STORE_DIR."""
+    for folder, subfolders, files in os.walk(STORE_DIR, topdown=False):
+        folder = Path(folder).as_posix()
+        if folder not in (STORE_DIR, TMP_DIR) and not files and not os.listdir(folder):
+            os.rmdir(folder)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--migrate", action="store_true")
+    parser.add_argument("--grace-seconds", type=int, default=settings.MEDIA_GRACE_SECONDS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.migrate:
+            moved = migrate(db, args.dry_run)
+            print(f"{'Would move' if args.dry_run else 'Moved'} {moved} file(s) into {STORE_DIR}")
+        count, freed = sweep(db, args.dry_run, args.grace_seconds)
+        print(f"{'Would delete' if args.dry_run else 'Deleted'} {count} file(s), {freed / (1024 * 1024):.1f} MB")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+class BulkJob(Base):
+    """
+    A bulk item upload processed in the background (see core.jobs). The
+    counters and last_row are committed together with each chunk of rows,
+    so an interrupted job picks up after the last committed chunk.
+    """
+    __tablename__ = "bulk_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    mode = Column(String, nullable=False)  # preview | import
+    status = Column(String, nullable=False, default="queued")  # queued | running | done | failed
+    on_duplicate = Column(String, nullable=False, default="skip")  # import: skip | update
+    file_name = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)  # the stored upload, removed once the job ends
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+
+    # Items created after this id don't count as duplicates — they came from this job
+    baseline_item_id = Column(Integer, nullable=False, default=0)
+    total_rows = Column(Integer)
+    last_row = Column(Integer, nullable=False, default=0)  # sheet row of the last committed chunk
+    rows_done = Column(Integer, nullable=False, default=0)
+    new_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    created = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)
+    error = Column(String)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # Bumped with every chunk — a running job that stops bumping it has lost its worker
+    heartbeat_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_bulk_jobs_status", "status"),
+    )
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+class BulkStagedItem(Base):
+    """
+    One parsed row of a staged items upload (/bulk/items/preview?staged=true),
+    held server-side under its upload token until confirmed or expired, so
+    the browser pages through the preview and confirms by token instead of
+    sending every row back.
+    """
+    __tablename__ = "bulk_staged_items"
+
+    token = Column(UUID(as_uuid=True), primary_key=True)
+    row = Column(Integer, primary_key=True)  # sheet row number
+    status = Column(String, nullable=False)  # new | duplicate | error
+    error = Column(String)
+    existing_id = Column(Integer)
+
+    name = Column(String, nullable=False)
+    catalogue_nr = Column(String, nullable=False)
+    unit = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    desc_short = Column(String, nullable=False)
+    desc_long = Column(Text, nullable=False)
+    manufacturer = Column(String, nullable=False)
+    supplier = Column(String, nullable=False)
+    tags = Column(String, nullable=False)
+    image_path = Column(String, nullable=False)
+
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Expiry sweep
+        Index("ix_bulk_staged_items_created_at", "created_at"),
+    )
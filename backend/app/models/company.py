@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, false, func
 from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.images import variant_urls
 from app.db.base_class import Base
 
 class Company(Base):
@@ -12,7 +14,25 @@ class Company(Base):
     phone = Column(String)
     comments = Column(String)
     logo_path = Column(String)
+    logo_variants_ready = Column(Boolean, default=False, server_default=false(), nullable=False)
 
     is_manufacturer = Column(Boolean, default=False)
     is_supplier = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Media reference counts (core.media_store)
+        Index("ix_companies_logo_path", "logo_path"),
+    )
+
+    __derived_from__ = {"logo_variants": ("logo_path", "logo_variants_ready")}  # see Item.__derived_from__
+
+    @property
+    def logo_variants(self) -> dict[str, str] | None:
+        """thumb / card / full copies of logo_path, once made (see core.images)."""
+        return variant_urls(self.logo_path) if self.logo_variants_ready else None
+
+
+# One company per name, ignoring case — bulk imports match and upsert on it
+Index("uq_companies_lower_name", func.lower(Company.name), unique=True)
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index, false, func, true
 from datetime import datetime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from sqlalchemy.dialects.postgresql import UUID
+from app.core.images import variant_urls
 from app.db.base_class import Base
 from app.models.tag import item_tags
 from typing import TYPE_CHECKING
@@ -11,6 +12,15 @@ if TYPE_CHECKING:
     from app.models.vessel_item import VesselItem
 
 
+def catalogue_key(expr):
+    """Catalogue number folded to lowercase alphanumerics — 'FE-CO2-5' and 'fe co2 5' share a key.
+
+    Must stay identical to the expression behind ix_items_catalogue_key_trgm,
+    otherwise Postgres won't use the index.
+    """
+    return func.regexp_replace(func.lower(expr), "[^a-z0-9]", "", "g")
+
+
 class Item(Base):
     __tablename__ = "items"
 
@@ -22,8 +32,10 @@ class Item(Base):
     supplier_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
     catalogue_nr = Column(String)
     image_path = Column(String)
+    image_variants_ready = Column(Boolean, default=False, server_default=false(), nullable=False)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="RESTRICT"), nullable=False)
     desc_long = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
@@ -34,3 +46,38 @@ class Item(Base):
     requisition_items = relationship("RequisitionItem", back_populates="item", cascade="all, delete-orphan")
     vessel_overrides = relationship("VesselItem", back_populates="item", cascade="all, delete-orphan")
     tags = relationship("Tag", secondary=item_tags, back_populates="items")
+
+    # Per-vessel visibility — populated by queries that join vessel_items
+    # (see routers.items.with_vessel_status); True everywhere else
+    vessel_active = query_expression(default_expr=true())
+
+    # Attributes computed from columns — sparse fieldsets (core.fields) load
+    # the columns whenever the attribute is asked for
+    __derived_from__ = {"image_variants": ("image_path", "image_variants_ready")}
+
+    @property
+    def image_variants(self) -> dict[str, str] | None:
+        """thumb / card / full copies of image_path, once made (see core.images)."""
+        return variant_urls(self.image_path) if self.image_variants_ready else None
+
+    __table_args__ = (
+        # Keyset pagination: ORDER BY name, id / WHERE (name, id) > (...)
+        Index("ix_items_name_id", "name", "id"),
+        # Trigram GIN indexes — back ILIKE '%term%' and similarity search
+        Index("ix_items_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_items_catalogue_nr_trgm", "catalogue_nr", postgresql_using="gin", postgresql_ops={"catalogue_nr": "gin_trgm_ops"}),
+        Index("ix_items_desc_short_trgm", "desc_short", postgresql_using="gin", postgresql_ops={"desc_short": "gin_trgm_ops"}),
+        # Media reference counts (core.media_store)
+        Index("ix_items_image_path", "image_path"),
+    )
+
+
+Index(
+    "ix_items_catalogue_key_trgm",
+    catalogue_key(Item.catalogue_nr).label("catalogue_key"),
+    postgresql_using="gin",
+    postgresql_ops={"catalogue_key": "gin_trgm_ops"},
+)
+
+# Case-insensitive name lookups — bulk upload duplicate detection
+Index("ix_items_lower_name", func.lower(Item.name))
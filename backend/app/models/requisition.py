@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Boolean, Text
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -18,6 +18,8 @@ class Requisition(Base):
     ordered_at = Column(DateTime)
     created_by = Column(UUID, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Also touched by line changes (edit, add item, receive) — see routers.requisitions
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     notes = Column(String, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
 
@@ -31,3 +33,8 @@ class Requisition(Base):
         cascade="all, delete-orphan"
     )
     supplier = relationship("Company", foreign_keys=[supplier_id])
+
+    __table_args__ = (
+        # Per-vessel list, newest first — also serves keyset pagination
+        Index("ix_requisitions_vessel_created", "vessel_id", "created_at", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from sqlalchemy import Column, Integer, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 from typing import TYPE_CHECKING
@@ -19,4 +19,9 @@ class RequisitionItem(Base):
 
     item = relationship("Item")
     requisition = relationship("Requisition", back_populates="items")
-    supplier = relationship("Company")
\ No newline at end of file
+    supplier = relationship("Company")
+
+    __table_args__ = (
+        # Lines of a requisition — the list summaries aggregate over this
+        Index("ix_requisition_items_requisition_id", "requisition_id"),
+    )
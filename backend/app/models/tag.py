@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
@@ -8,6 +8,8 @@ item_tags = Table(
     Base.metadata,
     Column("item_id", Integer, ForeignKey("items.id", ondelete="CASCADE"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    # PK covers item → tags; this covers tag → items (tag filters, facet counts)
+    Index("ix_item_tags_tag_id_item_id", "tag_id", "item_id"),
 )
 
 
@@ -17,6 +17,8 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     is_active = Column(Boolean, default=True, nullable=False)
+    # Tokens issued before this are rejected — set on password and role changes
+    tokens_valid_after = Column(DateTime, nullable=True)
 
     # NULL for super_admin
     vessel_id = Column(Integer, ForeignKey("vessels.id", ondelete="CASCADE"), nullable=True)
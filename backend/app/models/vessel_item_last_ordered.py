@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from app.db.base_class import Base
+
+
+class VesselItemLastOrdered(Base):
+    """
+    When each item was last put on one of the vessel's requisitions, and on
+    how many requisitions in total. Maintained incrementally by the
+    requisition write paths so "recently ordered" is a single indexed read
+    instead of an aggregate over every requisition line.
+    """
+    __tablename__ = "vessel_item_last_ordered"
+
+    vessel_id = Column(Integer, ForeignKey("vessels.id", ondelete="CASCADE"), primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    last_ordered_at = Column(DateTime, nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_vessel_item_last_ordered_recent", "vessel_id", "last_ordered_at"),
+    )
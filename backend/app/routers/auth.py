@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from typing import Optional
 from sqlalchemy.orm import Session
 
-from app.auth import authenticate_user, create_access_token, get_db
-from app.models.vessel import Vessel
+from app.auth import authenticate_user, token_for, get_db
+from app.core.etag import check_etag
+from app.routers.vessels import public_vessels
 
 router = APIRouter(tags=["Auth"])
 
@@ -17,48 +18,33 @@ class LoginRequest(BaseModel):
 
 
 @router.get("/vessels/public", tags=["Auth"])
-def list_vessels_public(db: Session = Depends(get_db)):
+def list_vessels_public(request: Request, response: Response, db: Session = Depends(get_db)):
     """Public endpoint — returns vessel list for the login dropdown."""
-    vessels = (
-        db.query(Vessel.id, Vessel.name)
-        .filter(Vessel.is_active == True)
-        .order_by(Vessel.name)
-        .all()
-    )
-    return [{"id": v.id, "name": v.name} for v in vessels]
+    vessels, etag = public_vessels(db)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return vessels
 
 
 @router.post("/login")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
+async def login(data: LoginRequest):
     """JSON login — used by the frontend."""
-    user = authenticate_user(db, data.username, data.password, data.vessel_id)
+    user = await authenticate_user(data.username, data.password, data.vessel_id)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid vessel, username or password")
 
-    token = create_access_token({
-        "sub": str(user.id),
-        "role": user.role,
-        "full_name": user.full_name,
-        "vessel_id": user.vessel_id,
-    })
-
-    vessel_name = None
-    if user.vessel_id:
-        vessel = db.get(Vessel, user.vessel_id)
-        vessel_name = vessel.name if vessel else None
+    token = token_for(user)
 
     return {
         "access_token": token,
         "token_type": "bearer",
-        "vessel_name": vessel_name,
+        "vessel_name": user.vessel.name if user.vessel else None,
     }
 
 
 @router.post("/login/form")
-def login_form(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
-):
+async def login_form(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     OAuth2 form login — used exclusively by Swagger UI.
     Logs in as super_admin (vessel_id=None) by default.
@@ -77,18 +63,13 @@ def login_form(
         except ValueError:
             vessel_id = None
 
-    user = authenticate_user(db, username, form_data.password, vessel_id)
+    user = await authenticate_user(username, form_data.password, vessel_id)
     if not user:
         raise HTTPException(
             status_code=401,
             detail="Invalid credentials. For vessel users use 'username:vessel_id' format"
         )
 
-    token = create_access_token({
-        "sub": str(user.id),
-        "role": user.role,
-        "full_name": user.full_name,
-        "vessel_id": user.vessel_id,
-    })
+    token = token_for(user)
 
     return {"access_token": token, "token_type": "bearer"}
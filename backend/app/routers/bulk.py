@@ -5,39 +5,65 @@ Two-pass flow for items:
   POST /bulk/items/preview   — parse & validate, return new/duplicate/error rows
   POST /bulk/items/confirm   — commit approved rows with per-duplicate action
 
+With ?staged=true the preview keeps the rows server-side under a token and
+returns one page; the rest are browsed, and confirmed, by token:
+  GET  /bulk/items/preview/{token}?page=&status=
+  POST /bulk/items/confirm   {"token": ..., "default": ..., "overrides": {row: action}}
+
 Single-pass for companies (no meaningful duplicates beyond name):
   POST /bulk/companies/preview
   POST /bulk/companies/confirm
 
+Background jobs for item files too large for one request (see core.jobs):
+  POST /bulk/jobs            — store the file, return a job to poll
+  GET  /bulk/jobs/{id}       — progress, counts and row errors
+
 Template downloads:
-  GET  /bulk/items/template
+  GET  /bulk/items/template          (?live=true adds category / tag dropdowns)
   GET  /bulk/companies/template
+Both are rendered once and cached with an ETag (see core.bulk_templates).
 """
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-import os
 from typing import Literal, Optional
-from io import BytesIO
+from itertools import islice
+from uuid import UUID, uuid4
+import os
 import re
 
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from openpyxl import load_workbook
 
 from app.database import SessionLocal
 from app.auth import get_current_user, require_super_admin
-from app.models.item import Item
-from app.models.company import Company
+from app.core.bulk_engine import (
+    CO_COL_IDX, HEADER_ROWS, clean as _clean, data_rows, import_companies, import_items,
+    mark_company_duplicates, mark_duplicates, read_item_rows,
+    stage_previews, staged_confirm_rows, staged_counts, staged_page, unstage,
+)
+from app.core.bulk_templates import (
+    TEMPLATE_CACHE_CONTROL, XLSX_MEDIA_TYPE, Template, companies_template, items_template, live_items_template,
+)
+from app.core.cache import reference_cache
+from app.core.config import settings
+from app.core.etag import REVALIDATE, check_etag
+from app.core.jobs import bulk_jobs, new_job
+from app.core.uploads import open_workbook, save_upload
+from app.models.bulk_job import BulkJob
 from app.models.category import Category
-from app.models.tag import Tag
 from app.models.user import User
+from app.routers.categories import load_categories
+from app.routers.tags import load_tags
+from app.schemas.bulk import (
+    BulkJobOut,
+    CompanyConfirmRequest, CompanyConfirmResponse, CompanyPreviewResponse, CompanyRowPreview,
+    ItemConfirmRequest, ItemConfirmResponse, ItemPreviewResponse,
+)
 
 router = APIRouter(prefix="/bulk", tags=["Bulk Upload"])
 
 MAX_ROWS = 5000
+STAGED_PAGE_SIZE = 50
 
 
 def get_db():
@@ -50,269 +76,56 @@ def get_db():
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _clean(val) -> str:
-    """Coerce cell value to stripped string."""
-    if val is None:
-        return ""
-    return str(val).strip()
-
-
 def _bool_cell(val) -> bool:
     return _clean(val).lower() in ("yes", "true", "1", "y")
 
 
-def _get_or_create_company(db: Session, name: str, is_manufacturer=False, is_supplier=False) -> Optional[Company]:
-    if not name:
-        return None
-    name = name.strip()
-    company = db.query(Company).filter(Company.name.ilike(name)).first()
-    if not company:
-        company = Company(
-            name=name,
-            is_manufacturer=is_manufacturer,
-            is_supplier=is_supplier,
-        )
-        db.add(company)
-        db.flush()
-    else:
-        # Update flags if newly needed
-        changed = False
-        if is_manufacturer and not company.is_manufacturer:
-            company.is_manufacturer = True
-            changed = True
-        if is_supplier and not company.is_supplier:
-            company.is_supplier = True
-            changed = True
-        if changed:
-            db.flush()
-    return company
-
-
-def _style_header_row(ws, row: int, col_count: int):
-    fill = PatternFill("solid", fgColor="1E3A5F")
-    font = Font(bold=True, color="FFFFFF", size=10)
-    for col in range(1, col_count + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.fill = fill
-        cell.font = font
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-
-def _style_example_row(ws, row: int, col_count: int):
-    fill = PatternFill("solid", fgColor="EBF4FF")
-    for col in range(1, col_count + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.fill = fill
-        cell.font = Font(italic=True, color="555555", size=9)
-        cell.alignment = Alignment(wrap_text=True)
-
-
-def _auto_width(ws, min_width=12, max_width=40):
-    for col in ws.columns:
-        max_len = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            try:
-                if cell.value:
-                    max_len = max(max_len, len(str(cell.value)))
-            except Exception:
-                pass
-        ws.column_dimensions[col_letter].width = min(max(max_len + 2, min_width), max_width)
+def _template_response(request: Request, template: Template, cache_control: str = TEMPLATE_CACHE_CONTROL) -> Response:
+    response = Response(
+        content=template.body,
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={template.filename}"},
+    )
+    return check_etag(request, response, template.etag, cache_control=cache_control) or response
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # ITEMS
 # ══════════════════════════════════════════════════════════════════════════════
 
-ITEM_COLUMNS = [
-    ("name",          "Name *",           "Fire Extinguisher CO2 5kg"),
-    ("catalogue_nr",  "Catalogue Nr",     "FE-CO2-5"),
-    ("unit",          "Unit *",           "pcs"),
-    ("category",      "Category *",       "Safety"),
-    ("desc_short",    "Short Description","CO2 extinguisher, 5kg"),
-    ("desc_long",     "Full Description", "For use in engine room and electrical fires"),
-    ("manufacturer",  "Manufacturer",     "Amerex"),
-    ("supplier",      "Supplier",         "MarineStore Ltd"),
-    ("tags",          "Tags",             "Safety, Critical"),
-    ("image_path",    "Image Path",       "media/items/fe-co2-5.jpg"),
-]
-
-COL_IDX = {col[0]: i + 1 for i, col in enumerate(ITEM_COLUMNS)}
-
-
 @router.get("/items/template")
-def download_items_template(_: User = Depends(get_current_user)):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Items"
-    ws.row_dimensions[1].height = 36
-
-    # Notes row
-    notes = [
-        "* Required",
-        "Must match an existing catalogue number exactly if updating",
-        "* Required  e.g. pcs / L / kg / m",
-        "* Must match existing category name exactly",
-        "Optional short summary",
-        "Optional detailed description",
-        "Created automatically if not found",
-        "Created automatically if not found",
-        "Comma-separated existing tag names",
-        "Path to existing file on server e.g. media/items/photo.jpg",
-    ]
-
-    for i, (_, header, example) in enumerate(ITEM_COLUMNS, start=1):
-        ws.cell(1, i, header)
-        ws.cell(2, i, example)
-        ws.cell(3, i, notes[i - 1])
-
-    _style_header_row(ws, 1, len(ITEM_COLUMNS))
-    _style_example_row(ws, 2, len(ITEM_COLUMNS))
-
-    note_fill = PatternFill("solid", fgColor="FFF9E6")
-    for col in range(1, len(ITEM_COLUMNS) + 1):
-        cell = ws.cell(3, col)
-        cell.fill = note_fill
-        cell.font = Font(italic=True, color="888800", size=8)
-        cell.alignment = Alignment(wrap_text=True)
-
-    ws.row_dimensions[3].height = 28
-    ws.freeze_panes = "A4"
-    _auto_width(ws)
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=items_template.xlsx"},
+def download_items_template(
+    request: Request,
+    live: bool = Query(False, description="Add dropdowns of the current categories and tags"),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_user),
+):
+    if not live:
+        return _template_response(request, items_template())
+    categories, categories_etag = load_categories(db)
+    tags, tags_etag = load_tags(db)
+    template = live_items_template(
+        [c.name for c in categories], [t.name for t in tags], (categories_etag, tags_etag),
     )
-
-
-class ItemRowPreview(BaseModel):
-    row: int
-    status: Literal["new", "duplicate", "error"]
-    name: str
-    catalogue_nr: str
-    unit: str
-    category: str
-    desc_short: str
-    desc_long: str
-    manufacturer: str
-    supplier: str
-    tags: str
-    image_path: str
-    error: Optional[str] = None
-    existing_id: Optional[int] = None
-
-
-class ItemPreviewResponse(BaseModel):
-    total: int
-    new_count: int
-    duplicate_count: int
-    error_count: int
-    rows: list[ItemRowPreview]
+    return _template_response(request, template, cache_control=REVALIDATE)
 
 
 @router.post("/items/preview", response_model=ItemPreviewResponse)
 def preview_items_upload(
     file: UploadFile = File(...),
+    staged: bool = Query(False, description="Keep the rows server-side and return only the first page"),
+    page_size: int = Query(STAGED_PAGE_SIZE, ge=1, le=500),
     db: Session = Depends(get_db),
-    _: User = Depends(require_super_admin),
+    current_user: User = Depends(require_super_admin),
 ):
-    contents = file.file.read()
-    try:
-        wb = load_workbook(BytesIO(contents), read_only=True, data_only=True)
-    except Exception:
-        raise HTTPException(400, "Invalid Excel file")
+    wb = open_workbook(file, settings.MAX_SPREADSHEET_UPLOAD_BYTES)
 
-    ws = wb.active
-    rows_iter = iter(ws.iter_rows(values_only=True))
+    # Header rows (headers, example, notes) are skipped by data_rows
+    categories = {name.lower() for (name,) in db.query(Category.name)}
+    results = list(read_item_rows(islice(data_rows(wb.active), MAX_ROWS), categories, seen_in_file=set()))
 
-    # Skip header rows (row 1 = headers, row 2 = example, row 3 = notes)
-    for _ in range(3):
-        try:
-            next(rows_iter)
-        except StopIteration:
-            break
-
-    # Cache for validation
-    categories = {c.name.lower(): c for c in db.query(Category).all()}
-    tags_map = {t.name.lower(): t for t in db.query(Tag).all()}
-
-    results: list[ItemRowPreview] = []
-    seen_in_file: set[str] = set()  # track duplicates within the file itself
-
-    for row_num, row in enumerate(rows_iter, start=4):
-        if all(v is None or str(v).strip() == "" for v in row):
-            continue  # skip blank rows
-        if len(results) >= MAX_ROWS:
-            break
-
-        name = _clean(row[COL_IDX["name"] - 1])
-        catalogue_nr = _clean(row[COL_IDX["catalogue_nr"] - 1])
-        unit = _clean(row[COL_IDX["unit"] - 1])
-        category_name = _clean(row[COL_IDX["category"] - 1])
-        desc_short = _clean(row[COL_IDX["desc_short"] - 1])
-        desc_long = _clean(row[COL_IDX["desc_long"] - 1])
-        manufacturer_name = _clean(row[COL_IDX["manufacturer"] - 1])
-        supplier_name = _clean(row[COL_IDX["supplier"] - 1])
-        tags_raw = _clean(row[COL_IDX["tags"] - 1])
-        image_path = _clean(row[COL_IDX["image_path"] - 1])
-
-        errors = []
-        if not name:
-            errors.append("Name is required")
-        if not unit:
-            errors.append("Unit is required")
-        if not category_name:
-            errors.append("Category is required")
-        elif category_name.lower() not in categories:
-            errors.append(f"Category '{category_name}' not found")
-
-        if errors:
-            results.append(ItemRowPreview(
-                row=row_num, status="error",
-                name=name, catalogue_nr=catalogue_nr, unit=unit,
-                category=category_name, desc_short=desc_short, desc_long=desc_long,
-                manufacturer=manufacturer_name, supplier=supplier_name,
-                tags=tags_raw, image_path=image_path, error="; ".join(errors),
-            ))
-            continue
-
-        # Duplicate detection: match on (name, catalogue_nr) or just name if no catalogue_nr
-        existing = None
-        if catalogue_nr:
-            existing = db.query(Item).filter(
-                Item.name.ilike(name),
-                Item.catalogue_nr.ilike(catalogue_nr),
-            ).first()
-        if not existing:
-            existing = db.query(Item).filter(Item.name.ilike(name)).first()
-
-        # Also check for duplicates within this file
-        file_key = f"{name.lower()}|{catalogue_nr.lower()}"
-        if file_key in seen_in_file:
-            results.append(ItemRowPreview(
-                row=row_num, status="error",
-                name=name, catalogue_nr=catalogue_nr, unit=unit,
-                category=category_name, desc_short=desc_short, desc_long=desc_long,
-                manufacturer=manufacturer_name, supplier=supplier_name,
-                tags=tags_raw, image_path=image_path, error="Duplicate row within this file",
-            ))
-            continue
-        seen_in_file.add(file_key)
-
-        status = "duplicate" if existing else "new"
-        results.append(ItemRowPreview(
-            row=row_num, status=status,
-            name=name, catalogue_nr=catalogue_nr, unit=unit,
-            category=category_name, desc_short=desc_short, desc_long=desc_long,
-            manufacturer=manufacturer_name, supplier=supplier_name,
-            tags=tags_raw, image_path=image_path,
-            existing_id=existing.id if existing else None,
-        ))
+    # Duplicate detection — all rows against the catalogue at once
+    mark_duplicates(db, results)
 
     wb.close()
 
@@ -320,40 +133,57 @@ def preview_items_upload(
     dup_count = sum(1 for r in results if r.status == "duplicate")
     err_count = sum(1 for r in results if r.status == "error")
 
+    if not staged:
+        return ItemPreviewResponse(
+            total=len(results),
+            new_count=new_count,
+            duplicate_count=dup_count,
+            error_count=err_count,
+            rows=results,
+        )
+
+    token = uuid4()
+    stage_previews(db, token, results, current_user.id, ttl_hours=settings.BULK_STAGING_TTL_HOURS)
+    db.commit()
     return ItemPreviewResponse(
         total=len(results),
         new_count=new_count,
         duplicate_count=dup_count,
         error_count=err_count,
-        rows=results,
+        rows=results[:page_size],
+        token=token,
+        page=1,
+        page_size=page_size,
+        pages=max(1, -(-len(results) // page_size)),
     )
 
 
-class ItemConfirmRow(BaseModel):
-    row: int
-    action: Literal["create", "update", "skip"]
-    name: str
-    catalogue_nr: str
-    unit: str
-    category: str
-    desc_short: str
-    desc_long: str
-    manufacturer: str
-    supplier: str
-    tags: str
-    image_path: str
-    existing_id: Optional[int] = None
-
-
-class ItemConfirmRequest(BaseModel):
-    rows: list[ItemConfirmRow]
-
-
-class ItemConfirmResponse(BaseModel):
-    created: int
-    updated: int
-    skipped: int
-    errors: list[str]
+@router.get("/items/preview/{token}", response_model=ItemPreviewResponse)
+def browse_staged_preview(
+    token: UUID,
+    status: Optional[Literal["new", "duplicate", "error"]] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(STAGED_PAGE_SIZE, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin),
+):
+    """One page of a staged preview, optionally only rows of one status. Counts cover the whole upload."""
+    ttl_hours = settings.BULK_STAGING_TTL_HOURS
+    counts = staged_counts(db, token, current_user.id, ttl_hours)
+    if not counts:
+        raise HTTPException(404, "Upload not found or expired")
+    matching = counts.get(status, 0) if status else sum(counts.values())
+    return ItemPreviewResponse(
+        total=sum(counts.values()),
+        new_count=counts.get("new", 0),
+        duplicate_count=counts.get("duplicate", 0),
+        error_count=counts.get("error", 0),
+        rows=staged_page(db, token, current_user.id, ttl_hours, page, page_size, status),
+        token=token,
+        page=page,
+        page_size=page_size,
+        pages=max(1, -(-matching // page_size)),
+    )
 
 
 @router.post("/items/confirm", response_model=ItemConfirmResponse)
@@ -362,161 +192,99 @@ def confirm_items_upload(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_super_admin),
 ):
-    categories = {c.name.lower(): c for c in db.query(Category).all()}
-    tags_map = {t.name.lower(): t for t in db.query(Tag).all()}
-
-    created = updated = skipped = 0
-    errors = []
-
-    for row in data.rows:
-        if row.action == "skip":
-            skipped += 1
-            continue
-
-        category = categories.get(row.category.lower())
-        if not category:
-            errors.append(f"Row {row.row}: category '{row.category}' not found")
-            continue
-
-        manufacturer = _get_or_create_company(db, row.manufacturer, is_manufacturer=True) if row.manufacturer else None
-        supplier = _get_or_create_company(db, row.supplier, is_supplier=True) if row.supplier else None
-
-        tag_names = [t.strip().lower() for t in row.tags.split(",") if t.strip()]
-        item_tags = [tags_map[n] for n in tag_names if n in tags_map]
-
-        if row.action == "update" and row.existing_id:
-            item = db.get(Item, row.existing_id)
-            if not item:
-                errors.append(f"Row {row.row}: item id {row.existing_id} not found")
-                continue
-            item.name = row.name
-            item.catalogue_nr = row.catalogue_nr or None
-            item.unit = row.unit
-            item.category_id = category.id
-            item.desc_short = row.desc_short or None
-            item.desc_long = row.desc_long or None
-            item.manufacturer_id = manufacturer.id if manufacturer else None
-            item.supplier_id = supplier.id if supplier else None
-            item.tags = item_tags
-            if row.image_path:
-                if os.path.exists(row.image_path):
-                    item.image_path = row.image_path
-                else:
-                    errors.append(f"Row {row.row}: image file not found: {row.image_path}")
-            updated += 1
-
-        elif row.action == "create":
-            item = Item(
-                name=row.name,
-                catalogue_nr=row.catalogue_nr or None,
-                unit=row.unit,
-                category_id=category.id,
-                desc_short=row.desc_short or None,
-                desc_long=row.desc_long or None,
-                manufacturer_id=manufacturer.id if manufacturer else None,
-                supplier_id=supplier.id if supplier else None,
-                created_by=current_user.id,
-                is_active=True,
-            )
-            if row.image_path:
-                if os.path.exists(row.image_path):
-                    item.image_path = row.image_path
-                else:
-                    errors.append(f"Row {row.row}: image file not found: {row.image_path}")
-            item.tags = item_tags
-            db.add(item)
-            created += 1
+    """Apply either the posted rows, or a staged preview by token (see ItemConfirmRequest)."""
+    if (data.rows is None) == (data.token is None):
+        raise HTTPException(400, "Send either rows or a token")
+    if data.token is not None:
+        ttl_hours = settings.BULK_STAGING_TTL_HOURS
+        if not staged_counts(db, data.token, current_user.id, ttl_hours):
+            raise HTTPException(404, "Upload not found or expired")
+        rows = staged_confirm_rows(db, data, current_user.id, ttl_hours)
+    else:
+        rows = data.rows
 
     try:
+        result = import_items(db, rows, created_by=current_user.id)
+        if data.token is not None:
+            unstage(db, data.token)
         db.commit()
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Database error during commit: {str(e)}")
+    # Manufacturers / suppliers may have been created or re-flagged
+    reference_cache.invalidate("companies")
 
-    return ItemConfirmResponse(created=created, updated=updated, skipped=skipped, errors=errors)
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# COMPANIES
-# ══════════════════════════════════════════════════════════════════════════════
+    return ItemConfirmResponse(
+        created=result.created, updated=result.updated, skipped=result.skipped, errors=result.errors,
+    )
 
-COMPANY_COLUMNS = [
-    ("name",            "Name *",           "MarineStore Ltd"),
-    ("email",           "Email",            "orders@marinestore.com"),
-    ("phone",           "Phone",            "+44 20 1234 5678"),
-    ("website",         "Website",          "https://marinestore.com"),
-    ("is_supplier",     "Is Supplier",      "Yes"),
-    ("is_manufacturer", "Is Manufacturer",  "No"),
-    ("comments",        "Comments",         "Main UK supplier"),
-]
 
-CO_COL_IDX = {col[0]: i + 1 for i, col in enumerate(COMPANY_COLUMNS)}
+# ── Background jobs ───────────────────────────────────────────────────────────
 
+@router.post("/jobs", response_model=BulkJobOut, status_code=202)
+def create_bulk_job(
+    file: UploadFile = File(...),
+    mode: Literal["preview", "import"] = Form("preview"),
+    on_duplicate: Literal["skip", "update"] = Form("skip"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin),
+):
+    """
+    Queue an items file for background processing — "preview" only
+    classifies and counts its rows, "import" also creates new items and
+    skips or updates duplicates. Poll GET /bulk/jobs/{id} for progress.
+    """
+    os.makedirs(settings.BULK_JOB_DIR, exist_ok=True)
+    job_id = uuid4()
+    path = os.path.join(settings.BULK_JOB_DIR, f"{job_id}.xlsx")
+    save_upload(file, path, settings.BULK_JOB_MAX_UPLOAD_BYTES)
 
-@router.get("/companies/template")
-def download_companies_template(_: User = Depends(get_current_user)):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Companies"
-    ws.row_dimensions[1].height = 36
-
-    notes = [
-        "* Required — must be unique",
-        "Optional",
-        "Optional",
-        "Optional",
-        "Yes / No",
-        "Yes / No",
-        "Optional notes",
-    ]
-
-    for i, (_, header, example) in enumerate(COMPANY_COLUMNS, start=1):
-        ws.cell(1, i, header)
-        ws.cell(2, i, example)
-        ws.cell(3, i, notes[i - 1])
-
-    _style_header_row(ws, 1, len(COMPANY_COLUMNS))
-    _style_example_row(ws, 2, len(COMPANY_COLUMNS))
-
-    note_fill = PatternFill("solid", fgColor="FFF9E6")
-    for col in range(1, len(COMPANY_COLUMNS) + 1):
-        cell = ws.cell(3, col)
-        cell.fill = note_fill
-        cell.font = Font(italic=True, color="888800", size=8)
-
-    ws.freeze_panes = "A4"
-    _auto_width(ws)
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=companies_template.xlsx"},
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception:
+        os.remove(path)
+        raise HTTPException(400, "Invalid Excel file")
+    # From the sheet's stored dimensions, if the writer recorded them
+    max_row = wb.active.max_row
+    wb.close()
+    total_rows = max(0, max_row - HEADER_ROWS) if max_row else None
+    if total_rows and total_rows > settings.BULK_JOB_MAX_ROWS:
+        os.remove(path)
+        raise HTTPException(400, f"File has more than {settings.BULK_JOB_MAX_ROWS} rows")
+
+    job = new_job(
+        db,
+        id=job_id,
+        mode=mode,
+        on_duplicate=on_duplicate,
+        file_name=file.filename or "upload.xlsx",
+        file_path=path,
+        total_rows=total_rows,
+        created_by=current_user.id,
     )
+    bulk_jobs.submit(job.id)
+    return job
 
 
-class CompanyRowPreview(BaseModel):
-    row: int
-    status: Literal["new", "duplicate", "error"]
-    name: str
-    email: str
-    phone: str
-    website: str
-    is_supplier: bool
-    is_manufacturer: bool
-    comments: str
-    error: Optional[str] = None
-    existing_id: Optional[int] = None
+@router.get("/jobs/{job_id}", response_model=BulkJobOut)
+def get_bulk_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_super_admin),
+):
+    job = db.get(BulkJob, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return job
 
 
-class CompanyPreviewResponse(BaseModel):
-    total: int
-    new_count: int
-    duplicate_count: int
-    error_count: int
-    rows: list[CompanyRowPreview]
+# ══════════════════════════════════════════════════════════════════════════════
+# COMPANIES
+# ══════════════════════════════════════════════════════════════════════════════
+
+@router.get("/companies/template")
+def download_companies_template(request: Request, _: User = Depends(get_current_user)):
+    return _template_response(request, companies_template())
 
 
 @router.post("/companies/preview", response_model=CompanyPreviewResponse)
@@ -525,11 +293,7 @@ def preview_companies_upload(
     db: Session = Depends(get_db),
     _: User = Depends(require_super_admin),
 ):
-    contents = file.file.read()
-    try:
-        wb = load_workbook(BytesIO(contents), read_only=True, data_only=True)
-    except Exception:
-        raise HTTPException(400, "Invalid Excel file")
+    wb = open_workbook(file, settings.MAX_SPREADSHEET_UPLOAD_BYTES)
 
     ws = wb.active
     rows_iter = iter(ws.iter_rows(values_only=True))
@@ -575,15 +339,16 @@ def preview_companies_upload(
             continue
         seen.add(name.lower())
 
-        existing = db.query(Company).filter(Company.name.ilike(name)).first()
         results.append(CompanyRowPreview(
-            row=row_num, status="duplicate" if existing else "new",
+            row=row_num, status="new",
             name=name, email=email, phone=phone, website=website,
             is_supplier=is_supplier, is_manufacturer=is_manufacturer,
             comments=comments,
-            existing_id=existing.id if existing else None,
         ))
 
+    # Duplicate detection — all names against the catalogue at once
+    mark_company_duplicates(db, results)
+
     wb.close()
     return CompanyPreviewResponse(
         total=len(results),
@@ -594,76 +359,20 @@ def preview_companies_upload(
     )
 
 
-class CompanyConfirmRow(BaseModel):
-    row: int
-    action: Literal["create", "update", "skip"]
-    name: str
-    email: str
-    phone: str
-    website: str
-    is_supplier: bool
-    is_manufacturer: bool
-    comments: str
-    existing_id: Optional[int] = None
-
-
-class CompanyConfirmRequest(BaseModel):
-    rows: list[CompanyConfirmRow]
-
-
-class CompanyConfirmResponse(BaseModel):
-    created: int
-    updated: int
-    skipped: int
-    errors: list[str]
-
-
 @router.post("/companies/confirm", response_model=CompanyConfirmResponse)
 def confirm_companies_upload(
     data: CompanyConfirmRequest,
     db: Session = Depends(get_db),
     _: User = Depends(require_super_admin),
 ):
-    created = updated = skipped = 0
-    errors = []
-
-    for row in data.rows:
-        if row.action == "skip":
-            skipped += 1
-            continue
-
-        if row.action == "update" and row.existing_id:
-            company = db.get(Company, row.existing_id)
-            if not company:
-                errors.append(f"Row {row.row}: company id {row.existing_id} not found")
-                continue
-            company.name = row.name
-            company.email = row.email or None
-            company.phone = row.phone or None
-            company.website = row.website or None
-            company.is_supplier = row.is_supplier
-            company.is_manufacturer = row.is_manufacturer
-            company.comments = row.comments or None
-            updated += 1
-
-        elif row.action == "create":
-            company = Company(
-                name=row.name,
-                email=row.email or None,
-                phone=row.phone or None,
-                website=row.website or None,
-                is_supplier=row.is_supplier,
-                is_manufacturer=row.is_manufacturer,
-                comments=row.comments or None,
-                is_active=True,
-            )
-            db.add(company)
-            created += 1
-
     try:
+        result = import_companies(db, data.rows)
         db.commit()
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Database error: {str(e)}")
+    reference_cache.invalidate("companies")
 
-    return CompanyConfirmResponse(created=created, updated=updated, skipped=skipped, errors=errors)
+    return CompanyConfirmResponse(
+        created=result.created, updated=result.updated, skipped=result.skipped, errors=result.errors,
+    )
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
+from app.core.cache import reference_cache
+from app.core.etag import check_etag, with_etag
 from app.models.category import Category
 from app.schemas.category import CategoryOut
 
@@ -13,9 +15,20 @@ def get_db():
     finally:
         db.close()
 
+def load_categories(db: Session) -> tuple[list[CategoryOut], str]:
+    """All categories by name, with ETag — cached, shared with the Bulk router's item template."""
+    # No write endpoints for categories — the TTL alone keeps this fresh
+    return reference_cache.get("categories", None, lambda: with_etag([
+        CategoryOut.model_validate(c) for c in db.query(Category).order_by(Category.name).all()
+    ]))
+
 @router.get("/", response_model=list[CategoryOut])
-def get_categories(db: Session = Depends(get_db)):
-    return db.query(Category).order_by(Category.name).all()
+def get_categories(request: Request, response: Response, db: Session = Depends(get_db)):
+    categories, etag = load_categories(db)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return categories
 
 @router.get("/{category_id}", response_model=CategoryOut)
 def get_category(category_id: int, db: Session = Depends(get_db)):
@@ -1,20 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import Optional
-from pathlib import Path
 from app.auth import get_current_user
 from app.database import SessionLocal
+from app.core.cache import reference_cache
+from app.core.config import settings
+from app.core.etag import check_etag, with_etag
+from app.core import media_store
+from app.core.images import has_variants, variant_urls
 from app.models.company import Company
 from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyOut, PaginatedCompany
-from uuid import uuid4
 from math import ceil
-import os
 
 router = APIRouter(prefix="/companies", tags=["Companies"])
 
-UPLOAD_DIR = Path("media/companies")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 
 def get_db():
     db = SessionLocal()
@@ -26,17 +26,29 @@ def get_db():
 
 @router.get("/all", response_model=list[CompanyOut])
 def list_all_companies(
+    request: Request,
+    response: Response,
     role: Optional[str] = Query(None, description="supplier | manufacturer"),
     db: Session = Depends(get_db),
     _=Depends(get_current_user),
 ):
     """Flat unpaginated list — for populating dropdowns only."""
-    q = db.query(Company).filter(Company.is_active == True)
-    if role == "supplier":
-        q = q.filter(Company.is_supplier == True)
-    elif role == "manufacturer":
-        q = q.filter(Company.is_manufacturer == True)
-    return q.order_by(Company.name).all()
+    if role not in ("supplier", "manufacturer"):
+        role = None
+
+    def load():
+        q = db.query(Company).filter(Company.is_active == True)
+        if role == "supplier":
+            q = q.filter(Company.is_supplier == True)
+        elif role == "manufacturer":
+            q = q.filter(Company.is_manufacturer == True)
+        return with_etag([CompanyOut.model_validate(c) for c in q.order_by(Company.name).all()])
+
+    companies, etag = reference_cache.get("companies", role, load)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return companies
 
 
 @router.get("/", response_model=PaginatedCompany)
@@ -80,7 +92,12 @@ def get_company(company_id: int, db: Session = Depends(get_db)):
 def create_company(data: CompanyCreate, db: Session = Depends(get_db)):
     company = Company(**data.dict())
     db.add(company)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(400, "A company with this name already exists")
+    reference_cache.invalidate("companies")
     db.refresh(company)
     return company
 
@@ -92,7 +109,12 @@ def update_company(company_id: int, data: CompanyUpdate, db: Session = Depends(g
         raise HTTPException(404, "Company not found")
     for key, value in data.dict(exclude_unset=True).items():
         setattr(company, key, value)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(400, "A company with this name already exists")
+    reference_cache.invalidate("companies")
     db.refresh(company)
     return company
 
@@ -108,20 +130,13 @@ def upload_company_logo(
     if not company:
         raise HTTPException(404, "Company not found")
 
-    ext = file.filename.split(".")[-1]
-    filename = f"{uuid4()}.{ext}"
-    relative_path = f"{UPLOAD_DIR}/{filename}"
-
-    with open(os.path.abspath(relative_path), "wb") as buf:
-        buf.write(file.file.read())
-
-    if company.logo_path and os.path.exists(company.logo_path):
-        os.remove(company.logo_path)
-
-    company.logo_path = relative_path
+    path = media_store.put_upload(file, settings.MAX_IMAGE_UPLOAD_BYTES)
+    ready = has_variants(path)
+    old_path, company.logo_path, company.logo_variants_ready = company.logo_path, path, ready
     db.commit()
-    db.refresh(company)
-    return {"logo_path": relative_path}
+    reference_cache.invalidate("companies")
+    media_store.release(db, old_path)
+    return {"logo_path": path, "logo_variants": variant_urls(path) if ready else None}
 
 
 @router.delete("/{company_id}/logo")
@@ -133,8 +148,8 @@ def delete_company_logo(
     company = db.get(Company, company_id)
     if not company or not company.logo_path:
         raise HTTPException(404, "Logo not found")
-    if os.path.exists(company.logo_path):
-        os.remove(company.logo_path)
-    company.logo_path = None
+    old_path, company.logo_path, company.logo_variants_ready = company.logo_path, None, False
     db.commit()
+    reference_cache.invalidate("companies")
+    media_store.release(db, old_path)
     return {"status": "deleted"}
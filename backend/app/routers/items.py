@@ -1,25 +1,27 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload, with_expression
+from sqlalchemy import func, or_, and_, true, select, literal, null, union_all, distinct
 from app.database import SessionLocal
 from app.auth import get_current_user, require_captain, require_super_admin
-from app.models.item import Item
-from app.models.tag import Tag
+from app.models.item import Item, catalogue_key
+from app.models.tag import Tag, item_tags
 from app.models.vessel_item import VesselItem
+from app.models.vessel_item_last_ordered import VesselItemLastOrdered
 from app.models.user import User
 from app.models.category import Category
-from app.models.requisition import Requisition
-from app.models.requisition_item import RequisitionItem
-from app.schemas.item import ItemOut, ItemUpdate, ItemCreate, PaginatedItems, ItemActiveUpdate
-from uuid import uuid4
-from typing import Optional, List
-from pathlib import Path
+from app.core.config import settings
+from app.core.etag import check_etag, make_etag
+from app.core import media_store
+from app.core.images import has_variants, variant_urls
+from app.core.fields import FieldTree, loader_options, page_fields, parse_fields, render, snapshot
+from app.core.pagination import keyset_page
+from app.schemas.item import ItemOut, ItemUpdate, ItemCreate, PaginatedItems, ItemActiveUpdate, ItemFacets
+from datetime import datetime
+from typing import Optional, List, Literal
 from math import ceil
-import os
+import re
 
 router = APIRouter(prefix="/items", tags=["Items"])
-UPLOAD_DIR = Path("media/items")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def get_db():
@@ -37,12 +39,96 @@ def validate_category(db: Session, category_id: int | None):
         raise HTTPException(400, "Invalid category_id")
 
 
-def get_vessel_item_status(db: Session, item_id: int, vessel_id: int) -> bool:
-    override = db.query(VesselItem).filter(
+def with_vessel_status(q, vessel_id: int | None, include_inactive: bool = True, project: bool = True):
+    """
+    Outer-join the vessel's override row and project its state onto
+    Item.vessel_active, in the same statement as the item query.
+    With include_inactive=False, items the vessel opted out of are dropped.
+    Pass project=False for queries that select columns rather than Item.
+    """
+    if not vessel_id:
+        return q
+    q = q.outerjoin(VesselItem, and_(
+        VesselItem.item_id == Item.id,
         VesselItem.vessel_id == vessel_id,
-        VesselItem.item_id == item_id,
-    ).first()
-    return override.is_active if override else True
+    ))
+    if project:
+        q = q.options(with_expression(Item.vessel_active, func.coalesce(VesselItem.is_active, true())))
+    if not include_inactive:
+        # No override row (NULL) means visible — opt-out model
+        q = q.filter(VesselItem.is_active.is_not(False))
+    return q
+
+
+def item_load_options(fields: FieldTree | None = None) -> list:
+    """Loader options for ItemOut — the whole thing, or just what ?fields= asked for."""
+    if fields is None:
+        return [
+            joinedload(Item.manufacturer),
+            joinedload(Item.supplier),
+            joinedload(Item.category),
+            joinedload(Item.tags),
+        ]
+    # name and id are the list's sort / keyset columns
+    return loader_options(Item, fields, always=("id", "name"))
+
+
+def load_item(db: Session, item_id: int, vessel_id: int | None, fields: FieldTree | None = None) -> Item | None:
+    q = db.query(Item).options(*item_load_options(fields)).filter(Item.id == item_id)
+    return with_vessel_status(q, vessel_id).populate_existing().first()
+
+
+def apply_search(q, search: str, search_mode: str):
+    """
+    Filter q by a catalogue search term. Returns (query, rank) — rank is None
+    in "contains" mode, otherwise a similarity score to order by.
+
+    Both modes are backed by the pg_trgm GIN indexes on items:
+      contains — ILIKE '%term%' on name, catalogue_nr, desc_short
+      fuzzy    — contains, plus trigram similarity so typos still match;
+                 catalogue numbers are compared on catalogue_key() so
+                 'FECO25' finds 'FE-CO2-5'
+    """
+    term = search.strip()
+    pattern = f"%{term}%"
+    conditions = [
+        Item.name.ilike(pattern),
+        Item.catalogue_nr.ilike(pattern),
+        Item.desc_short.ilike(pattern),
+    ]
+    if search_mode != "fuzzy":
+        return q.filter(or_(*conditions)), None
+
+    # `%>` is word similarity (term vs. any word run in the column), `%` is
+    # plain similarity — both are index-supported operators, unlike the
+    # similarity() functions used for ranking below.
+    key = re.sub(r"[^a-z0-9]", "", term.lower())
+    conditions += [
+        Item.name.op("%>")(term),
+        Item.desc_short.op("%>")(term),
+    ]
+    scores = [
+        func.word_similarity(term, Item.name),
+        func.word_similarity(term, Item.desc_short),
+    ]
+    if key:
+        conditions.append(catalogue_key(Item.catalogue_nr).op("%")(key))
+        scores.append(func.similarity(catalogue_key(Item.catalogue_nr), key))
+
+    return q.filter(or_(*conditions)), func.greatest(*scores)
+
+
+def item_version(item: Item) -> tuple:
+    """What an ItemOut is built from, as a tuple — an ETag ingredient."""
+    return (
+        item.id,
+        item.updated_at,
+        item.vessel_active,
+        item.manufacturer.updated_at if item.manufacturer else None,
+        item.supplier.updated_at if item.supplier else None,
+        (item.category.name, item.category.is_active) if item.category else None,
+        sorted((t.id, t.name, t.slug, t.color) for t in item.tags),
+    )
 
 
 def attach_tags(db: Session, item: Item, tag_ids: List[int] | None):
@@ -52,6 +138,60 @@ def attach_tags(db: Session, item: Item, tag_ids: List[int] | None):
     item.tags = tags
 
 
+def filter_items(
+    q,
+    current_user: User,
+    search: str | None = None,
+    search_mode: str = "contains",
+    category_id: int | None = None,
+    manufacturer_id: int | None = None,
+    supplier_id: int | None = None,
+    tag_ids: str | None = None,
+    tag_mode: str = "all",
+    show_inactive: str | None = None,
+    show_vessel_inactive: str | None = None,
+    project_vessel_status: bool = True,
+):
+    """Catalogue filters shared by the item list and its facet counts. Returns (query, rank)."""
+    # Global active filter
+    if current_user.role != "super_admin" or show_inactive != "true":
+        q = q.filter(Item.is_active == True)
+
+    # Search — name, catalogue_nr, desc_short
+    rank = None
+    if search and search.strip():
+        q, rank = apply_search(q, search, search_mode)
+
+    if category_id:
+        q = q.filter(Item.category_id == category_id)
+    if manufacturer_id:
+        q = q.filter(Item.manufacturer_id == manufacturer_id)
+    if supplier_id:
+        q = q.filter(Item.supplier_id == supplier_id)
+
+    # Tag filter — one item_tags semi-join whatever the number of tags:
+    #   all: GROUP BY item HAVING count(DISTINCT tag) = n
+    #   any: item has at least one of the tags
+    if tag_ids:
+        ids = {int(i) for i in tag_ids.split(",") if i.strip().isdigit()}
+        if ids:
+            tagged = select(item_tags.c.item_id).where(item_tags.c.tag_id.in_(ids))
+            if tag_mode == "all" and len(ids) > 1:
+                tagged = (
+                    tagged.group_by(item_tags.c.item_id)
+                    .having(func.count(distinct(item_tags.c.tag_id)) == len(ids))
+                )
+            q = q.filter(Item.id.in_(tagged))
+
+    # Vessel-level status, and hide items this vessel has opted out of
+    q = with_vessel_status(
+        q, current_user.vessel_id,
+        include_inactive=show_vessel_inactive == "true",
+        project=project_vessel_status,
+    )
+    return q, rank
+
+
 # ── Recently Ordered ──────────────────────────────────────────────────────────
 
 @router.get("/recently-ordered", response_model=list[ItemOut])
@@ -64,21 +204,7 @@ def recently_ordered(
     if not current_user.vessel_id:
         return []
 
-    # Subquery: latest requisition date per item for this vessel
-    subq = (
-        db.query(
-            RequisitionItem.item_id,
-            func.max(Requisition.created_at).label("last_ordered"),
-        )
-        .join(Requisition, RequisitionItem.requisition_id == Requisition.id)
-        .filter(Requisition.vessel_id == current_user.vessel_id)
-        .group_by(RequisitionItem.item_id)
-        .order_by(func.max(Requisition.created_at).desc())
-        .limit(limit)
-        .subquery()
-    )
-
-    items = (
+    q = (
         db.query(Item)
         .options(
             joinedload(Item.manufacturer),
@@ -86,113 +212,184 @@ def recently_ordered(
             joinedload(Item.category),
             joinedload(Item.tags),
         )
-        .join(subq, Item.id == subq.c.item_id)
+        .join(VesselItemLastOrdered, and_(
+            VesselItemLastOrdered.item_id == Item.id,
+            VesselItemLastOrdered.vessel_id == current_user.vessel_id,
+        ))
         .filter(Item.is_active == True)
-        .order_by(subq.c.last_ordered.desc())
+    )
+    return (
+        with_vessel_status(q, current_user.vessel_id)
+        .order_by(VesselItemLastOrdered.last_ordered_at.desc(), Item.id)
+        .limit(limit)
         .all()
     )
 
-    for item in items:
-        item._vessel_active = get_vessel_item_status(db, item.id, current_user.vessel_id)
 
-    return items
+# ── Facets ────────────────────────────────────────────────────────────────────
+
+FACETS_MAX_AGE = 60  # seconds
+
+
+@router.get("/facets", response_model=ItemFacets)
+def get_item_facets(
+    response: Response,
+    search: Optional[str] = Query(None),
+    search_mode: Literal["contains", "fuzzy"] = Query("contains"),
+    category_id: Optional[int] = Query(None),
+    manufacturer_id: Optional[int] = Query(None),
+    supplier_id: Optional[int] = Query(None),
+    tag_ids: Optional[str] = Query(None),  # comma-separated: "1,2,3"
+    tag_mode: Literal["any", "all"] = Query("all"),
+    show_inactive: Optional[str] = Query(None),
+    show_vessel_inactive: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Result counts per category / manufacturer / supplier / tag for the same
+    filters GET /items/ takes, in one statement.
+
+    Each single-select dimension is counted with every filter except its
+    own, so the counts answer "how many results if I pick this instead".
+    With tag_mode=all another tag narrows the result, so tag counts apply
+    every filter; with tag_mode=any it widens it, so the tag filter is dropped.
+    """
+    filters = dict(
+        search=search, search_mode=search_mode,
+        category_id=category_id, manufacturer_id=manufacturer_id, supplier_id=supplier_id,
+        tag_ids=tag_ids, tag_mode=tag_mode, show_inactive=show_inactive, show_vessel_inactive=show_vessel_inactive,
+    )
+
+    def matched(name: str, **overrides):
+        q = db.query(Item.id, Item.category_id, Item.manufacturer_id, Item.supplier_id)
+        q, _ = filter_items(q, current_user, project_vessel_status=False, **{**filters, **overrides})
+        return q.cte(name)
+
+    # Dimensions without an active filter share the fully-filtered CTE
+    everything = matched("matched")
+    by_category = matched("matched_any_category", category_id=None) if category_id else everything
+    by_manufacturer = matched("matched_any_manufacturer", manufacturer_id=None) if manufacturer_id else everything
+    by_supplier = matched("matched_any_supplier", supplier_id=None) if supplier_id else everything
+    by_tag = matched("matched_any_tag", tag_ids=None) if tag_ids and tag_mode == "any" else everything
+
+    stmt = union_all(
+        select(literal("total").label("facet"), null().label("value"), func.count().label("n"))
+        .select_from(everything),
+        select(literal("category"), by_category.c.category_id, func.count())
+        .group_by(by_category.c.category_id),
+        select(literal("manufacturer"), by_manufacturer.c.manufacturer_id, func.count())
+        .where(by_manufacturer.c.manufacturer_id.is_not(None))
+        .group_by(by_manufacturer.c.manufacturer_id),
+        select(literal("supplier"), by_supplier.c.supplier_id, func.count())
+        .where(by_supplier.c.supplier_id.is_not(None))
+        .group_by(by_supplier.c.supplier_id),
+        select(literal("tag"), item_tags.c.tag_id, func.count())
+        .join_from(by_tag, item_tags, item_tags.c.item_id == by_tag.c.id)
+        .group_by(item_tags.c.tag_id),
+    )
+
+    facets = {"total": 0, "category": [], "manufacturer": [], "supplier": [], "tag": []}
+    for facet, value, n in db.execute(stmt):
+        if facet == "total":
+            facets["total"] = n
+        else:
+            facets[facet].append({"id": value, "count": n})
+    for counts in (facets["category"], facets["manufacturer"], facets["supplier"], facets["tag"]):
+        counts.sort(key=lambda c: (-c["count"], c["id"]))
+
+    # Filters are all in the URL and results are scoped to the caller's vessel,
+    # so the browser may reuse them for a short while
+    response.headers["Cache-Control"] = f"private, max-age={FACETS_MAX_AGE}"
+    response.headers["Vary"] = "Authorization"
+
+    return {
+        "total": facets["total"],
+        "categories": facets["category"],
+        "manufacturers": facets["manufacturer"],
+        "suppliers": facets["supplier"],
+        "tags": facets["tag"],
+    }
 
 
 # ── List / Search ─────────────────────────────────────────────────────────────
 
 @router.get("/", response_model=PaginatedItems)
 def get_items(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None),
+    search_mode: Literal["contains", "fuzzy"] = Query("contains"),
     category_id: Optional[int] = Query(None),
     manufacturer_id: Optional[int] = Query(None),
     supplier_id: Optional[int] = Query(None),
     tag_ids: Optional[str] = Query(None),  # comma-separated: "1,2,3"
+    tag_mode: Literal["any", "all"] = Query("all"),
     show_inactive: Optional[str] = Query(None),
     show_vessel_inactive: Optional[str] = Query(None),
+    pagination: Literal["page", "cursor"] = Query("page"),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    fields: Optional[str] = Query(None),  # comma-separated, e.g. "id,name,unit,catalogue_nr"
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    q = (
-        db.query(Item)
-        .options(
-            joinedload(Item.manufacturer),
-            joinedload(Item.supplier),
-            joinedload(Item.category),
-            joinedload(Item.tags),
-        )
+    """
+    Two pagination modes:
+      page   — ?page=N, with total and pages (default)
+      cursor — ?pagination=cursor, then follow next_cursor / prev_cursor;
+               total is only computed with ?include_total=true
+
+    ?fields= trims each item to the listed ItemOut fields (dots for nested
+    ones, e.g. manufacturer.name) and loads only those.
+    """
+    item_fields = parse_fields(fields, ItemOut)
+    q = db.query(Item).options(*item_load_options(item_fields))
+    q, rank = filter_items(
+        q, current_user,
+        search=search, search_mode=search_mode,
+        category_id=category_id, manufacturer_id=manufacturer_id, supplier_id=supplier_id,
+        tag_ids=tag_ids, tag_mode=tag_mode, show_inactive=show_inactive, show_vessel_inactive=show_vessel_inactive,
     )
 
-    # Global active filter
-    if current_user.role != "super_admin" or show_inactive != "true":
-        q = q.filter(Item.is_active == True)
-
-    # Search — name, catalogue_nr, desc_short
-    if search:
-        term = f"%{search}%"
-        q = q.filter(
-            Item.name.ilike(term) |
-            Item.catalogue_nr.ilike(term) |
-            Item.desc_short.ilike(term)
-        )
-
-    if category_id:
-        q = q.filter(Item.category_id == category_id)
-    if manufacturer_id:
-        q = q.filter(Item.manufacturer_id == manufacturer_id)
-    if supplier_id:
-        q = q.filter(Item.supplier_id == supplier_id)
-
-    # Tag filter — item must have ALL specified tags
-    if tag_ids:
-        ids = [int(i) for i in tag_ids.split(",") if i.strip().isdigit()]
-        for tid in ids:
-            q = q.filter(Item.tags.any(Tag.id == tid))
-
-    total = q.count()
-    items = q.order_by(Item.name).offset((page - 1) * page_size).limit(page_size).all()
-
-    # Attach vessel-level active status
-    vessel_id = current_user.vessel_id
-    if vessel_id:
-        item_ids = [i.id for i in items]
-        overrides = {
-            vi.item_id: vi.is_active
-            for vi in db.query(VesselItem).filter(
-                VesselItem.vessel_id == vessel_id,
-                VesselItem.item_id.in_(item_ids),
-            ).all()
+    if cursor or pagination == "cursor":
+        # Keyset mode — cost is independent of depth; total only on request
+        if rank is not None:
+            raise HTTPException(400, "Cursor pagination is not supported with search_mode=fuzzy")
+        items, next_cursor, prev_cursor = keyset_page(q, [Item.name, Item.id], cursor, page_size)
+        result = {
+            "items": items,
+            "total": q.count() if include_total else None,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
         }
-        for item in items:
-            item._vessel_active = overrides.get(item.id, True)
-
-        if show_vessel_inactive != "true":
-            # Re-count and re-fetch excluding vessel-inactive items
-            vessel_inactive_ids = {
-                vi.item_id
-                for vi in db.query(VesselItem).filter(
-                    VesselItem.vessel_id == vessel_id,
-                    VesselItem.is_active == False,
-                ).all()
-            }
-            if vessel_inactive_ids:
-                q = q.filter(~Item.id.in_(vessel_inactive_ids))
-                total = q.count()
-                items = q.order_by(Item.name).offset((page - 1) * page_size).limit(page_size).all()
-                for item in items:
-                    item._vessel_active = True
     else:
-        for item in items:
-            item._vessel_active = True
+        # Fuzzy search ranks best matches first; otherwise alphabetical
+        order = [Item.name, Item.id] if rank is None else [rank.desc(), Item.name, Item.id]
+        total = q.count()
+        items = q.order_by(*order).offset((page - 1) * page_size).limit(page_size).all()
+        result = {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": ceil(total / page_size) if total > 0 else 1,
+        }
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "pages": ceil(total / page_size) if total > 0 else 1,
-    }
+    etag = make_etag(
+        current_user.vessel_id, current_user.role, str(request.query_params),
+        result.get("total"), result.get("next_cursor"), result.get("prev_cursor"),
+        [item_version(i) if item_fields is None else snapshot(i, item_fields) for i in items],
+    )
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    if item_fields is not None:
+        return render(PaginatedItems, page_fields(PaginatedItems, item_fields), result, response)
+    return result
 
 
 # ── Single item ───────────────────────────────────────────────────────────────
@@ -200,23 +397,25 @@ def get_items(
 @router.get("/{item_id}", response_model=ItemOut)
 def get_item(
     item_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    item = (
-        db.query(Item)
-        .options(
-            joinedload(Item.manufacturer),
-            joinedload(Item.supplier),
-            joinedload(Item.category),
-            joinedload(Item.tags),
-        )
-        .filter(Item.id == item_id)
-        .first()
-    )
+    item_fields = parse_fields(fields, ItemOut)
+    item = load_item(db, item_id, current_user.vessel_id, item_fields)
     if not item:
         raise HTTPException(404, "Item not found")
-    item._vessel_active = get_vessel_item_status(db, item.id, current_user.vessel_id) if current_user.vessel_id else True
+    if item_fields is None:
+        etag = make_etag(item_version(item))
+    else:
+        etag = make_etag(str(request.query_params), snapshot(item, item_fields))
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    if item_fields is not None:
+        return render(ItemOut, item_fields, item, response)
     return item
 
 
@@ -234,7 +433,6 @@ def create_item(
     attach_tags(db, db_item, item.tag_ids)
     db.commit()
     db.refresh(db_item)
-    db_item._vessel_active = True
     return db_item
 
 
@@ -257,11 +455,11 @@ def update_item(
 
     if item.tag_ids is not None:
         attach_tags(db, db_item, item.tag_ids)
+        # Collection-only changes don't UPDATE the items row by themselves
+        db_item.updated_at = datetime.utcnow()
 
     db.commit()
-    db.refresh(db_item)
-    db_item._vessel_active = get_vessel_item_status(db, db_item.id, current_user.vessel_id) if current_user.vessel_id else True
-    return db_item
+    return load_item(db, db_item.id, current_user.vessel_id)
 
 
 # ── Active toggles ────────────────────────────────────────────────────────────
@@ -323,14 +521,12 @@ def upload_item_image(
     item = db.get(Item, item_id)
     if not item:
         raise HTTPException(404, "Item not found")
-    ext = file.filename.split(".")[-1]
-    filename = f"{uuid4()}.{ext}"
-    relative_path = f"{UPLOAD_DIR}/{filename}"
-    with open(os.path.abspath(relative_path), "wb") as buf:
-        buf.write(file.file.read())
-    item.image_path = relative_path
+    path = media_store.put_upload(file, settings.MAX_IMAGE_UPLOAD_BYTES)
+    ready = has_variants(path)
+    old_path, item.image_path, item.image_variants_ready = item.image_path, path, ready
     db.commit()
-    return {"image_path": relative_path}
+    media_store.release(db, old_path)
+    return {"image_path": path, "image_variants": variant_urls(path) if ready else None}
 
 
 @router.delete("/{item_id}/image")
@@ -342,8 +538,7 @@ def delete_item_image(
     item = db.get(Item, item_id)
     if not item or not item.image_path:
         raise HTTPException(404, "Image not found")
-    if os.path.exists(item.image_path):
-        os.remove(item.image_path)
-    item.image_path = None
+    old_path, item.image_path, item.image_variants_ready = item.image_path, None, False
     db.commit()
+    media_store.release(db, old_path)
     return {"status": "deleted"}
@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Literal
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, distinct, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, timedelta
 from fastapi.responses import StreamingResponse
-from openpyxl import Workbook
-from openpyxl.styles import Font, Border, Side, Alignment
-from io import BytesIO
 from math import ceil
 
 from app.database import SessionLocal
 from app.models.requisition import Requisition
 from app.models.requisition_item import RequisitionItem
+from app.models.item import Item
 from app.models.user import User
+from app.models.vessel_item_last_ordered import VesselItemLastOrdered
 from app.auth import get_current_user, require_captain
-from app.schemas.requisition import RequisitionCreate, RequisitionUpdate, RequisitionOut, PaginatedRequisitions
+from app.core.etag import check_etag, make_etag
+from app.core.export import (
+    MEDIA_TYPES, delimited_chunks, iter_lines, load_headers, load_widths, xlsx_chunks, zip_chunks,
+)
+from app.core.fields import loader_options, page_fields, parse_fields, render, snapshot
+from app.core.pagination import keyset_page
+from app.routers.items import item_load_options, item_version
+from app.schemas.company import CompanyOut
+from app.schemas.requisition import (
+    RequisitionCreate, RequisitionUpdate, RequisitionOut, RequisitionSummaryOut,
+    PaginatedRequisitions, PaginatedRequisitionSummaries, RequisitionExportRequest,
+)
 
 ALLOWED_STATUS_TRANSITIONS = {
     "draft": {"rfq_sent", "cancelled"},
@@ -68,6 +81,104 @@ def get_req_or_404(req_id: int, vessel_id: int, db: Session) -> Requisition:
     return req
 
 
+def requisition_version(req: Requisition) -> tuple:
+    """What a RequisitionOut is built from, as a tuple — an ETag ingredient."""
+    return (
+        req.id,
+        req.updated_at,
+        req.supplier.updated_at if req.supplier else None,
+        [(line.id, line.quantity, line.received_qty, item_version(line.item)) for line in req.items],
+    )
+
+
+def requisition_summaries(db: Session, reqs: list[Requisition]) -> list[RequisitionSummaryOut]:
+    """Header fields plus line totals for a page of requisitions — one grouped query, no lines loaded."""
+    totals = {}
+    if reqs:
+        quantity = func.coalesce(func.sum(RequisitionItem.quantity), 0)
+        received = func.coalesce(func.sum(RequisitionItem.received_qty), 0)
+        rows = (
+            db.query(
+                RequisitionItem.requisition_id,
+                func.count(RequisitionItem.id),
+                quantity,
+                received,
+                func.coalesce(func.round(100.0 * received / func.nullif(quantity, 0), 1), 0),
+            )
+            .filter(RequisitionItem.requisition_id.in_([r.id for r in reqs]))
+            .group_by(RequisitionItem.requisition_id)
+        )
+        totals = {req_id: line_totals for req_id, *line_totals in rows}
+
+    summaries = []
+    for r in reqs:
+        line_count, total_quantity, received_quantity, percent_received = totals.get(r.id, (0, 0, 0, 0))
+        summaries.append(RequisitionSummaryOut(
+            id=r.id,
+            status=r.status,
+            created_at=r.created_at,
+            supplier=CompanyOut.model_validate(r.supplier) if r.supplier else None,
+            notes=r.notes,
+            is_active=r.is_active,
+            line_count=line_count,
+            total_quantity=total_quantity,
+            received_quantity=received_quantity,
+            percent_received=percent_received,
+        ))
+    return summaries
+
+
+# ── Last-ordered bookkeeping ──────────────────────────────────────────────────
+# vessel_item_last_ordered backs GET /items/recently-ordered. Keep it in step
+# with requisition lines in the same transaction as the line changes.
+
+def record_ordered_items(db: Session, vessel_id: int, ordered_at: datetime, item_ids):
+    """Items newly placed on one requisition — bump their last-ordered row."""
+    item_ids = set(item_ids)
+    if not item_ids:
+        return
+    stmt = pg_insert(VesselItemLastOrdered).values([
+        {"vessel_id": vessel_id, "item_id": item_id, "last_ordered_at": ordered_at, "order_count": 1}
+        for item_id in item_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["vessel_id", "item_id"],
+        set_={
+            "last_ordered_at": func.greatest(VesselItemLastOrdered.last_ordered_at, stmt.excluded.last_ordered_at),
+            "order_count": VesselItemLastOrdered.order_count + 1,
+        },
+    )
+    db.execute(stmt)
+
+
+def refresh_ordered_items(db: Session, vessel_id: int, item_ids):
+    """Items taken off a requisition — recompute their rows from the remaining lines."""
+    item_ids = set(item_ids)
+    if not item_ids:
+        return
+    db.flush()
+    rows = (
+        db.query(
+            RequisitionItem.item_id,
+            func.max(Requisition.created_at),
+            func.count(distinct(Requisition.id)),
+        )
+        .join(Requisition, RequisitionItem.requisition_id == Requisition.id)
+        .filter(Requisition.vessel_id == vessel_id, RequisitionItem.item_id.in_(item_ids))
+        .group_by(RequisitionItem.item_id)
+        .all()
+    )
+    db.query(VesselItemLastOrdered).filter(
+        VesselItemLastOrdered.vessel_id == vessel_id,
+        VesselItemLastOrdered.item_id.in_(item_ids),
+    ).delete(synchronize_session=False)
+    if rows:
+        db.execute(insert(VesselItemLastOrdered), [
+            {"vessel_id": vessel_id, "item_id": item_id, "last_ordered_at": last, "order_count": count}
+            for item_id, last, count in rows
+        ])
+
+
 @router.post("/", response_model=RequisitionOut)
 def create_requisition(
     data: RequisitionCreate,
@@ -96,6 +207,7 @@ def create_requisition(
                 quantity=row.quantity,
                 received_qty=0,
             ))
+        record_ordered_items(db, requisition.vessel_id, requisition.created_at, [row.item_id for row in data.items])
 
         db.commit()
         db.refresh(requisition)
@@ -105,27 +217,44 @@ def create_requisition(
         raise
 
 
-@router.get("/", response_model=PaginatedRequisitions)
+@router.get("/", response_model=PaginatedRequisitions | PaginatedRequisitionSummaries)
 def list_requisitions(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status: str | None = None,
     supplier_id: int | None = None,
     active_only: bool = Query(True),   # ← default True
+    pagination: Literal["page", "cursor"] = Query("page"),
+    cursor: str | None = None,
+    include_total: bool = Query(False),
+    view: Literal["full", "summary"] = Query("full"),
+    fields: str | None = None,  # e.g. "id,status,items.quantity,items.item.name"
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Newest first. Same page / cursor modes as GET /items/.
+
+    view=summary drops the nested lines and returns line_count,
+    total_quantity, received_quantity and percent_received instead.
+    ?fields= trims each requisition to the listed fields of whichever view.
+    """
 
     CLOSED_STATUSES = ["received", "cancelled"]
 
-    q = (
-        db.query(Requisition)
-        .options(
+    req_fields = parse_fields(fields, RequisitionSummaryOut if view == "summary" else RequisitionOut)
+
+    q = db.query(Requisition).filter(Requisition.vessel_id == current_user.vessel_id)
+    if view == "summary":
+        q = q.options(joinedload(Requisition.supplier))
+    elif req_fields is None:
+        # selectin, not joined — a joined collection under LIMIT multiplies rows
+        q = q.options(
             joinedload(Requisition.supplier),
-            joinedload(Requisition.items),
+            selectinload(Requisition.items).joinedload(RequisitionItem.item).options(*item_load_options()),
         )
-        .filter(Requisition.vessel_id == current_user.vessel_id)
-    )
+    else:
+        q = q.options(*loader_options(Requisition, req_fields, always=("id", "created_at")))
 
     if status:
         q = q.filter(Requisition.status == status)
@@ -136,34 +265,76 @@ def list_requisitions(
     if supplier_id:
         q = q.filter(Requisition.supplier_id == supplier_id)
 
-    total = q.count()
-    items = (
-        q.order_by(Requisition.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    if cursor or pagination == "cursor":
+        items, next_cursor, prev_cursor = keyset_page(
+            q, [Requisition.created_at, Requisition.id], cursor, page_size, descending=True,
+        )
+        result = {
+            "items": items,
+            "total": q.count() if include_total else None,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
+    else:
+        total = q.count()
+        items = (
+            q.order_by(Requisition.created_at.desc(), Requisition.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .all()
+        )
+        result = {"items": items, "total": total, "page": page, "page_size": page_size, "pages": ceil(total / page_size)}
 
-    return {"items": items, "total": total, "page": page, "page_size": page_size, "pages": ceil(total / page_size)}
+    page_model = PaginatedRequisitions
+    if view == "summary":
+        result["items"] = requisition_summaries(db, items)
+        page_model = PaginatedRequisitionSummaries
+    if req_fields is not None:
+        return render(page_model, page_fields(page_model, req_fields), result)
+    return page_model(**result) if view == "summary" else result
 
 
 @router.get("/{req_id}", response_model=RequisitionOut)
 def get_requisition(
     req_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    req_fields = parse_fields(fields, RequisitionOut)
+    if req_fields is None:
+        options = [
+            joinedload(Requisition.supplier),
+            joinedload(Requisition.items).joinedload(RequisitionItem.item).options(
+                joinedload(Item.manufacturer),
+                joinedload(Item.supplier),
+                joinedload(Item.category),
+                selectinload(Item.tags),
+            ),
+        ]
+    else:
+        options = loader_options(Requisition, req_fields, always=("id",))
+
     req = (
         db.query(Requisition)
-        .options(
-            joinedload(Requisition.supplier),
-            joinedload(Requisition.items).joinedload(RequisitionItem.item),
-        )
+        .options(*options)
         .filter(Requisition.id == req_id, Requisition.vessel_id == current_user.vessel_id)
         .first()
     )
     if not req:
         raise HTTPException(404, "Requisition not found")
+    if req_fields is None:
+        etag = make_etag(requisition_version(req))
+    else:
+        etag = make_etag(str(request.query_params), snapshot(req, req_fields))
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    if req_fields is not None:
+        return render(RequisitionOut, req_fields, req, response)
     return req
 
 
@@ -217,10 +388,15 @@ def edit_requisition(
     if data.notes is not None:
         req.notes = data.notes
     if data.items is not None:
+        old_ids = {line.item_id for line in req.items}
+        new_ids = {row.item_id for row in data.items}
         req.items.clear()
         db.flush()
         for row in data.items:
             req.items.append(RequisitionItem(item_id=row.item_id, quantity=row.quantity, received_qty=0))
+        record_ordered_items(db, req.vessel_id, req.created_at, new_ids - old_ids)
+        refresh_ordered_items(db, req.vessel_id, old_ids - new_ids)
+        req.updated_at = datetime.utcnow()
 
     db.commit()
 
@@ -258,6 +434,8 @@ def add_item_to_requisition(
         existing.quantity += qty
     else:
         req.items.append(RequisitionItem(item_id=item_id, quantity=qty, received_qty=0))
+        record_ordered_items(db, req.vessel_id, req.created_at, [item_id])
+    req.updated_at = datetime.utcnow()
 
     db.commit()
     db.refresh(req)
@@ -299,6 +477,7 @@ def receive_item(
     total = sum(i.quantity for i in req.items)
     received = sum(i.received_qty for i in req.items)
     req.status = "received" if received >= total else "partially_received"
+    req.updated_at = datetime.utcnow()
 
     db.commit()
     db.refresh(req)
@@ -314,64 +493,82 @@ def delete_requisition(
     req = get_req_or_404(req_id, current_user.vessel_id, db)
     if not can_delete(req, current_user):
         raise HTTPException(403, "Only captain can delete draft or cancelled requisitions")
+    item_ids = {line.item_id for line in req.items}
     db.delete(req)
+    refresh_ordered_items(db, req.vessel_id, item_ids)
     db.commit()
     return {"status": "deleted"}
 
 
+EXPORT_MAX_REQUISITIONS = 500
+
+
+@router.post("/export")
+def export_requisitions(
+    data: RequisitionExportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Several requisitions in one download — layout=zip gives a workbook per
+    requisition, layout=workbook one workbook with a sheet each.
+    """
+    if not (data.ids or data.status or data.supplier_id or data.date_from or data.date_to):
+        raise HTTPException(400, "Provide ids or at least one filter")
+
+    q = db.query(Requisition.id).filter(Requisition.vessel_id == current_user.vessel_id)
+    if data.ids:
+        q = q.filter(Requisition.id.in_(data.ids))
+    if data.status:
+        q = q.filter(Requisition.status == data.status)
+    if data.supplier_id:
+        q = q.filter(Requisition.supplier_id == data.supplier_id)
+    if data.date_from:
+        q = q.filter(Requisition.created_at >= data.date_from)
+    if data.date_to:
+        q = q.filter(Requisition.created_at < data.date_to + timedelta(days=1))
+
+    req_ids = [req_id for (req_id,) in q.order_by(Requisition.id).limit(EXPORT_MAX_REQUISITIONS + 1)]
+    if not req_ids:
+        raise HTTPException(404, "No requisitions match")
+    if len(req_ids) > EXPORT_MAX_REQUISITIONS:
+        raise HTTPException(400, f"Too many requisitions — export at most {EXPORT_MAX_REQUISITIONS} at a time")
+
+    headers = load_headers(db, current_user.vessel_id, req_ids)
+    widths = load_widths(db, headers)
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    if data.layout == "zip":
+        body, media_type, filename = zip_chunks(headers, widths), "application/zip", f"requisitions_{stamp}.zip"
+    else:
+        body = xlsx_chunks(headers, widths, titles=lambda h: f"Requisition {h['id']}")
+        media_type, filename = MEDIA_TYPES["xlsx"], f"requisitions_{stamp}.xlsx"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @router.get("/{req_id}/export")
 def export_requisition(
     req_id: int,
+    format: Literal["xlsx", "csv", "tsv"] = Query("xlsx"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    req = (
-        db.query(Requisition)
-        .options(
-            joinedload(Requisition.supplier),
-            joinedload(Requisition.items).joinedload(RequisitionItem.item),
-        )
-        .filter(Requisition.id == req_id, Requisition.vessel_id == current_user.vessel_id)
-        .first()
-    )
-    if not req:
+    """Lines are streamed as the file is written — see app.core.export."""
+    headers = load_headers(db, current_user.vessel_id, [req_id])
+    if not headers:
         raise HTTPException(404, "Requisition not found")
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Requisition"
-    thin = Side(border_style="thin")
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
-
-    ws["B1"] = "Requisition ID"; ws["C1"] = req.id
-    ws["B2"] = "Status";          ws["C2"] = req.status
-    ws["B3"] = "Vessel";          ws["C3"] = req.vessel.name if req.vessel else ""
-    ws["B4"] = "Supplier";        ws["C4"] = req.supplier.name if req.supplier else ""
-    ws["B5"] = "Created";         ws["C5"] = req.created_at.strftime("%d-%m-%Y")
-
-    ws.append([])
-    ws.append(["Nr", "Item", "Unit", "Qty", "Received", "Description"])
-    for cell in ws[7]:
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="center")
-
-    for idx, line in enumerate(req.items, start=1):
-        ws.append([idx, line.item.name, line.item.unit, line.quantity, line.received_qty, line.item.desc_short or ""])
-
-    for row in ws.iter_rows(min_row=7):
-        for cell in row:
-            cell.border = border
-            cell.alignment = Alignment(vertical="center")
-
-    for col in ws.columns:
-        max_len = max((len(str(cell.value or "")) for cell in col), default=0)
-        ws.column_dimensions[col[0].column_letter].width = max_len + 4
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
+    if format == "xlsx":
+        body = xlsx_chunks(headers, load_widths(db, headers))
+    else:
+        body = delimited_chunks(headers, iter_lines([req_id]), "," if format == "csv" else "\t")
+
     return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=requisition_{req.id}.xlsx"},
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=requisition_{req_id}.{format}"},
     )
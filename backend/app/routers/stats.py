@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.auth import require_super_admin
+from app.core.cache import reference_cache
+from app.core.passwords import password_hasher
+from app.models.user import User
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+@router.get("/cache")
+def cache_stats(_: User = Depends(require_super_admin)):
+    """Reference-data cache hit/miss counters for this worker process."""
+    return reference_cache.stats()
+
+
+@router.get("/passwords")
+def password_stats(_: User = Depends(require_super_admin)):
+    """Password hashing pool load — queue depth, rejections, latency — for this worker process."""
+    return password_hasher.stats()
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.auth import get_current_user, require_super_admin
+from app.core.cache import reference_cache
+from app.core.etag import check_etag, with_etag
 from app.models.tag import Tag
 from app.models.user import User
 from app.schemas.tag import TagOut, TagCreate, TagUpdate
@@ -22,9 +24,25 @@ def make_slug(name: str) -> str:
     return re.sub(r'[^a-z0-9]+', '-', name.lower().strip()).strip('-')
 
 
+def load_tags(db: Session) -> tuple[list[TagOut], str]:
+    """All tags by name, with ETag — cached, shared with the Bulk router's item template."""
+    return reference_cache.get("tags", None, lambda: with_etag([
+        TagOut.model_validate(t) for t in db.query(Tag).order_by(Tag.name).all()
+    ]))
+
+
 @router.get("/", response_model=list[TagOut])
-def list_tags(db: Session = Depends(get_db), _: User = Depends(get_current_user)):
-    return db.query(Tag).order_by(Tag.name).all()
+def list_tags(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_user),
+):
+    tags, etag = load_tags(db)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return tags
 
 
 @router.post("/", response_model=TagOut, status_code=201)
@@ -39,6 +57,7 @@ def create_tag(
     tag = Tag(name=data.name, slug=slug, color=data.color or "#6b7280")
     db.add(tag)
     db.commit()
+    reference_cache.invalidate("tags")
     db.refresh(tag)
     return tag
 
@@ -59,6 +78,7 @@ def update_tag(
     if data.color:
         tag.color = data.color
     db.commit()
+    reference_cache.invalidate("tags")
     db.refresh(tag)
     return tag
 
@@ -74,4 +94,5 @@ def delete_tag(
         raise HTTPException(404, "Tag not found")
     db.delete(tag)
     db.commit()
+    reference_cache.invalidate("tags")
     return {"status": "deleted"}
@@ -4,7 +4,10 @@ from uuid import UUID
 from pydantic import BaseModel
 
 from app.database import SessionLocal
-from app.auth import get_current_user, require_captain, hash_password, verify_password
+from app.auth import (
+    get_current_user, get_current_user_full, require_captain, hash_password, verify_password,
+    revoke_tokens, token_for, user_changed,
+)
 from app.models.user import User
 from app.schemas.user import UserOut, CrewCreate, UserUpdate
 
@@ -29,7 +32,7 @@ class ResetPasswordRequest(BaseModel):
 
 
 @router.get("/me", response_model=UserOut)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: UserOut = Depends(get_current_user_full)):
     return current_user
 
 
@@ -52,8 +55,11 @@ def change_own_password(
         raise HTTPException(400, "Current password is incorrect")
 
     user.password_hash = hash_password(data.new_password)
+    revoke_tokens(user)
     db.commit()
-    return {"status": "password changed"}
+    user_changed(user)
+    # Other sessions are signed out; this one carries on with a fresh token
+    return {"status": "password changed", "access_token": token_for(user), "token_type": "bearer"}
 
 
 @router.get("/", response_model=list[UserOut])
@@ -117,7 +123,9 @@ def reset_crew_password(
         raise HTTPException(403, "Forbidden")
 
     user.password_hash = hash_password(data.new_password)
+    revoke_tokens(user)
     db.commit()
+    user_changed(user)
     return {"status": "password reset"}
 
 
@@ -143,11 +151,16 @@ def update_crew(
     if "password" in update_data:
         update_data["password_hash"] = hash_password(update_data.pop("password"))
 
+    # The role travels in the token, so a role change needs a fresh login
+    if "password_hash" in update_data or update_data.get("role", user.role) != user.role:
+        revoke_tokens(user)
+
     for key, value in update_data.items():
         setattr(user, key, value)
 
     db.commit()
     db.refresh(user)
+    user_changed(user)
     return user
 
 
@@ -172,4 +185,5 @@ def deactivate_crew(
 
     user.is_active = False
     db.commit()
+    user_changed(user)
     return {"status": "deactivated"}
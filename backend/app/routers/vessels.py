@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.database import SessionLocal
 from app.auth import get_current_user, require_super_admin, hash_password
+from app.core.cache import reference_cache
+from app.core.etag import check_etag, with_etag
+from app.core.revocation import revocations
 from app.models.vessel import Vessel
 from app.models.user import User
 from app.models.item import Item
@@ -43,18 +46,30 @@ def _with_stats(vessel: Vessel, db: Session) -> VesselOutWithStats:
     )
 
 
+def public_vessels(db: Session) -> tuple[list[dict], str]:
+    """Active vessels for the login dropdown, with ETag — cached, shared with the Auth router."""
+    def load():
+        vessels = (
+            db.query(Vessel.id, Vessel.name)
+            .filter(Vessel.is_active == True)
+            .order_by(Vessel.name)
+            .all()
+        )
+        return with_etag([{"id": v.id, "name": v.name} for v in vessels])
+
+    return reference_cache.get("vessels", None, load)
+
+
 # ── Public ────────────────────────────────────────────────────────────────────
 
 @router.get("/public")
-def list_vessels_public(db: Session = Depends(get_db)):
+def list_vessels_public(request: Request, response: Response, db: Session = Depends(get_db)):
     """Public endpoint for the login page vessel dropdown."""
-    vessels = (
-        db.query(Vessel.id, Vessel.name)
-        .filter(Vessel.is_active == True)
-        .order_by(Vessel.name)
-        .all()
-    )
-    return [{"id": v.id, "name": v.name} for v in vessels]
+    vessels, etag = public_vessels(db)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return vessels
 
 
 @router.post("/register", response_model=VesselOut, status_code=201)
@@ -67,6 +82,9 @@ def register_vessel(data: VesselCreate, db: Session = Depends(get_db)):
         if db.query(Vessel).filter(Vessel.imo_number == data.imo_number).first():
             raise HTTPException(400, "A vessel with this IMO number already exists")
 
+    # Hash before opening the transaction rather than inside it
+    password_hash = hash_password(data.captain_password)
+
     try:
         vessel = Vessel(
             name=data.name,
@@ -82,11 +100,12 @@ def register_vessel(data: VesselCreate, db: Session = Depends(get_db)):
             username=data.captain_username,
             full_name=data.captain_full_name,
             role="captain",
-            password_hash=hash_password(data.captain_password),
+            password_hash=password_hash,
             vessel_id=vessel.id,
         )
         db.add(captain)
         db.commit()
+        reference_cache.invalidate("vessels")
         db.refresh(vessel)
         return vessel
 
@@ -140,6 +159,8 @@ def update_vessel(
         setattr(vessel, key, value)
 
     db.commit()
+    reference_cache.invalidate("vessels")
+    revocations.set_vessel_active(vessel_id, vessel.is_active)
     db.refresh(vessel)
     return vessel
 
@@ -155,4 +176,6 @@ def deactivate_vessel(
         raise HTTPException(404, "Vessel not found")
     vessel.is_active = False
     db.commit()
+    reference_cache.invalidate("vessels")
+    revocations.set_vessel_active(vessel_id, False)
     return {"status": "deactivated"}
\ No newline at end of file
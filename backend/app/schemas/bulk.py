@@ -0,0 +1,151 @@
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+# ── Items ────────────────────────────────────────────────────────────────────
+
+class ItemRowPreview(BaseModel):
+    row: int
+    status: Literal["new", "duplicate", "error"]
+    name: str
+    catalogue_nr: str
+    unit: str
+    category: str
+    desc_short: str
+    desc_long: str
+    manufacturer: str
+    supplier: str
+    tags: str
+    image_path: str
+    error: Optional[str] = None
+    existing_id: Optional[int] = None
+
+
+class ItemPreviewResponse(BaseModel):
+    total: int
+    new_count: int
+    duplicate_count: int
+    error_count: int
+    rows: list[ItemRowPreview]
+    # Staged previews only — rows holds one page, the rest stay server-side
+    token: Optional[UUID] = None
+    page: Optional[int] = None
+    page_size: Optional[int] = None
+    pages: Optional[int] = None
+
+
+class ItemConfirmRow(BaseModel):
+    row: int
+    action: Literal["create", "update", "skip"]
+    name: str
+    catalogue_nr: str
+    unit: str
+    category: str
+    desc_short: str
+    desc_long: str
+    manufacturer: str
+    supplier: str
+    tags: str
+    image_path: str
+    existing_id: Optional[int] = None
+
+
+RowAction = Literal["create", "update", "skip"]
+
+
+class ItemConfirmRequest(BaseModel):
+    """
+    Either the rows themselves, or the token of a staged preview. With a
+    token, each row's action is its override if there is one, else
+    `default` for new rows and `duplicates` for duplicate rows; error rows
+    are always left out.
+    """
+    rows: Optional[list[ItemConfirmRow]] = None
+    token: Optional[UUID] = None
+    default: RowAction = "create"
+    duplicates: RowAction = "update"
+    overrides: dict[int, RowAction] = {}
+
+
+class ItemConfirmResponse(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    errors: list[str]
+
+
+# ── Companies ────────────────────────────────────────────────────────────────
+
+class CompanyRowPreview(BaseModel):
+    row: int
+    status: Literal["new", "duplicate", "error"]
+    name: str
+    email: str
+    phone: str
+    website: str
+    is_supplier: bool
+    is_manufacturer: bool
+    comments: str
+    error: Optional[str] = None
+    existing_id: Optional[int] = None
+
+
+class CompanyPreviewResponse(BaseModel):
+    total: int
+    new_count: int
+    duplicate_count: int
+    error_count: int
+    rows: list[CompanyRowPreview]
+
+
+class CompanyConfirmRow(BaseModel):
+    row: int
+    action: Literal["create", "update", "skip"]
+    name: str
+    email: str
+    phone: str
+    website: str
+    is_supplier: bool
+    is_manufacturer: bool
+    comments: str
+    existing_id: Optional[int] = None
+
+
+class CompanyConfirmRequest(BaseModel):
+    rows: list[CompanyConfirmRow]
+
+
+class CompanyConfirmResponse(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    errors: list[str]
+
+
+# ── Background jobs ──────────────────────────────────────────────────────────
+
+class BulkJobOut(BaseModel):
+    id: UUID
+    mode: Literal["preview", "import"]
+    status: Literal["queued", "running", "done", "failed"]
+    file_name: str
+    on_duplicate: Literal["skip", "update"]
+    total_rows: Optional[int] = None  # estimate from the sheet's dimensions, when it has them
+    rows_done: int
+    new_count: int
+    duplicate_count: int
+    error_count: int
+    created: int
+    updated: int
+    skipped: int
+    errors: list[str]  # the first BULK_JOB_MAX_ERRORS row errors
+    error: Optional[str] = None  # why the job failed
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List
 
 class CompanyBase(BaseModel):
     name: str
@@ -20,6 +20,7 @@ class CompanyUpdate(CompanyBase):
 
 class CompanyOut(CompanyBase):
     id: int
+    logo_variants: Dict[str, str] | None = None  # thumb / card / full
 
     class Config:
         from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.schemas.company import CompanyOut
 from app.schemas.category import CategoryOut
 from app.schemas.tag import TagOut
@@ -14,6 +14,7 @@ class ItemOut(BaseModel):
     is_active: bool
     vessel_active: Optional[bool] = True
     image_path: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None  # thumb / card / full
     manufacturer: Optional[CompanyOut] = None
     supplier: Optional[CompanyOut] = None
     category: CategoryOut
@@ -22,20 +23,28 @@ class ItemOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
-    @classmethod
-    def model_validate(cls, obj, *args, **kwargs):
-        instance = super().model_validate(obj, *args, **kwargs)
-        if hasattr(obj, '_vessel_active'):
-            instance.vessel_active = obj._vessel_active
-        return instance
-
 
 class PaginatedItems(BaseModel):
     items: List[ItemOut]
-    total: int
-    page: int
+    total: Optional[int] = None       # cursor mode: only with include_total
+    page: Optional[int] = None        # page mode only
     page_size: int
-    pages: int
+    pages: Optional[int] = None       # page mode only
+    next_cursor: Optional[str] = None  # cursor mode only
+    prev_cursor: Optional[str] = None  # cursor mode only
+
+
+class FacetCount(BaseModel):
+    id: int
+    count: int
+
+
+class ItemFacets(BaseModel):
+    total: int
+    categories: List[FacetCount]
+    manufacturers: List[FacetCount]
+    suppliers: List[FacetCount]
+    tags: List[FacetCount]
 
 
 class ItemUpdate(BaseModel):
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Literal, Optional
+from datetime import date, datetime
 from uuid import UUID
 
 from app.schemas.requisition_item import RequisitionItemCreate, RequisitionItemOut
@@ -38,7 +38,40 @@ class RequisitionOut(BaseModel):
 
 class PaginatedRequisitions(BaseModel):
     items: List[RequisitionOut]
-    total: int
-    page: int
+    total: Optional[int] = None       # cursor mode: only with include_total
+    page: Optional[int] = None        # page mode only
     page_size: int
-    pages: int
+    pages: Optional[int] = None       # page mode only
+    next_cursor: Optional[str] = None  # cursor mode only
+    prev_cursor: Optional[str] = None  # cursor mode only
+
+
+# ?view=summary — header fields and line totals, no nested lines
+class RequisitionSummaryOut(BaseModel):
+    id: int
+    status: str
+    created_at: datetime
+    supplier: Optional[CompanyOut] = None
+    notes: Optional[str] = None
+    is_active: bool
+    line_count: int
+    total_quantity: int
+    received_quantity: int
+    percent_received: float
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class PaginatedRequisitionSummaries(PaginatedRequisitions):
+    items: List[RequisitionSummaryOut]
+
+
+# POST /requisitions/export — explicit ids and / or filters, combined with AND
+class RequisitionExportRequest(BaseModel):
+    ids: Optional[List[int]] = None
+    status: Optional[str] = None
+    supplier_id: Optional[int] = None
+    date_from: Optional[date] = None   # created_at, inclusive
+    date_to: Optional[date] = None     # created_at, inclusive
+    layout: Literal["zip", "workbook"] = "zip"
@@ -1,8 +1,10 @@
 """
-Bulk image seeder — run once from the backend/ folder.
+Bulk image seeder — run from the backend/ folder.
 
 Usage:
-    python seed_images.py
+    python app/seed_images.py
+    python app/seed_images.py --dry-run
+    python app/seed_images.py --jobs 16 --link --overwrite
 
 Setup:
     1. Create a folder called seed_images/ inside backend/
@@ -17,98 +19,165 @@ Matching priority:
     1. catalogue_nr  (exact, case-insensitive)
     2. item name     (exact, case-insensitive, fallback)
 
-Images already set on an item are skipped by default.
-Pass --overwrite to replace existing images.
+Options:
+    --overwrite   replace images items already have (skipped by default)
+    --dry-run     report what would be matched, write nothing
+    --jobs N      files stored (hashed, copied, resized) at once (default 8)
+    --link        hard-link files into the media store instead of copying
+                  them, when seed_images/ is on the same filesystem — leave
+                  the originals untouched afterwards
+    --batch N     files per UPDATE + commit (default 500)
+    --restart     ignore progress from an earlier, interrupted run
+
+Every item is loaded once into a lookup map, so matching costs no queries.
+Files go into the media store (core.media_store) on a thread pool, and
+their items are updated in batches. After each commit the batch's file
+names are appended to seed_images/.seed_progress, so a run that is
+stopped or crashes picks up where it left off.
 """
 
-import sys
+import argparse
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from shutil import copy2
-from uuid import uuid4
 
 # Allow running from backend/ without installing the package
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from sqlalchemy import select, update
+
+from app.core.images import has_variants
+from app.core.media_store import STORE_DIR, put_file, release
 from app.database import SessionLocal
+from app.db import base  # noqa: F401 — registers every model
 from app.models.item import Item
 
 IMAGES_DIR = Path("seed_images")
-MEDIA_DIR  = Path("media/items")
-OVERWRITE  = "--overwrite" in sys.argv
+PROGRESS_FILE = IMAGES_DIR / ".seed_progress"
 
 SUPPORTED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
 
 
+def normalize(value: str | None) -> str:
+    return " ".join(value.split()).casefold() if value else ""
+
+
+def load_items(db) -> tuple[dict, dict, dict]:
+    """Lookup maps from one query: by catalogue_nr, by name, and current image per item id."""
+    by_catalogue: dict[str, int] = {}
+    by_name: dict[str, int] = {}
+    images: dict[int, str | None] = {}
+    rows = db.execute(select(Item.id, Item.catalogue_nr, Item.name, Item.image_path).order_by(Item.id))
+    for item_id, catalogue_nr, name, image_path in rows:
+        # Lowest id wins on a tie
+        by_catalogue.setdefault(normalize(catalogue_nr), item_id)
+        by_name.setdefault(normalize(name), item_id)
+        images[item_id] = image_path
+    by_catalogue.pop("", None)
+    by_name.pop("", None)
+    return by_catalogue, by_name, images
+
+
+def read_progress() -> set[str]:
+    if not PROGRESS_FILE.exists():
+        return set()
+    return set(PROGRESS_FILE.read_text(encoding="utf-8").splitlines())
+
+
+def record_progress(names: list[str]):
+    with open(PROGRESS_FILE, "a", encoding="utf-8") as f:
+        f.writelines(f"{name}\n" for name in names)
+
+
+def same_filesystem(a: Path, b: Path) -> bool:
+    return os.stat(a).st_dev == os.stat(b).st_dev
+
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--link", action="store_true")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+
     if not IMAGES_DIR.exists():
         print(f"ERROR: '{IMAGES_DIR}' folder not found.")
         print("Create it and put your images inside, named by catalogue_nr.")
         sys.exit(1)
 
-    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
-
-    image_files = [
+    image_files = sorted(
         f for f in IMAGES_DIR.iterdir()
         if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
-    ]
-
+    )
     if not image_files:
         print(f"No images found in '{IMAGES_DIR}'. Supported: {', '.join(SUPPORTED_EXTENSIONS)}")
         sys.exit(0)
 
-    print(f"Found {len(image_files)} image(s) in '{IMAGES_DIR}'\n")
-
-    db = SessionLocal()
-
-    ok = skipped = not_found = already_set = 0
+    if args.restart and PROGRESS_FILE.exists() and not args.dry_run:
+        PROGRESS_FILE.unlink()
+    done = set() if args.restart else read_progress()
 
-    try:
-        for img_path in sorted(image_files):
-            stem = img_path.stem  # filename without extension
+    link = args.link and same_filesystem(IMAGES_DIR, Path(STORE_DIR))
+    if args.link and not link:
+        print(f"NOTE: '{IMAGES_DIR}' is on another filesystem than {STORE_DIR} — copying instead of linking")
 
-            # Try catalogue_nr first, then name
-            item = db.query(Item).filter(
-                Item.catalogue_nr.ilike(stem)
-            ).first()
+    print(f"Found {len(image_files)} image(s) in '{IMAGES_DIR}'"
+          + (f", {len(done & {f.name for f in image_files})} already done in an earlier run" if done else "") + "\n")
 
-            if not item:
-                item = db.query(Item).filter(
-                    Item.name.ilike(stem)
-                ).first()
+    db = SessionLocal()
+    ok = not_found = already_set = duplicate = resumed = 0
 
-            if not item:
-                print(f"  SKIP     {img_path.name:<40} — no item found for '{stem}'")
-                not_found += 1
+    try:
+        by_catalogue, by_name, images = load_items(db)
+
+        # ── Match — in memory ────────────────────────────────────────────
+        matched: list[tuple[Path, int]] = []
+        claimed: dict[int, str] = {}
+        for img_path in image_files:
+            if img_path.name in done:
+                resumed += 1
                 continue
-
-            if item.image_path and not OVERWRITE:
-                print(f"  EXISTS   {img_path.name:<40} — '{item.name}' already has an image (use --overwrite)")
+            key = normalize(img_path.stem)
+            item_id = by_catalogue.get(key) or by_name.get(key)
+            if item_id is None:
+                print(f"  SKIP     {img_path.name:<40} — no item found for '{img_path.stem}'")
+                not_found += 1
+            elif item_id in claimed:
+                print(f"  DUP      {img_path.name:<40} — same item as {claimed[item_id]}")
+                duplicate += 1
+            elif images[item_id] and not args.overwrite:
+                print(f"  EXISTS   {img_path.name:<40} — item {item_id} already has an image (use --overwrite)")
                 already_set += 1
-                continue
-
-            # Remove old image file if overwriting
-            if item.image_path and OVERWRITE:
-                old = Path(item.image_path)
-                if old.exists():
-                    old.unlink()
-
-            # Copy to media/items/ with a unique filename
-            ext = img_path.suffix.lower()
-            dest_name = f"{uuid4()}{ext}"
-            dest_path = MEDIA_DIR / dest_name
-            copy2(img_path, dest_path)
-
-            item.image_path = str(dest_path)
-            action = "UPDATED" if OVERWRITE and item.image_path else "OK"
-            print(f"  {action:<8} {img_path.name:<40} → {item.name}")
-            ok += 1
-
-        db.commit()
+            else:
+                claimed[item_id] = img_path.name
+                matched.append((img_path, item_id))
+
+        # ── Store and update — in batches ────────────────────────────────
+        if args.dry_run:
+            ok, matched = len(matched), []
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            for start in range(0, len(matched), args.batch):
+                batch = matched[start:start + args.batch]
+                paths = list(pool.map(lambda m: put_file(m[0], link=link), batch))
+                db.execute(update(Item), [
+                    {"id": item_id, "image_path": path, "image_variants_ready": has_variants(path)}
+                    for (_, item_id), path in zip(batch, paths)
+                ])
+                db.commit()
+                # Old images go once nothing references them
+                release(db, *(images[item_id] for _, item_id in batch))
+                record_progress([img_path.name for img_path, _ in batch])
+                ok += len(batch)
+                print(f"  {ok}/{len(matched)} stored")
 
     except Exception as e:
         db.rollback()
-        print(f"\nERROR during commit: {e}")
+        print(f"\nERROR: {e}")
+        print("Committed batches are kept — run again to continue.")
         sys.exit(1)
 
     finally:
@@ -116,9 +185,11 @@ def main():
 
     print(f"""
 ──────────────────────────────
-  Imported:   {ok}
-  Skipped:    {already_set}  (already had image)
-  Not found:  {not_found}  (no matching item)
+  {"Would import:" if args.dry_run else "Imported:":<13} {ok}
+  Earlier run:  {resumed}  (listed in {PROGRESS_FILE}, --restart to redo)
+  Skipped:      {already_set}  (already had image)
+  Duplicates:   {duplicate}  (another file matched the same item)
+  Not found:    {not_found}  (no matching item)
 ──────────────────────────────
 """)
 
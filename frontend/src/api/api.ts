@@ -56,6 +56,7 @@ export type ItemFilter = {
   page_size?: number;
   show_inactive?: string;
   show_vessel_inactive?: string;
+  fields?: string;  // sparse fieldset, e.g. "id,name,unit,catalogue_nr"
 };
 
 export const fetchItems = async (filter?: ItemFilter): Promise<Paginated<Item>> => {
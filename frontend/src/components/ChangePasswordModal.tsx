@@ -28,10 +28,12 @@ export default function ChangePasswordModal({ onClose }: Props) {
     }
     setLoading(true);
     try {
-      await api.post("/users/me/change-password", {
+      const res = await api.post("/users/me/change-password", {
         old_password: oldPassword,
         new_password: newPassword,
       });
+      // Older tokens are revoked by the change — keep this session on the new one
+      if (res.data?.access_token) localStorage.setItem("token", res.data.access_token);
       toast.success("Password changed successfully");
       onClose();
     } catch (err: any) {
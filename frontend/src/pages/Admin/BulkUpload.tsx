@@ -2,6 +2,7 @@ import { useRef, useState } from "react";
 import api from "../../api/api";
 import PageContainer from "../../components/layout/PageContainer";
 import Button from "../../components/ui/Button";
+import Pagination from "../../components/ui/Pagination";
 import toast from "react-hot-toast";
 
 // ── Types ─────────────────────────────────────────────────────────────────────
@@ -24,7 +25,6 @@ interface ItemRow {
   image_path: string;
   error?: string;
   existing_id?: number;
-  action?: RowAction;
 }
 
 interface CompanyRow {
@@ -51,6 +51,15 @@ interface PreviewSummary {
 
 type UploadMode = "items" | "companies";
 
+// Item previews are staged server-side and paged through; confirm sends the
+// upload token plus only the actions that differ from the defaults
+const PAGE_SIZE = 50;
+
+interface Override {
+  action: RowAction;
+  status: RowStatus;
+}
+
 // ── Helpers ───────────────────────────────────────────────────────────────────
 
 const STATUS_STYLES: Record<RowStatus, string> = {
@@ -107,12 +116,22 @@ export default function BulkUpload() {
   const [itemRows, setItemRows] = useState<ItemRow[]>([]);
   const [companyRows, setCompanyRows] = useState<CompanyRow[]>([]);
   const [result, setResult] = useState<{ created: number; updated: number; skipped: number; errors: string[] } | null>(null);
+  const [token, setToken] = useState<string | null>(null);
+  const [page, setPage] = useState(1);
+  const [pages, setPages] = useState(1);
+  const [statusFilter, setStatusFilter] = useState<RowStatus | "">("");
+  const [newAction, setNewAction] = useState<RowAction>("create");
+  const [duplicateAction, setDuplicateAction] = useState<RowAction>("update");
+  const [overrides, setOverrides] = useState<Record<number, Override>>({});
   const fileInputRef = useRef<HTMLInputElement>(null);
 
   // ── Template download ──────────────────────────────────────────────────────
 
-  const downloadTemplate = async () => {
-    const res = await api.get(`/bulk/${mode}/template`, { responseType: "blob" });
+  const downloadTemplate = async (live = false) => {
+    const res = await api.get(`/bulk/${mode}/template`, {
+      responseType: "blob",
+      params: live ? { live: true } : undefined,
+    });
     const url = URL.createObjectURL(new Blob([res.data]));
     const a = document.createElement("a");
     a.href = url;
@@ -129,15 +148,17 @@ export default function BulkUpload() {
     try {
       const formData = new FormData();
       formData.append("file", file);
-      const res = await api.post(`/bulk/${mode}/preview`, formData);
+      const res = await api.post(`/bulk/${mode}/preview`, formData, {
+        params: mode === "items" ? { staged: true, page_size: PAGE_SIZE } : undefined,
+      });
       const data = res.data;
       setSummary({ total: data.total, new_count: data.new_count, duplicate_count: data.duplicate_count, error_count: data.error_count });
 
       if (mode === "items") {
-        setItemRows(data.rows.map((r: ItemRow) => ({
-          ...r,
-          action: r.status === "new" ? "create" : r.status === "duplicate" ? "update" : "skip",
-        })));
+        setToken(data.token);
+        setPage(1);
+        setPages(data.pages);
+        setItemRows(data.rows);
       } else {
         setCompanyRows(data.rows.map((r: CompanyRow) => ({
           ...r,
@@ -152,13 +173,46 @@ export default function BulkUpload() {
     }
   };
 
+  const loadPage = async (nextPage: number, status: RowStatus | "" = statusFilter) => {
+    if (!token) return;
+    setLoading(true);
+    try {
+      const res = await api.get(`/bulk/items/preview/${token}`, {
+        params: { page: nextPage, page_size: PAGE_SIZE, status: status || undefined },
+      });
+      setItemRows(res.data.rows);
+      setPage(nextPage);
+      setPages(res.data.pages);
+      setStatusFilter(status);
+    } catch (err: any) {
+      toast.error(err.response?.data?.detail || "Could not load rows");
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  // ── Item actions ───────────────────────────────────────────────────────────
+
+  const defaultAction = (status: RowStatus): RowAction =>
+    status === "new" ? newAction : status === "duplicate" ? duplicateAction : "skip";
+
+  const itemAction = (r: ItemRow): RowAction => overrides[r.row]?.action ?? defaultAction(r.status);
+
+  const setItemAction = (r: ItemRow, action: RowAction) =>
+    setOverrides(prev => ({ ...prev, [r.row]: { action, status: r.status } }));
+
   // ── Confirm ────────────────────────────────────────────────────────────────
 
   const handleConfirm = async () => {
     setLoading(true);
     try {
       const payload = mode === "items"
-        ? { rows: itemRows.filter(r => r.status !== "error").map(r => ({ ...r, action: r.action ?? "skip" })) }
+        ? {
+            token,
+            default: newAction,
+            duplicates: duplicateAction,
+            overrides: Object.fromEntries(Object.entries(overrides).map(([row, o]) => [row, o.action])),
+          }
         : { rows: companyRows.filter(r => r.status !== "error").map(r => ({ ...r, action: r.action ?? "skip" })) };
 
       const res = await api.post(`/bulk/${mode}/confirm`, payload);
@@ -175,7 +229,8 @@ export default function BulkUpload() {
 
   const setAllDuplicates = (action: RowAction) => {
     if (mode === "items") {
-      setItemRows(prev => prev.map(r => r.status === "duplicate" ? { ...r, action } : r));
+      setDuplicateAction(action);
+      setOverrides(prev => Object.fromEntries(Object.entries(prev).filter(([, o]) => o.status !== "duplicate")));
     } else {
       setCompanyRows(prev => prev.map(r => r.status === "duplicate" ? { ...r, action } : r));
     }
@@ -188,13 +243,25 @@ export default function BulkUpload() {
     setItemRows([]);
     setCompanyRows([]);
     setResult(null);
+    setToken(null);
+    setPage(1);
+    setPages(1);
+    setStatusFilter("");
+    setNewAction("create");
+    setDuplicateAction("update");
+    setOverrides({});
     if (fileInputRef.current) fileInputRef.current.value = "";
   };
 
   // ── Counts for confirm button ──────────────────────────────────────────────
-  const activeRows = mode === "items"
-    ? itemRows.filter(r => r.action !== "skip" && r.status !== "error")
-    : companyRows.filter(r => r.action !== "skip" && r.status !== "error");
+  const activeCount = mode === "items"
+    ? (summary
+        ? (newAction !== "skip" ? summary.new_count : 0)
+          + (duplicateAction !== "skip" ? summary.duplicate_count : 0)
+          + Object.values(overrides).reduce(
+              (n, o) => n + Number(o.action !== "skip") - Number(defaultAction(o.status) !== "skip"), 0)
+        : 0)
+    : companyRows.filter(r => r.action !== "skip" && r.status !== "error").length;
 
   // ── Render ─────────────────────────────────────────────────────────────────
 
@@ -225,9 +292,14 @@ export default function BulkUpload() {
           <div className="p-5 border border-dashed border-gray-300 rounded-xl bg-gray-50 space-y-4">
             <div>
               <p className="text-sm font-medium text-gray-700 mb-1">Step 1 — Download the template</p>
-              <Button type="button" variant="ghost" onClick={downloadTemplate}>
+              <Button type="button" variant="ghost" onClick={() => downloadTemplate()}>
                 ⬇ Download {mode} template (.xlsx)
               </Button>
+              {mode === "items" && (
+                <Button type="button" variant="ghost" onClick={() => downloadTemplate(true)}>
+                  ⬇ With category &amp; tag dropdowns
+                </Button>
+              )}
             </div>
 
             <div>
@@ -305,7 +377,7 @@ export default function BulkUpload() {
                   {itemRows.map(r => (
                     <tr
                       key={r.row}
-                      className={`border-t border-gray-100 ${r.status === "error" ? "bg-red-50" : r.action === "skip" ? "opacity-40" : ""}`}
+                      className={`border-t border-gray-100 ${r.status === "error" ? "bg-red-50" : itemAction(r) === "skip" ? "opacity-40" : ""}`}
                     >
                       <td className="px-3 py-2 text-gray-400">{r.row}</td>
                       <td className="px-3 py-2">
@@ -324,11 +396,9 @@ export default function BulkUpload() {
                       <td className="px-3 py-2">
                         {r.status !== "error" && (
                           <ActionSelect
-                            value={r.action ?? "skip"}
+                            value={itemAction(r)}
                             isDuplicate={r.status === "duplicate"}
-                            onChange={action =>
-                              setItemRows(prev => prev.map(x => x.row === r.row ? { ...x, action } : x))
-                            }
+                            onChange={action => setItemAction(r, action)}
                           />
                         )}
                       </td>
@@ -339,6 +409,23 @@ export default function BulkUpload() {
             </div>
           )}
 
+          {/* Pager — Items */}
+          {mode === "items" && (
+            <div className="space-y-2">
+              <select
+                value={statusFilter}
+                onChange={e => loadPage(1, e.target.value as RowStatus | "")}
+                className="text-xs border border-gray-300 rounded px-1 py-0.5 focus:outline-none focus:ring-1 focus:ring-sky-400"
+              >
+                <option value="">All rows</option>
+                <option value="new">New only</option>
+                <option value="duplicate">Duplicates only</option>
+                <option value="error">Errors only</option>
+              </select>
+              <Pagination page={page} pages={pages} onChange={p => loadPage(p)} />
+            </div>
+          )}
+
           {/* Preview table — Companies */}
           {mode === "companies" && (
             <div className="overflow-x-auto rounded-xl border border-gray-200 text-sm">
@@ -393,8 +480,8 @@ export default function BulkUpload() {
 
           {/* Actions */}
           <div className="flex items-center gap-4">
-            <Button variant="primary" onClick={handleConfirm} disabled={loading || activeRows.length === 0}>
-              {loading ? "Importing..." : `Confirm import (${activeRows.length} rows)`}
+            <Button variant="primary" onClick={handleConfirm} disabled={loading || activeCount === 0}>
+              {loading ? "Importing..." : `Confirm import (${activeCount} rows)`}
             </Button>
             <Button variant="ghost" type="button" onClick={reset}>
               ← Start over
@@ -24,7 +24,7 @@ export default function CompanyDetails() {
         <div className={styles.logoBox}>
           {company.logo_path ? (
             <img
-              src={`http://localhost:8000/${company.logo_path}`}
+              src={`http://localhost:8000/${company.logo_variants?.card ?? company.logo_path}`}
               alt={company.name}
               className={styles.logo}
             />
@@ -159,7 +159,7 @@ export default function EditCompany() {
       {company.logo_path && !logoDeleted && (
         <div>
           <img
-            src={`http://localhost:8000/${company.logo_path}`}
+            src={`http://localhost:8000/${company.logo_variants?.card ?? company.logo_path}`}
             className="w-40 mb-2 rounded"
           />
           <Button
@@ -155,7 +155,7 @@ export default function EditItem() {
 
         {item.image_path && !imageDeleted && (
           <div>
-            <img src={`http://localhost:8000/${item.image_path}`} className="w-40 mb-2 rounded" alt="" />
+            <img src={`http://localhost:8000/${item.image_variants?.card ?? item.image_path}`} className="w-40 mb-2 rounded" alt="" />
             <Button variant="delete" type="button" onClick={deleteImage}>Delete image</Button>
           </div>
         )}
@@ -37,7 +37,7 @@ export default function ItemDetails() {
         {/* IMAGE */}
         <div className="border border-gray-200 rounded-lg overflow-hidden bg-gray-50 h-64 flex items-center justify-center text-gray-400 text-sm">
           {item.image_path
-            ? <img src={`http://localhost:8000/${item.image_path}`} className="w-full h-full object-contain" alt={item.name} />
+            ? <img src={`http://localhost:8000/${item.image_variants?.full ?? item.image_path}`} className="w-full h-full object-contain" alt={item.name} />
             : "No image"
           }
         </div>
@@ -291,6 +291,14 @@ export default function Items() {
               return (
                 <tr key={item.id} className={`border-t border-gray-100 hover:bg-gray-50 ${dimmed ? "opacity-40" : ""}`}>
                   <td className="px-4 py-3">
+                    {item.image_variants && (
+                      <img
+                        src={`http://localhost:8000/${item.image_variants.thumb}`}
+                        className="inline-block w-8 h-8 mr-2 rounded object-cover align-middle"
+                        loading="lazy"
+                        alt=""
+                      />
+                    )}
                     <Link to={`/items/${item.id}`} className="font-medium text-gray-900 hover:text-sky-600 hover:underline">
                       {item.name}
                     </Link>
@@ -1,7 +1,7 @@
 import { useEffect, useState } from "react";
 import { Link, useSearchParams } from "react-router-dom";
 import api, { fetchAllCompanies } from "../../api/api";
-import type { Requisition, Company } from "../../types";
+import type { RequisitionSummary, Company } from "../../types";
 import FilterBar from "../../components/ui/FilterBar";
 import Table from "../../components/ui/Table";
 import Button from "../../components/ui/Button";
@@ -20,7 +20,7 @@ const STATUSES = [
 ];
 
 export default function RequisitionsList() {
-  const [data, setData] = useState<Requisition[]>([]);
+  const [data, setData] = useState<RequisitionSummary[]>([]);
   const [suppliers, setSuppliers] = useState<Company[]>([]);
   const [loading, setLoading] = useState(false);
   const [deletingId, setDeletingId] = useState<number | null>(null);
@@ -41,7 +41,7 @@ export default function RequisitionsList() {
 
   useEffect(() => {
     setLoading(true);
-    const params: any = { page: currentPage, page_size: pageSize };
+    const params: any = { page: currentPage, page_size: pageSize, view: "summary" };
     if (filters.status) params.status = filters.status;
     if (filters.supplier_id) params.supplier_id = Number(filters.supplier_id);
 
@@ -140,7 +140,7 @@ export default function RequisitionsList() {
                   <td className="px-4 py-3 text-gray-500">#{r.id}</td>
                   <td className="px-4 py-3"><StatusBadge status={r.status} /></td>
                   <td className="px-4 py-3">{r.supplier?.name ?? "—"}</td>
-                  <td className="px-4 py-3">{r.items.length}</td>
+                  <td className="px-4 py-3">{r.line_count}</td>
                   <td className="px-4 py-3 text-gray-500">{new Date(r.created_at).toLocaleDateString()}</td>
                   <td className="px-4 py-3 flex gap-2 justify-end">
                     <Link to={`/requisitions/${r.id}`}>
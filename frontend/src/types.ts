@@ -39,9 +39,13 @@ export type Company = {
   is_supplier?: boolean;
   comments?: string;
   logo_path?: string;
+  logo_variants?: ImageVariants | null;
   is_active: boolean;
 };
 
+// Resized copies of an uploaded image — thumb 96px, card 400px, full 1600px
+export type ImageVariants = { thumb: string; card: string; full: string };
+
 export type CompanyCreate = {
   name: string;
   is_supplier: boolean;
@@ -59,6 +63,7 @@ export type Item = {
   supplier?: Company;
   category?: Category;
   image_path?: string;
+  image_variants?: ImageVariants | null;
   created_at: string;
   desc_long?: string;
   is_active: boolean;
@@ -98,6 +103,14 @@ export type Requisition = {
   is_active: boolean;
 };
 
+// GET /requisitions?view=summary — header fields and line totals only
+export type RequisitionSummary = Omit<Requisition, "items"> & {
+  line_count: number;
+  total_quantity: number;
+  received_quantity: number;
+  percent_received: number;
+};
+
 export type RequisitionEditLine = {
   item_id: number;
   name: string;